@@ -0,0 +1,41 @@
+"""add_batches_keyset_index
+
+Revision ID: 0d567201fbed
+Revises: 4f720e79d8db
+Create Date: 2026-10-15 09:12:04.318221
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d567201fbed'
+down_revision: Union[str, None] = '4f720e79d8db'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial index backing keyset pagination of active batches in FEFO order
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_active_expiration_id',
+            'batches',
+            ['expiration_date', 'id'],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_batches_active_expiration_id',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
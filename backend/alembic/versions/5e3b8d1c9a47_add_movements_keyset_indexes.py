@@ -0,0 +1,53 @@
+"""add_movements_keyset_indexes
+
+Revision ID: 5e3b8d1c9a47
+Revises: b18f4c6d2e07
+Create Date: 2026-10-15 15:42:18.906613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e3b8d1c9a47'
+down_revision: Union[str, None] = 'b18f4c6d2e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination of movement history by (timestamp, id), overall and per batch
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_movements_timestamp_id',
+            'movements',
+            ['timestamp', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_movements_batch_timestamp_id',
+            'movements',
+            ['batch_id', 'timestamp', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_movements_batch_timestamp_id',
+            table_name='movements',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_movements_timestamp_id',
+            table_name='movements',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,56 @@
+"""cover_active_batches_index
+
+Revision ID: 7c2e9a41d3b5
+Revises: 0d567201fbed
+Create Date: 2026-10-15 11:40:27.615904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a41d3b5'
+down_revision: Union[str, None] = '0d567201fbed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covering partial index so FEFO list pages can be served index-only
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_active_exp',
+            'batches',
+            ['expiration_date', 'id'],
+            postgresql_include=['quantity_available', 'item_id', 'location_id'],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_batches_active_expiration_id',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_active_expiration_id',
+            'batches',
+            ['expiration_date', 'id'],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_batches_active_exp',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,45 @@
+"""add_items_trigram_indexes
+
+Revision ID: 9a4f6c2e1d85
+Revises: 5e3b8d1c9a47
+Create Date: 2026-10-15 16:20:37.441092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f6c2e1d85'
+down_revision: Union[str, None] = '5e3b8d1c9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trigram GIN indexes back the ILIKE '%term%' item search and supplier filter
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for column in ('sku', 'name', 'supplier'):
+            op.create_index(
+                f'ix_items_{column}_trgm',
+                'items',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ('sku', 'name', 'supplier'):
+            op.drop_index(
+                f'ix_items_{column}_trgm',
+                table_name='items',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,29 @@
+"""add_batch_and_delivery_note_number_sequences
+
+Revision ID: a3c58e1f7b92
+Revises: f2b6d9e4a731
+Create Date: 2026-10-16 10:12:47.318540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c58e1f7b92'
+down_revision: Union[str, None] = 'f2b6d9e4a731'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sources of generated batch and delivery note numbers, reserved in blocks by the app
+    op.execute(sa.schema.CreateSequence(sa.Sequence('batch_number_seq'), if_not_exists=True))
+    op.execute(sa.schema.CreateSequence(sa.Sequence('delivery_note_number_seq'), if_not_exists=True))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('delivery_note_number_seq'), if_exists=True))
+    op.execute(sa.schema.DropSequence(sa.Sequence('batch_number_seq'), if_exists=True))
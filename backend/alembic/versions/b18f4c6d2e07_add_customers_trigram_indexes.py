@@ -0,0 +1,45 @@
+"""add_customers_trigram_indexes
+
+Revision ID: b18f4c6d2e07
+Revises: 7c2e9a41d3b5
+Create Date: 2026-10-15 13:05:51.204377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b18f4c6d2e07'
+down_revision: Union[str, None] = '7c2e9a41d3b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trigram GIN indexes back the ILIKE '%term%' customer search
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for column in ('name', 'email'):
+            op.create_index(
+                f'ix_customers_{column}_trgm',
+                'customers',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ('name', 'email'):
+            op.drop_index(
+                f'ix_customers_{column}_trgm',
+                table_name='customers',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
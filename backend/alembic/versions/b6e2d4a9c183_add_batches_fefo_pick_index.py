@@ -0,0 +1,56 @@
+"""add_batches_fefo_pick_index
+
+Revision ID: b6e2d4a9c183
+Revises: a3c58e1f7b92
+Create Date: 2026-10-16 14:05:31.482907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d4a9c183'
+down_revision: Union[str, None] = 'a3c58e1f7b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covering per-item FEFO index; replaces the non-covering pickable one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_fefo_pick',
+            'batches',
+            ['item_id', 'expiration_date'],
+            postgresql_include=['quantity_available', 'id', 'location_id'],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_batches_item_pickable_exp',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_item_pickable_exp',
+            'batches',
+            ['item_id', 'expiration_date'],
+            postgresql_where=sa.text("status = 'ACTIVE' AND quantity_available > 0"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_batches_fefo_pick',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
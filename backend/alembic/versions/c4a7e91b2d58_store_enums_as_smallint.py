@@ -0,0 +1,83 @@
+"""store_enums_as_smallint
+
+Revision ID: c4a7e91b2d58
+Revises: b6e2d4a9c183
+Create Date: 2026-10-16 15:22:08.903416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e91b2d58'
+down_revision: Union[str, None] = 'b6e2d4a9c183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, enum type, member names in code order)
+ENUM_COLUMNS = [
+    ('batches', 'status', 'batchstatus', ['ACTIVE', 'SCRAP', 'DEPLETED']),
+    ('movements', 'movement_type', 'movementtype',
+     ['RECEIPT', 'DISPATCH', 'ADJUSTMENT', 'SCRAP', 'TRANSFER']),
+    ('alerts', 'alert_type', 'alerttype',
+     ['EXPIRATION_WARNING', 'EXPIRATION_CRITICAL', 'EXPIRED', 'LOW_STOCK',
+      'DEAD_STOCK', 'REORDER_POINT']),
+    ('alerts', 'severity', 'alertseverity', ['INFO', 'WARNING', 'CRITICAL']),
+]
+
+# Partial indexes whose predicate compares batches.status
+PARTIAL_INDEXES = [
+    ('ix_batches_active_exp', ['expiration_date', 'id'],
+     ['quantity_available', 'item_id', 'location_id']),
+    ('ix_batches_fefo_pick', ['item_id', 'expiration_date'],
+     ['quantity_available', 'id', 'location_id']),
+]
+
+
+def _create_partial_indexes(active: str) -> None:
+    for name, columns, include in PARTIAL_INDEXES:
+        op.create_index(
+            name,
+            'batches',
+            columns,
+            postgresql_include=include,
+            postgresql_where=sa.text(f"status = {active}"),
+        )
+
+
+def _drop_partial_indexes() -> None:
+    for name, _, _ in PARTIAL_INDEXES:
+        op.drop_index(name, table_name='batches', if_exists=True)
+
+
+def upgrade() -> None:
+    # Enum columns become SMALLINT codes (the member's position in the Python enum)
+    _drop_partial_indexes()
+    for table, column, type_name, names in ENUM_COLUMNS:
+        cases = ' '.join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(names))
+        op.alter_column(
+            table,
+            column,
+            type_=sa.SmallInteger(),
+            postgresql_using=f"CASE {column}::text {cases} END",
+        )
+        op.execute(f"DROP TYPE IF EXISTS {type_name}")
+    _create_partial_indexes("0")
+
+
+def downgrade() -> None:
+    _drop_partial_indexes()
+    for table, column, type_name, names in ENUM_COLUMNS:
+        sa.Enum(*names, name=type_name).create(op.get_bind(), checkfirst=True)
+        cases = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in enumerate(names))
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Enum(*names, name=type_name, create_type=False),
+            postgresql_using=f"(CASE {column} {cases} END)::{type_name}",
+        )
+    _create_partial_indexes("'ACTIVE'")
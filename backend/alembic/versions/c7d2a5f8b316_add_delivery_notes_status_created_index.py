@@ -0,0 +1,67 @@
+"""add_delivery_notes_status_created_index
+
+Revision ID: c7d2a5f8b316
+Revises: 9a4f6c2e1d85
+Create Date: 2026-10-15 17:05:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2a5f8b316'
+down_revision: Union[str, None] = '9a4f6c2e1d85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Newest-first delivery note listing, with or without a status filter;
+    # the composite index also serves plain status lookups
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_delivery_notes_status_created_at',
+            'delivery_notes',
+            ['status', 'created_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_delivery_notes_created_at',
+            'delivery_notes',
+            ['created_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_delivery_notes_status',
+            table_name='delivery_notes',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_delivery_notes_status',
+            'delivery_notes',
+            ['status'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_delivery_notes_created_at',
+            table_name='delivery_notes',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_delivery_notes_status_created_at',
+            table_name='delivery_notes',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
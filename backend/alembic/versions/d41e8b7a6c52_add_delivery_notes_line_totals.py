@@ -0,0 +1,46 @@
+"""add_delivery_notes_line_totals
+
+Revision ID: d41e8b7a6c52
+Revises: c7d2a5f8b316
+Create Date: 2026-10-15 17:42:08.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41e8b7a6c52'
+down_revision: Union[str, None] = 'c7d2a5f8b316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Line totals stored on the note, so the list needs no GROUP BY over lines
+    op.add_column('delivery_notes', sa.Column('items_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('delivery_notes', sa.Column('total_quantity', sa.Numeric(14, 3), nullable=False, server_default='0'))
+    
+    # Backfill existing notes from their lines
+    op.execute(
+        """
+        UPDATE delivery_notes AS dn
+        SET items_count = totals.items_count,
+            total_quantity = totals.total_quantity
+        FROM (
+            SELECT delivery_note_id,
+                   COUNT(*) AS items_count,
+                   SUM(quantity) AS total_quantity
+            FROM delivery_note_items
+            GROUP BY delivery_note_id
+        ) AS totals
+        WHERE totals.delivery_note_id = dn.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('delivery_notes', 'total_quantity')
+    op.drop_column('delivery_notes', 'items_count')
@@ -0,0 +1,41 @@
+"""add_alerts_active_index
+
+Revision ID: d8b3f5a2c916
+Revises: c4a7e91b2d58
+Create Date: 2026-10-16 16:48:55.207134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b3f5a2c916'
+down_revision: Union[str, None] = 'c4a7e91b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial index over unread, undismissed alerts for the dashboard counts
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_alerts_active',
+            'alerts',
+            ['severity', 'created_at'],
+            postgresql_where=sa.text("is_read = false AND is_dismissed = false"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_alerts_active',
+            table_name='alerts',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,53 @@
+"""drop_full_batches_status_indexes
+
+Revision ID: e2c9a7d4b185
+Revises: d8b3f5a2c916
+Create Date: 2026-10-16 18:03:12.660248
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c9a7d4b185'
+down_revision: Union[str, None] = 'd8b3f5a2c916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Superseded by the partial active-batch indexes (ix_batches_active_exp, ix_batches_fefo_pick)
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_batches_expiration_status',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_batches_item_status',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_item_status',
+            'batches',
+            ['item_id', 'status'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_batches_expiration_status',
+            'batches',
+            ['expiration_date', 'status'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
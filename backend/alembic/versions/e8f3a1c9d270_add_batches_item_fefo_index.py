@@ -0,0 +1,41 @@
+"""add_batches_item_fefo_index
+
+Revision ID: e8f3a1c9d270
+Revises: d41e8b7a6c52
+Create Date: 2026-10-15 18:14:51.027734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f3a1c9d270'
+down_revision: Union[str, None] = 'd41e8b7a6c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial index for per-item FEFO lookups; only pickable batches are kept
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_batches_item_pickable_exp',
+            'batches',
+            ['item_id', 'expiration_date'],
+            postgresql_where=sa.text("status = 'ACTIVE' AND quantity_available > 0"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_batches_item_pickable_exp',
+            table_name='batches',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,27 @@
+"""add_dispatch_reference_sequence
+
+Revision ID: f2b6d9e4a731
+Revises: e8f3a1c9d270
+Create Date: 2026-10-15 18:51:26.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d9e4a731'
+down_revision: Union[str, None] = 'e8f3a1c9d270'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Source of dispatch reference numbers, reserved in blocks by the app
+    op.execute(sa.schema.CreateSequence(sa.Sequence('dispatch_reference_seq'), if_not_exists=True))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('dispatch_reference_seq'), if_exists=True))
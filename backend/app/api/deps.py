@@ -1,18 +1,47 @@
 """API dependencies for authentication and authorization"""
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
 
-from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_db, get_session_factory
 from app.core.security import verify_token
 from app.models.user import User, UserRole
 
 security = HTTPBearer()
 
+# Detached User snapshots keyed by id, merged into the request session on hit
+_user_cache = TTLCache(maxsize=10_000, ttl=settings.user_cache_ttl_seconds)
+
+
+def invalidate_user_cache(user_id: Optional[UUID] = None) -> None:
+    """Drop cached users (all of them when no id is given)"""
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.delete(user_id)
+
+
+async def _load_user(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    """Load a user, serving repeated lookups from the in-process cache"""
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        snapshot = User(**{c.key: getattr(user, c.key) for c in User.__mapper__.column_attrs})
+        make_transient_to_detached(snapshot)
+        _user_cache.set(user_id, snapshot)
+    return user
+
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -29,10 +58,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    result = await db.execute(
-        select(User).where(User.id == token_data.user_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await _load_user(db, token_data.user_id)
     
     if user is None:
         raise HTTPException(
@@ -85,5 +111,6 @@ AdminUser = Annotated[User, RequireAdmin]
 ManagerUser = Annotated[User, RequireManager]
 WarehouseUser = Annotated[User, RequireWarehouse]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+SessionFactory = Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
 
 
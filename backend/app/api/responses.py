@@ -0,0 +1,84 @@
+"""Response helpers for endpoints that return server-built schemas"""
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas.common import json_default
+
+# Conditional responses must be revalidated, and only by the requesting user
+CACHE_CONTROL = "private, must-revalidate"
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """
+    Serialize a schema straight to JSON.
+    
+    Returning a Response makes FastAPI skip the response_model validation
+    pass, which only re-checks data we built from our own rows. Keep
+    `response_model=` on the route so the OpenAPI schema is unchanged.
+    """
+    return Response(
+        content=model.model_dump_json(),
+        media_type="application/json",
+        status_code=status_code,
+    )
+
+
+def list_response(adapter: TypeAdapter, items: list, status_code: int = 200) -> Response:
+    """
+    Serialize a list of schemas straight to JSON with a prebuilt adapter.
+    
+    Like `model_response`, for routes whose response_model is a list: the
+    adapter dumps every item in one call instead of FastAPI re-validating
+    and encoding them one by one.
+    """
+    return Response(
+        content=adapter.dump_json(items),
+        media_type="application/json",
+        status_code=status_code,
+    )
+
+
+class DecimalORJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that also writes Decimals (as JSON numbers).
+    
+    Return it directly with raw UUID/date/Decimal/dataclass values: orjson
+    encodes them in one pass, and FastAPI skips its jsonable_encoder walk.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag fingerprinting the given values"""
+    digest = hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client's If-None-Match matches `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag not in candidates and "*" not in candidates:
+        return None
+    
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    """Attach validation headers to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
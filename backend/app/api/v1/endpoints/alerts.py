@@ -2,13 +2,18 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import select, func
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.orm import undefer
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
-from app.api.deps import CurrentUser, DbSession, ManagerUser
+from app.api.deps import CurrentUser, DbSession, ManagerUser, SessionFactory
+from app.core.pagination import window_total
 from app.models.alert import Alert, AlertType, AlertSeverity
-from app.services.alert_service import AlertService
+from app.services.alert_service import AlertService, alert_summary_cache
+from app.tasks.alert_checks import check_jobs, create_check_job, run_check_job
 
 router = APIRouter()
 
@@ -41,24 +46,42 @@ async def get_alerts_summary(
     current_user: CurrentUser,
 ) -> AlertSummary:
     """Get summary of unread alerts by severity"""
-    service = AlertService(db)
+    async def build_summary() -> AlertSummary:
+        # Count by severity; the per-severity counts add up to the unread total
+        result = await db.execute(
+            select(Alert.severity, func.count(Alert.id))
+            .where(Alert.is_read == False, Alert.is_dismissed == False)
+            .group_by(Alert.severity)
+        )
+        counts = {row[0]: row[1] for row in result.all()}
+        
+        return AlertSummary(
+            total_unread=sum(counts.values()),
+            critical=counts.get(AlertSeverity.CRITICAL, 0),
+            warning=counts.get(AlertSeverity.WARNING, 0),
+            info=counts.get(AlertSeverity.INFO, 0),
+        )
+    
+    return await alert_summary_cache.get_or_set("summary", build_summary)
+
+
+def _filter_alerts(
+    query: StatementLambdaElement,
+    alert_type: Optional[AlertType],
+    severity: Optional[AlertSeverity],
+    unread_only: bool,
+) -> StatementLambdaElement:
+    """Apply list filters to an alerts lambda statement"""
+    if alert_type:
+        query += lambda s: s.where(Alert.alert_type == alert_type)
     
-    # Count by severity
-    result = await db.execute(
-        select(Alert.severity, func.count(Alert.id))
-        .where(Alert.is_read == False, Alert.is_dismissed == False)
-        .group_by(Alert.severity)
-    )
-    counts = {row[0]: row[1] for row in result.all()}
+    if severity:
+        query += lambda s: s.where(Alert.severity == severity)
     
-    total = await service.get_unread_count()
+    if unread_only:
+        query += lambda s: s.where(Alert.is_read == False, Alert.is_dismissed == False)
     
-    return AlertSummary(
-        total_unread=total,
-        critical=counts.get(AlertSeverity.CRITICAL, 0),
-        warning=counts.get(AlertSeverity.WARNING, 0),
-        info=counts.get(AlertSeverity.INFO, 0),
-    )
+    return query
 
 
 @router.get("")
@@ -70,56 +93,67 @@ async def list_alerts(
     alert_type: Optional[AlertType] = None,
     severity: Optional[AlertSeverity] = None,
     unread_only: bool = False,
-) -> dict:
+    include_total: bool = False,
+) -> ORJSONResponse:
     """List alerts with filters"""
-    query = (
-        select(Alert)
-        .order_by(Alert.created_at.desc())
+    # Lambda statements let SQLAlchemy reuse the built SQL across requests
+    query = _filter_alerts(
+        lambda_stmt(
+            lambda: select(Alert)
+            .options(undefer(Alert.message))
+            .order_by(Alert.created_at.desc())
+        ),
+        alert_type, severity, unread_only,
     )
     
-    if alert_type:
-        query = query.where(Alert.alert_type == alert_type)
-    
-    if severity:
-        query = query.where(Alert.severity == severity)
-    
-    if unread_only:
-        query = query.where(Alert.is_read == False, Alert.is_dismissed == False)
-    
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    if include_total:
+        query += lambda s: s.add_columns(func.count().over().label("total_rows"))
     
-    # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    # Paginate - fetch one extra row to know whether more rows exist
+    offset = (page - 1) * page_size
+    limit = page_size + 1
+    query += lambda s: s.offset(offset).limit(limit)
     result = await db.execute(query)
-    alerts = result.scalars().all()
+    rows = result.all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    alerts = [row.Alert for row in rows]
+    
+    total = None
+    pages = None
+    if include_total:
+        count_query = _filter_alerts(
+            lambda_stmt(lambda: select(func.count()).select_from(Alert)),
+            alert_type, severity, unread_only,
+        )
+        total = await window_total(db, rows, page, count_query)
+        pages = (total + page_size - 1) // page_size if total > 0 else 1
     
     items = [
         {
-            "id": str(a.id),
-            "alert_type": a.alert_type.value,
-            "severity": a.severity.value,
+            "id": a.id,
+            "alert_type": a.alert_type,
+            "severity": a.severity,
             "title": a.title,
             "message": a.message,
-            "batch_id": str(a.batch_id) if a.batch_id else None,
-            "item_id": str(a.item_id) if a.item_id else None,
+            "batch_id": a.batch_id,
+            "item_id": a.item_id,
             "is_read": a.is_read,
             "is_dismissed": a.is_dismissed,
-            "created_at": a.created_at.isoformat(),
+            "created_at": a.created_at,
         }
         for a in alerts
     ]
     
-    pages = (total + page_size - 1) // page_size if total > 0 else 1
-    
-    return {
+    # orjson encodes the UUID/datetime/enum values natively, so skip jsonable_encoder
+    return ORJSONResponse({
         "items": items,
         "total": total,
         "page": page,
         "page_size": page_size,
         "pages": pages,
-    }
+        "has_more": has_more,
+    })
 
 
 @router.put("/{alert_id}/read")
@@ -163,16 +197,33 @@ async def dismiss_alert(
     return {"success": True, "alert_id": str(alert_id)}
 
 
-@router.post("/run-checks")
+@router.post("/run-checks", status_code=status.HTTP_202_ACCEPTED)
 async def run_alert_checks(
-    db: DbSession,
+    background_tasks: BackgroundTasks,
+    session_factory: SessionFactory,
     current_user: ManagerUser,
 ) -> dict:
-    """Manually trigger all alert checks"""
-    service = AlertService(db)
-    result = await service.run_all_checks()
+    """Manually trigger all alert checks (runs in the background)"""
+    job_id = create_check_job()
+    background_tasks.add_task(run_check_job, job_id, session_factory)
     
     return {
         "success": True,
-        "results": result,
+        "job_id": job_id,
+        "status": "pending",
     }
+
+
+@router.get("/run-checks/{job_id}")
+async def get_alert_checks_job(
+    job_id: str,
+    current_user: ManagerUser,
+) -> dict:
+    """Get the status and results of a triggered alert check"""
+    job = check_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="משימה לא נמצאה",  # Job not found
+        )
+    return job
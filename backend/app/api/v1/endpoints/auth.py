@@ -1,8 +1,10 @@
 """Authentication endpoints"""
 from datetime import timedelta
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import CurrentUser, DbSession
@@ -10,8 +12,8 @@ from app.core.config import settings
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     verify_token,
 )
 from app.models.user import User, UserRole
@@ -38,7 +40,7 @@ async def login(
     )
     user = result.scalar_one_or_none()
     
-    if user is None or not verify_password(credentials.password, user.hashed_password):
+    if user is None or not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="שם משתמש או סיסמה שגויים",  # Invalid username or password
@@ -114,45 +116,55 @@ async def get_current_user_info(
     return UserResponse.model_validate(current_user)
 
 
+async def _duplicate_user_detail(
+    db: AsyncSession, username: str, email: str
+) -> Optional[str]:
+    """Return the error detail if the username or email is already taken"""
+    result = await db.execute(
+        select(User.username, User.email)
+        .where(or_(User.username == username, User.email == email))
+    )
+    rows = result.all()
+    
+    if any(row.username == username for row in rows):
+        return "שם משתמש כבר קיים"  # Username already exists
+    if rows:
+        return "כתובת אימייל כבר קיימת"  # Email already exists
+    return None
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreate,
     db: DbSession,
 ) -> UserResponse:
     """Register a new user (for initial setup - should be protected in production)"""
-    # Check if username exists
-    result = await db.execute(
-        select(User).where(User.username == user_data.username)
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="שם משתמש כבר קיים",  # Username already exists
-        )
-    
-    # Check if email exists
-    result = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="כתובת אימייל כבר קיימת",  # Email already exists
-        )
+    # Check username and email in one query
+    detail = await _duplicate_user_detail(db, user_data.username, user_data.email)
+    if detail:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
     
     # Create user
     user = User(
         username=user_data.username,
         email=user_data.email,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         role=user_data.role,
         is_active=True,
     )
     
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent registration took the username/email after our check
+        await db.rollback()
+        detail = await _duplicate_user_detail(db, user_data.username, user_data.email)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail or "שם משתמש כבר קיים",  # Username already exists
+        )
     
     return UserResponse.model_validate(user)
 
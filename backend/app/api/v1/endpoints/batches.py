@@ -1,25 +1,79 @@
 """Batch endpoints with FEFO support"""
-from datetime import date
-from typing import List, Optional
+import asyncio
+from datetime import date, timedelta
+from typing import List, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import joinedload, undefer
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.api.deps import CurrentUser, DbSession, WarehouseUser
+from app.api.deps import CurrentUser, DbSession, SessionFactory, WarehouseUser
+from app.api.responses import list_response, model_response
+from app.core.config import settings
+from app.core.database import explicit_loads
+from app.core.pagination import decode_cursor, encode_cursor, window_total
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.location import Location
-from app.schemas.batch import BatchCreate, BatchResponse, BatchUpdate
-from app.schemas.common import PaginatedResponse, MessageResponse
+from app.schemas.batch import BatchCreate, BatchResponse, BatchUpdate, batch_list_adapter
+from app.schemas.common import PaginatedCursorResponse, PaginatedResponse, MessageResponse
+from app.services.fefo_engine import invalidate_fefo_cache
 
 router = APIRouter()
 
 
-@router.get("", response_model=PaginatedResponse[BatchResponse])
+def _batch_list_query():
+    """Select batches together with the item/location columns list views need"""
+    return (
+        select(
+            Batch,
+            Item.sku,
+            Item.name,
+            Item.cost_price,
+            Location.location_code,
+        )
+        .join(Item, Batch.item_id == Item.id)
+        .outerjoin(Location, Batch.location_id == Location.id)
+        .options(undefer(Batch.notes))
+    )
+
+
+def _batch_list_response(row, today: date) -> BatchResponse:
+    """Build a BatchResponse from a `_batch_list_query` row"""
+    batch = row.Batch
+    return BatchResponse.construct_from(
+        batch,
+        days_until_expiration=(batch.expiration_date - today).days,
+        is_expired=batch.expiration_date < today,
+        inventory_value=batch.quantity_available * row.cost_price,
+        item_sku=row.sku,
+        item_name=row.name,
+        location_code=row.location_code,
+    )
+
+
+async def _commit_batch_changes(db: DbSession) -> None:
+    """Commit edits to a batch loaded without a row lock"""
+    try:
+        await db.commit()
+    except StaleDataError:
+        # Batch.version moved on: another request changed the batch after we read it
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="האצווה עודכנה במקביל, יש לרענן ולנסות שוב",  # Batch changed concurrently, reload and retry
+        )
+
+
+@router.get(
+    "",
+    response_model=Union[PaginatedCursorResponse[BatchResponse], PaginatedResponse[BatchResponse]],
+)
 async def list_batches(
     db: DbSession,
+    session_factory: SessionFactory,
     current_user: CurrentUser,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -27,12 +81,43 @@ async def list_batches(
     status_filter: Optional[BatchStatus] = None,
     expiring_within_days: Optional[int] = None,
     sort_by_expiration: bool = True,
-) -> PaginatedResponse[BatchResponse]:
-    """List batches with FEFO sorting by default"""
-    query = (
-        select(Batch)
-        .options(selectinload(Batch.item), selectinload(Batch.location))
-    )
+    cursor: Optional[str] = None,
+    legacy_pagination: bool = False,
+) -> Response:
+    """
+    List batches with FEFO sorting by default.
+    
+    Pass the returned `next_cursor` back as `cursor` to page by keyset
+    ((expiration_date, id), or id with `sort_by_expiration=false`) instead
+    of OFFSET; a cursor only resumes the ordering that produced it. Older
+    clients can pass `legacy_pagination=true` to get the page/total/pages
+    response.
+    """
+    # FEFO sorting (First Expired, First Out) by default, otherwise by id;
+    # id makes either ordering unique, so every page can be resumed by keyset
+    if sort_by_expiration:
+        keyset_columns = (Batch.expiration_date, Batch.id)
+        cursor_types = (date.fromisoformat, UUID)
+    else:
+        keyset_columns = (Batch.id,)
+        cursor_types = (UUID,)
+    
+    cursor_values: Optional[tuple] = None
+    if cursor:
+        try:
+            cursor_values = decode_cursor(cursor, *cursor_types)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="סמן עימוד לא תקין",  # Invalid pagination cursor
+            )
+    elif page > 1 and not settings.allow_offset_pagination:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="עימוד לפי עמוד אינו נתמך, יש להשתמש בסמן",  # Offset paging disabled, use cursor
+        )
+    
+    query = _batch_list_query()
     
     # Apply filters
     if item_id:
@@ -45,45 +130,70 @@ async def list_batches(
         query = query.where(Batch.status == BatchStatus.ACTIVE)
     
     if expiring_within_days:
-        expiration_threshold = date.today()
-        from datetime import timedelta
         expiration_threshold = date.today() + timedelta(days=expiring_within_days)
         query = query.where(Batch.expiration_date <= expiration_threshold)
     
-    # FEFO sorting (First Expired, First Out)
-    if sort_by_expiration:
-        query = query.order_by(Batch.expiration_date.asc())
+    query = query.order_by(*(column.asc() for column in keyset_columns))
     
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    # Count total (legacy responses only) - ordering is irrelevant to the count
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    window_count = legacy_pagination and cursor_values is None
+    if window_count:
+        # Count in the same scan; a keyset predicate would hide earlier rows
+        query = query.add_columns(func.count().over().label("total_rows"))
     
-    # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    batches = result.scalars().all()
+    # Paginate - fetch one extra row to know whether more rows exist
+    if cursor_values is not None:
+        query = query.where(tuple_(*keyset_columns) > tuple_(*cursor_values))
+    else:
+        query = query.offset((page - 1) * page_size)
+    query = query.limit(page_size + 1)
+    
+    async def count_total() -> int:
+        async with session_factory() as session:
+            return (await session.execute(count_query)).scalar() or 0
+    
+    total = None
+    if legacy_pagination and not window_count:
+        # Keyset pages have no window count; count on a second connection meanwhile
+        total, result = await asyncio.gather(count_total(), db.execute(query))
+    else:
+        result = await db.execute(query)
+    rows = result.all()
+    
+    if window_count:
+        total = await window_total(db, rows, page, count_query)
+    
+    next_cursor = None
+    has_more = len(rows) > page_size
+    if has_more:
+        rows = rows[:page_size]
+        last = rows[-1].Batch
+        next_cursor = encode_cursor(*(getattr(last, column.key) for column in keyset_columns))
     
     # Convert to response
-    batch_responses = []
-    for batch in batches:
-        response = BatchResponse.model_validate(batch)
-        response.days_until_expiration = (batch.expiration_date - date.today()).days
-        response.is_expired = batch.expiration_date < date.today()
-        response.inventory_value = batch.quantity_available * (batch.item.cost_price if batch.item else 0)
-        response.item_sku = batch.item.sku if batch.item else None
-        response.item_name = batch.item.name if batch.item else None
-        response.location_code = batch.location.location_code if batch.location else None
-        batch_responses.append(response)
+    today = date.today()
+    batch_responses = [_batch_list_response(row, today) for row in rows]
+    
+    if not legacy_pagination:
+        return model_response(PaginatedCursorResponse(
+            items=batch_responses,
+            next_cursor=next_cursor,
+            has_more=has_more,
+        ))
     
     pages = (total + page_size - 1) // page_size if total > 0 else 1
     
-    return PaginatedResponse(
+    response = PaginatedResponse(
         items=batch_responses,
         total=total,
         page=page,
         page_size=page_size,
         pages=pages,
+        has_more=has_more,
+        next_cursor=next_cursor,
     )
+    return model_response(response)
 
 
 @router.get("/expiring-soon", response_model=List[BatchResponse])
@@ -91,38 +201,27 @@ async def get_expiring_batches(
     db: DbSession,
     current_user: CurrentUser,
     days: int = Query(30, ge=1, le=365),
-) -> List[BatchResponse]:
+) -> Response:
     """Get batches expiring within specified days"""
-    from datetime import timedelta
-    
-    expiration_threshold = date.today() + timedelta(days=days)
+    today = date.today()
+    expiration_threshold = today + timedelta(days=days)
     
     query = (
-        select(Batch)
-        .options(selectinload(Batch.item), selectinload(Batch.location))
+        _batch_list_query()
         .where(
             Batch.status == BatchStatus.ACTIVE,
             Batch.expiration_date <= expiration_threshold,
-            Batch.expiration_date >= date.today(),
+            Batch.expiration_date >= today,
         )
         .order_by(Batch.expiration_date.asc())
     )
     
     result = await db.execute(query)
-    batches = result.scalars().all()
     
-    batch_responses = []
-    for batch in batches:
-        response = BatchResponse.model_validate(batch)
-        response.days_until_expiration = (batch.expiration_date - date.today()).days
-        response.is_expired = False
-        response.inventory_value = batch.quantity_available * (batch.item.cost_price if batch.item else 0)
-        response.item_sku = batch.item.sku if batch.item else None
-        response.item_name = batch.item.name if batch.item else None
-        response.location_code = batch.location.location_code if batch.location else None
-        batch_responses.append(response)
-    
-    return batch_responses
+    return list_response(
+        batch_list_adapter,
+        [_batch_list_response(row, today) for row in result.all()],
+    )
 
 
 @router.get("/{batch_id}", response_model=BatchResponse)
@@ -130,14 +229,17 @@ async def get_batch(
     batch_id: UUID,
     db: DbSession,
     current_user: CurrentUser,
-) -> BatchResponse:
+) -> Response:
     """Get batch by ID"""
     result = await db.execute(
         select(Batch)
-        .options(selectinload(Batch.item), selectinload(Batch.location))
+        .options(
+            undefer(Batch.notes),
+            *explicit_loads(joinedload(Batch.item), joinedload(Batch.location)),
+        )
         .where(Batch.id == batch_id)
     )
-    batch = result.scalar_one_or_none()
+    batch = result.unique().scalar_one_or_none()
     
     if batch is None:
         raise HTTPException(
@@ -145,15 +247,17 @@ async def get_batch(
             detail="אצווה לא נמצאה",  # Batch not found
         )
     
-    response = BatchResponse.model_validate(batch)
-    response.days_until_expiration = (batch.expiration_date - date.today()).days
-    response.is_expired = batch.expiration_date < date.today()
-    response.inventory_value = batch.quantity_available * (batch.item.cost_price if batch.item else 0)
-    response.item_sku = batch.item.sku if batch.item else None
-    response.item_name = batch.item.name if batch.item else None
-    response.location_code = batch.location.location_code if batch.location else None
-    
-    return response
+    # Read path: built from our own row without validation
+    today = date.today()
+    return model_response(BatchResponse.construct_from(
+        batch,
+        days_until_expiration=(batch.expiration_date - today).days,
+        is_expired=batch.expiration_date < today,
+        inventory_value=batch.quantity_available * batch.item.cost_price,
+        item_sku=batch.item.sku,
+        item_name=batch.item.name,
+        location_code=batch.location.location_code if batch.location else None,
+    ))
 
 
 @router.post("/{batch_id}/mark-scrap", response_model=BatchResponse)
@@ -166,10 +270,13 @@ async def mark_batch_as_scrap(
     """Mark a batch as scrap (גריטה)"""
     result = await db.execute(
         select(Batch)
-        .options(selectinload(Batch.item), selectinload(Batch.location))
+        .options(
+            undefer(Batch.notes),
+            *explicit_loads(joinedload(Batch.item), joinedload(Batch.location)),
+        )
         .where(Batch.id == batch_id)
     )
-    batch = result.scalar_one_or_none()
+    batch = result.unique().scalar_one_or_none()
     
     if batch is None:
         raise HTTPException(
@@ -187,8 +294,8 @@ async def mark_batch_as_scrap(
     if reason:
         batch.notes = f"{batch.notes or ''}\nסיבת גריטה: {reason}".strip()
     
-    await db.commit()
-    await db.refresh(batch)
+    await _commit_batch_changes(db)
+    await invalidate_fefo_cache([batch.item_id])
     
     response = BatchResponse.model_validate(batch)
     response.days_until_expiration = (batch.expiration_date - date.today()).days
@@ -210,10 +317,13 @@ async def update_batch(
     """Update batch details"""
     result = await db.execute(
         select(Batch)
-        .options(selectinload(Batch.item), selectinload(Batch.location))
+        .options(
+            undefer(Batch.notes),
+            *explicit_loads(joinedload(Batch.item), joinedload(Batch.location)),
+        )
         .where(Batch.id == batch_id)
     )
-    batch = result.scalar_one_or_none()
+    batch = result.unique().scalar_one_or_none()
     
     if batch is None:
         raise HTTPException(
@@ -222,11 +332,13 @@ async def update_batch(
         )
     
     # Validate location if provided
+    location = None
     if batch_data.location_id:
         loc_result = await db.execute(
             select(Location).where(Location.id == batch_data.location_id)
         )
-        if not loc_result.scalar_one_or_none():
+        location = loc_result.scalar_one_or_none()
+        if not location:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="מיקום לא נמצא",  # Location not found
@@ -237,10 +349,13 @@ async def update_batch(
     for field, value in update_data.items():
         setattr(batch, field, value)
     
-    batch.version += 1  # Optimistic locking
+    # Objects outlive the commit (expire_on_commit=False): keep the loaded
+    # location in step with location_id so the response shows the new one
+    if "location_id" in update_data:
+        batch.location = location
     
-    await db.commit()
-    await db.refresh(batch)
+    await _commit_batch_changes(db)
+    await invalidate_fefo_cache([batch.item_id])
     
     response = BatchResponse.model_validate(batch)
     response.days_until_expiration = (batch.expiration_date - date.today()).days
@@ -2,16 +2,46 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.orm import undefer
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from app.api.deps import CurrentUser, DbSession, ManagerUser
+from app.api.responses import model_response
+from app.core.pagination import window_total
 from app.models.customer import Customer
 from app.schemas.customer import CustomerCreate, CustomerResponse, CustomerUpdate
 from app.schemas.common import PaginatedResponse, MessageResponse
 
 router = APIRouter()
 
+# Deferred text columns that customer responses include
+_CUSTOMER_TEXT_OPTIONS = (undefer(Customer.address), undefer(Customer.notes))
+
+
+def _filter_customers(
+    query: StatementLambdaElement,
+    search: Optional[str],
+    is_active: Optional[bool],
+    is_vmi: Optional[bool],
+) -> StatementLambdaElement:
+    """Apply list filters to a customers lambda statement"""
+    if search:
+        search_filter = f"%{search}%"
+        query += lambda s: s.where(
+            (Customer.name.ilike(search_filter)) |
+            (Customer.email.ilike(search_filter))
+        )
+    
+    if is_active is not None:
+        query += lambda s: s.where(Customer.is_active == is_active)
+    
+    if is_vmi is not None:
+        query += lambda s: s.where(Customer.is_vmi_customer == is_vmi)
+    
+    return query
+
 
 @router.get("", response_model=PaginatedResponse[CustomerResponse])
 async def list_customers(
@@ -22,41 +52,47 @@ async def list_customers(
     search: Optional[str] = None,
     is_active: Optional[bool] = True,
     is_vmi: Optional[bool] = None,
-) -> PaginatedResponse[CustomerResponse]:
+    include_total: bool = False,
+) -> Response:
     """List all customers"""
-    query = select(Customer)
-    
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (Customer.name.ilike(search_filter)) |
-            (Customer.email.ilike(search_filter))
-        )
-    
-    if is_active is not None:
-        query = query.where(Customer.is_active == is_active)
-    
-    if is_vmi is not None:
-        query = query.where(Customer.is_vmi_customer == is_vmi)
+    # Lambda statements let SQLAlchemy reuse the built SQL across requests
+    query = _filter_customers(
+        lambda_stmt(lambda: select(Customer).options(*_CUSTOMER_TEXT_OPTIONS)),
+        search, is_active, is_vmi,
+    )
     
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    if include_total:
+        query += lambda s: s.add_columns(func.count().over().label("total_rows"))
     
-    # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    # Paginate - fetch one extra row to know whether more rows exist
+    offset = (page - 1) * page_size
+    limit = page_size + 1
+    query += lambda s: s.offset(offset).limit(limit)
     result = await db.execute(query)
-    customers = result.scalars().all()
-    
-    pages = (total + page_size - 1) // page_size if total > 0 else 1
+    rows = result.all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    customers = [row.Customer for row in rows]
+    
+    total = None
+    pages = None
+    if include_total:
+        count_query = _filter_customers(
+            lambda_stmt(lambda: select(func.count()).select_from(Customer)),
+            search, is_active, is_vmi,
+        )
+        total = await window_total(db, rows, page, count_query)
+        pages = (total + page_size - 1) // page_size if total > 0 else 1
     
-    return PaginatedResponse(
-        items=[CustomerResponse.model_validate(c) for c in customers],
+    response = PaginatedResponse(
+        items=[CustomerResponse.construct_from(c) for c in customers],
         total=total,
         page=page,
         page_size=page_size,
         pages=pages,
+        has_more=has_more,
     )
+    return model_response(response)
 
 
 @router.post("", response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
@@ -69,7 +105,6 @@ async def create_customer(
     customer = Customer(**customer_data.model_dump())
     db.add(customer)
     await db.commit()
-    await db.refresh(customer)
     
     return CustomerResponse.model_validate(customer)
 
@@ -82,7 +117,7 @@ async def get_customer(
 ) -> CustomerResponse:
     """Get customer by ID"""
     result = await db.execute(
-        select(Customer).where(Customer.id == customer_id)
+        select(Customer).options(*_CUSTOMER_TEXT_OPTIONS).where(Customer.id == customer_id)
     )
     customer = result.scalar_one_or_none()
     
@@ -104,7 +139,7 @@ async def update_customer(
 ) -> CustomerResponse:
     """Update a customer"""
     result = await db.execute(
-        select(Customer).where(Customer.id == customer_id)
+        select(Customer).options(*_CUSTOMER_TEXT_OPTIONS).where(Customer.id == customer_id)
     )
     customer = result.scalar_one_or_none()
     
@@ -119,7 +154,6 @@ async def update_customer(
         setattr(customer, field, value)
     
     await db.commit()
-    await db.refresh(customer)
     
     return CustomerResponse.model_validate(customer)
 
@@ -1,12 +1,23 @@
 """Dashboard endpoints for KPIs and analytics"""
+import asyncio
+
 from fastapi import APIRouter, Query
 
-from app.api.deps import CurrentUser, DbSession
-from app.services.dashboard_service import DashboardService
+from app.api.deps import CurrentUser, DbSession, SessionFactory
+from app.services.dashboard_service import DashboardService, dashboard_cache
 
 router = APIRouter()
 
 
+def _low_stock_summary(items: list) -> dict:
+    """Wrap low stock items with their counts"""
+    return {
+        "items": items,
+        "count": len(items),
+        "critical_count": sum(1 for i in items if i["is_critical"]),
+    }
+
+
 @router.get("/kpis")
 async def get_kpis(
     db: DbSession,
@@ -14,7 +25,7 @@ async def get_kpis(
 ) -> dict:
     """Get main KPI summary for dashboard"""
     service = DashboardService(db)
-    return await service.get_kpi_summary()
+    return await dashboard_cache.get_or_set("kpis", service.get_kpi_summary)
 
 
 @router.get("/inventory-value")
@@ -24,7 +35,7 @@ async def get_inventory_value(
 ) -> dict:
     """Get total inventory value breakdown"""
     service = DashboardService(db)
-    return await service.get_inventory_value()
+    return await dashboard_cache.get_or_set("inventory_value", service.get_inventory_value)
 
 
 @router.get("/inventory-distribution")
@@ -45,7 +56,7 @@ async def get_expiration_risk(
 ) -> dict:
     """Get expiration risk map (for gauge/risk visualization)"""
     service = DashboardService(db)
-    return await service.get_expiration_risk_map()
+    return await dashboard_cache.get_or_set("expiration_risk", service.get_expiration_risk_map)
 
 
 @router.get("/low-stock")
@@ -56,11 +67,7 @@ async def get_low_stock_items(
     """Get items below reorder point"""
     service = DashboardService(db)
     items = await service.get_low_stock_items()
-    return {
-        "items": items,
-        "count": len(items),
-        "critical_count": sum(1 for i in items if i["is_critical"]),
-    }
+    return _low_stock_summary(items)
 
 
 @router.get("/recent-activity")
@@ -72,3 +79,42 @@ async def get_recent_activity(
     """Get recent activity summary"""
     service = DashboardService(db)
     return await service.get_recent_activity(days)
+
+
+@router.get("/all")
+async def get_dashboard(
+    session_factory: SessionFactory,
+    current_user: CurrentUser,
+    days: int = Query(7, ge=1, le=90),
+) -> dict:
+    """
+    Get all dashboard widgets in one request.
+    
+    Each widget runs on its own session so the queries execute
+    concurrently on separate pooled connections. Widgets cached by the
+    per-widget routes share their cache entries and skip the session on a hit.
+    """
+    async def run(method, *args):
+        async with session_factory() as session:
+            return await method(DashboardService(session), *args)
+    
+    def cached(key, method):
+        return dashboard_cache.get_or_set(key, lambda: run(method))
+    
+    kpis, value, distribution, risk, low_stock, activity = await asyncio.gather(
+        cached("kpis", DashboardService.get_kpi_summary),
+        cached("inventory_value", DashboardService.get_inventory_value),
+        run(DashboardService.get_inventory_distribution),
+        cached("expiration_risk", DashboardService.get_expiration_risk_map),
+        run(DashboardService.get_low_stock_items),
+        run(DashboardService.get_recent_activity, days),
+    )
+    
+    return {
+        "kpis": kpis,
+        "inventory_value": value,
+        "inventory_distribution": {"items": distribution},
+        "expiration_risk": risk,
+        "low_stock": _low_stock_summary(low_stock),
+        "recent_activity": activity,
+    }
@@ -1,19 +1,25 @@
 """Delivery Note endpoints"""
-from datetime import date
+import io
+from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload, selectinload
 
 from app.api.deps import CurrentUser, DbSession, WarehouseUser, ManagerUser
-from app.models.delivery_note import DeliveryNote, DeliveryNoteStatus
+from app.api.responses import make_etag, model_response, not_modified, set_etag
+from app.models.customer import Customer
+from app.models.delivery_note import DeliveryNote, DeliveryNoteItem, DeliveryNoteStatus
+from app.models.item import Item
+from app.models.user import User
 from app.services.document_service import DocumentService
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import BaseSchema, DecimalNumber, PaginatedResponse
 
 router = APIRouter()
 
@@ -33,99 +39,195 @@ class CreateDeliveryNoteRequest(BaseModel):
     issue_date: Optional[date] = None
 
 
-class DeliveryNoteResponse(BaseModel):
+class DeliveryNoteResponse(BaseSchema):
     """Delivery note response"""
     id: UUID
     delivery_note_number: str
     customer_id: UUID
     customer_name: Optional[str] = None
-    status: str
+    status: DeliveryNoteStatus
     issue_date: Optional[date]
     delivery_date: Optional[date]
     is_consignment: bool
     notes: Optional[str]
     items_count: int
-    total_quantity: float
-    created_at: str
+    total_quantity: DecimalNumber
+    created_at: datetime
     created_by_name: Optional[str] = None
 
 
+class DeliveryNoteLineResponse(BaseSchema):
+    """Delivery note line with item and batch details"""
+    id: UUID
+    item_id: UUID
+    item_sku: Optional[str] = None
+    item_name: Optional[str] = None
+    batch_id: UUID
+    batch_number: Optional[str] = None
+    expiration_date: Optional[date] = None
+    quantity: DecimalNumber
+    unit: Optional[str] = None
+
+
+class DeliveryNoteDetailResponse(DeliveryNoteResponse):
+    """Delivery note with customer details and lines"""
+    customer_address: Optional[str] = None
+    customer_contact: Optional[str] = None
+    items: List[DeliveryNoteLineResponse]
+
+
 class UpdateStatusRequest(BaseModel):
     """Request to update delivery note status"""
     status: DeliveryNoteStatus
 
 
-@router.get("")
-async def list_delivery_notes(
-    db: DbSession,
-    current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
+def _iter_buffer(buffer: io.BytesIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield a rendered document in chunks, closing the buffer once sent"""
+    with buffer:
+        while chunk := buffer.read(chunk_size):
+            yield chunk
+
+
+def _delivery_note_filters(
     customer_id: Optional[UUID] = None,
     status_filter: Optional[DeliveryNoteStatus] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-) -> dict:
-    """List delivery notes with filters"""
-    query = (
-        select(DeliveryNote)
-        .options(
-            selectinload(DeliveryNote.customer),
-            selectinload(DeliveryNote.created_by_user),
-            selectinload(DeliveryNote.items),
-        )
-        .order_by(DeliveryNote.created_at.desc())
-    )
-    
+) -> list:
+    """WHERE clauses for the delivery note list, always in the same order"""
+    filters = []
     if customer_id:
-        query = query.where(DeliveryNote.customer_id == customer_id)
+        filters.append(DeliveryNote.customer_id == customer_id)
     
     if status_filter:
-        query = query.where(DeliveryNote.status == status_filter)
+        filters.append(DeliveryNote.status == status_filter)
     
     if start_date:
-        query = query.where(DeliveryNote.issue_date >= start_date)
+        filters.append(DeliveryNote.issue_date >= start_date)
     
     if end_date:
-        query = query.where(DeliveryNote.issue_date <= end_date)
+        filters.append(DeliveryNote.issue_date <= end_date)
+    
+    return filters
+
+
+def _delivery_note_list_query(filters: list) -> Select:
+    """Delivery notes with names and window totals, newest first"""
+    # Line totals are stored on the note itself, so no aggregation is needed
+    return (
+        select(
+            DeliveryNote,
+            Customer.name,
+            User.full_name,
+            func.count().over().label("total_rows"),
+            func.max(DeliveryNote.updated_at).over().label("last_updated"),
+            # Renamed customers/users change the page without touching any note
+            func.max(Customer.updated_at).over().label("customers_updated"),
+            func.max(User.updated_at).over().label("users_updated"),
+        )
+        .outerjoin(Customer, DeliveryNote.customer_id == Customer.id)
+        .outerjoin(User, DeliveryNote.created_by == User.id)
+        .options(noload(DeliveryNote.items))
+        .where(*filters)
+        .order_by(DeliveryNote.created_at.desc())
+    )
+
+
+# Filter combinations the delivery notes screen sends most; each emits its own SQL
+_WARM_FILTERS = (
+    {},
+    {"status_filter": DeliveryNoteStatus.DRAFT},
+    {"customer_id": UUID(int=0)},
+    {"customer_id": UUID(int=0), "status_filter": DeliveryNoteStatus.DRAFT},
+)
+
+
+async def warm_delivery_note_queries(db: AsyncSession) -> None:
+    """
+    Run the common list query shapes once at startup.
+    
+    Fills SQLAlchemy's compiled cache and prepares the statements on the
+    connection used, so the first real requests skip compile and PREPARE.
+    LIMIT/OFFSET are bound parameters, so LIMIT 0 yields the same SQL.
+    """
+    for params in _WARM_FILTERS:
+        query = _delivery_note_list_query(_delivery_note_filters(**params))
+        await db.execute(query.offset(0).limit(0))
+
+
+@router.get("", response_model=PaginatedResponse[DeliveryNoteResponse])
+async def list_delivery_notes(
+    request: Request,
+    db: DbSession,
+    current_user: CurrentUser,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    customer_id: Optional[UUID] = None,
+    status_filter: Optional[DeliveryNoteStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Response:
+    """
+    List delivery notes with filters.
     
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    Responses carry an ETag over the filtered set's row count and latest
+    update, including the customers and users whose names are shown; a
+    matching If-None-Match gets 304 without loading the page.
+    """
+    filters = _delivery_note_filters(customer_id, status_filter, start_date, end_date)
+    
+    # Row count and latest changes of the filtered set fingerprint the list
+    fingerprint_query = (
+        select(
+            func.count(),
+            func.max(DeliveryNote.updated_at),
+            func.max(Customer.updated_at),
+            func.max(User.updated_at),
+        )
+        .select_from(DeliveryNote)
+        .outerjoin(Customer, DeliveryNote.customer_id == Customer.id)
+        .outerjoin(User, DeliveryNote.created_by == User.id)
+        .where(*filters)
+    )
+    etag_parts = ("delivery-notes", customer_id, status_filter, start_date, end_date, page, page_size)
+    if request.headers.get("if-none-match"):
+        total, *last_updated = (await db.execute(fingerprint_query)).one()
+        cached = not_modified(request, make_etag(*etag_parts, total, *last_updated))
+        if cached:
+            return cached
     
     # Paginate
+    query = _delivery_note_list_query(filters)
     query = query.offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(query)
-    notes = result.scalars().all()
+    rows = result.all()
+    if rows:
+        total = rows[0].total_rows
+        last_updated = [rows[0].last_updated, rows[0].customers_updated, rows[0].users_updated]
+    else:
+        # Past the last page no row carries the fingerprint; the ETag must
+        # match the one computed above for If-None-Match
+        total, *last_updated = (await db.execute(fingerprint_query)).one()
     
-    items = []
-    for dn in notes:
-        total_qty = sum(item.quantity for item in dn.items)
-        items.append({
-            "id": str(dn.id),
-            "delivery_note_number": dn.delivery_note_number,
-            "customer_id": str(dn.customer_id),
-            "customer_name": dn.customer.name if dn.customer else None,
-            "status": dn.status.value,
-            "issue_date": dn.issue_date.isoformat() if dn.issue_date else None,
-            "delivery_date": dn.delivery_date.isoformat() if dn.delivery_date else None,
-            "is_consignment": dn.is_consignment,
-            "notes": dn.notes,
-            "items_count": len(dn.items),
-            "total_quantity": float(total_qty),
-            "created_at": dn.created_at.isoformat(),
-            "created_by_name": dn.created_by_user.full_name if dn.created_by_user else None,
-        })
+    items = [
+        DeliveryNoteResponse.construct_from(
+            dn,
+            customer_name=customer_name,
+            created_by_name=created_by_name,
+        )
+        for dn, customer_name, created_by_name, *_ in rows
+    ]
     
     pages = (total + page_size - 1) // page_size if total > 0 else 1
     
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "pages": pages,
-    }
+    response = model_response(PaginatedResponse(
+        items=items,
+        total=total,
+        page=page,
+        page_size=page_size,
+        pages=pages,
+    ))
+    return set_etag(response, make_etag(*etag_parts, total, *last_updated))
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -133,7 +235,7 @@ async def create_delivery_note(
     request: CreateDeliveryNoteRequest,
     db: DbSession,
     current_user: WarehouseUser,
-) -> dict:
+) -> ORJSONResponse:
     """Create a new delivery note"""
     service = DocumentService(db)
     
@@ -154,12 +256,12 @@ async def create_delivery_note(
         
         await db.commit()
         
-        return {
-            "id": str(dn.id),
+        return ORJSONResponse({
+            "id": dn.id,
             "delivery_note_number": dn.delivery_note_number,
-            "status": dn.status.value,
-            "items_count": len(request.items),
-        }
+            "status": dn.status,
+            "items_count": dn.items_count,
+        }, status_code=status.HTTP_201_CREATED)
         
     except ValueError as e:
         raise HTTPException(
@@ -168,12 +270,12 @@ async def create_delivery_note(
         )
 
 
-@router.get("/{delivery_note_id}")
+@router.get("/{delivery_note_id}", response_model=DeliveryNoteDetailResponse)
 async def get_delivery_note(
     delivery_note_id: UUID,
     db: DbSession,
     current_user: CurrentUser,
-) -> dict:
+) -> Response:
     """Get delivery note details"""
     service = DocumentService(db)
     dn = await service.get_delivery_note_with_details(delivery_note_id)
@@ -184,37 +286,43 @@ async def get_delivery_note(
             detail="תעודת משלוח לא נמצאה",
         )
     
-    items = []
-    for item in dn.items:
-        items.append({
-            "id": str(item.id),
-            "item_id": str(item.item_id),
-            "item_sku": item.item.sku if item.item else None,
-            "item_name": item.item.name if item.item else None,
-            "batch_id": str(item.batch_id),
-            "batch_number": item.batch.batch_number if item.batch else None,
-            "expiration_date": item.batch.expiration_date.isoformat() if item.batch else None,
-            "quantity": float(item.quantity),
-            "unit": item.item.unit_of_measure if item.item else None,
-        })
-    
-    return {
-        "id": str(dn.id),
-        "delivery_note_number": dn.delivery_note_number,
-        "customer_id": str(dn.customer_id),
-        "customer_name": dn.customer.name if dn.customer else None,
-        "customer_address": dn.customer.address if dn.customer else None,
-        "customer_contact": dn.customer.contact_person if dn.customer else None,
-        "status": dn.status.value,
-        "issue_date": dn.issue_date.isoformat() if dn.issue_date else None,
-        "delivery_date": dn.delivery_date.isoformat() if dn.delivery_date else None,
-        "is_consignment": dn.is_consignment,
-        "notes": dn.notes,
-        "items": items,
-        "total_quantity": float(sum(i.quantity for i in dn.items)),
-        "created_at": dn.created_at.isoformat(),
-        "created_by_name": dn.created_by_user.full_name if dn.created_by_user else None,
+    # Lines of one SKU usually share the item (and sometimes the batch); read
+    # each related row's columns once and look them up by id per line
+    item_labels = {
+        line.item_id: (line.item.sku, line.item.name, line.item.unit_of_measure)
+        for line in dn.items if line.item is not None
     }
+    batch_labels = {
+        line.batch_id: (line.batch.batch_number, line.batch.expiration_date)
+        for line in dn.items if line.batch is not None
+    }
+    no_item = (None, None, None)
+    no_batch = (None, None)
+    
+    lines = []
+    for line in dn.items:
+        sku, name, unit = item_labels.get(line.item_id, no_item)
+        batch_number, expiration_date = batch_labels.get(line.batch_id, no_batch)
+        lines.append(DeliveryNoteLineResponse.construct_from(
+            line,
+            item_sku=sku,
+            item_name=name,
+            batch_number=batch_number,
+            expiration_date=expiration_date,
+            unit=unit,
+        ))
+    
+    customer = dn.customer
+    return model_response(DeliveryNoteDetailResponse.construct_from(
+        dn,
+        customer_name=customer.name if customer else None,
+        customer_address=customer.address if customer else None,
+        customer_contact=customer.contact_person if customer else None,
+        items=lines,
+        items_count=len(lines),
+        total_quantity=sum(line.quantity for line in dn.items),
+        created_by_name=dn.created_by_user.full_name if dn.created_by_user else None,
+    ))
 
 
 @router.put("/{delivery_note_id}/status")
@@ -223,7 +331,7 @@ async def update_delivery_note_status(
     request: UpdateStatusRequest,
     db: DbSession,
     current_user: WarehouseUser,
-) -> dict:
+) -> ORJSONResponse:
     """Update delivery note status"""
     service = DocumentService(db)
     
@@ -234,13 +342,13 @@ async def update_delivery_note_status(
         )
         await db.commit()
         
-        return {
-            "id": str(dn.id),
+        return ORJSONResponse({
+            "id": dn.id,
             "delivery_note_number": dn.delivery_note_number,
-            "status": dn.status.value,
-            "issue_date": dn.issue_date.isoformat() if dn.issue_date else None,
-            "delivery_date": dn.delivery_date.isoformat() if dn.delivery_date else None,
-        }
+            "status": dn.status,
+            "issue_date": dn.issue_date,
+            "delivery_date": dn.delivery_date,
+        })
         
     except ValueError as e:
         raise HTTPException(
@@ -252,26 +360,64 @@ async def update_delivery_note_status(
 @router.get("/{delivery_note_id}/pdf")
 async def get_delivery_note_pdf(
     delivery_note_id: UUID,
+    request: Request,
     db: DbSession,
     current_user: CurrentUser,
 ) -> Response:
-    """Generate and download delivery note PDF"""
+    """
+    Generate and download delivery note PDF.
+    
+    The ETag changes whenever the note, its customer, its creator or its
+    lines' items are updated, so clients holding the current PDF get 304 without it
+    being rendered again.
+    """
+    # Batch number and expiration, the batch data printed, cannot be edited
+    items_updated = (
+        select(func.max(Item.updated_at))
+        .join(DeliveryNoteItem, DeliveryNoteItem.item_id == Item.id)
+        .where(DeliveryNoteItem.delivery_note_id == DeliveryNote.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            DeliveryNote.updated_at,
+            DeliveryNote.status,
+            Customer.updated_at,
+            User.updated_at,
+            items_updated,
+        )
+        .outerjoin(Customer, DeliveryNote.customer_id == Customer.id)
+        .outerjoin(User, DeliveryNote.created_by == User.id)
+        .where(DeliveryNote.id == delivery_note_id)
+    )
+    fingerprint = result.one_or_none()
+    if fingerprint is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="תעודת משלוח לא נמצאה",
+        )
+    
+    etag = make_etag("delivery-note-pdf", delivery_note_id, *fingerprint)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
     service = DocumentService(db)
     
     try:
-        pdf_bytes = await service.generate_delivery_note_pdf(delivery_note_id)
-        
-        # Get DN number for filename
-        dn = await service.get_delivery_note_with_details(delivery_note_id)
-        filename = f"{dn.delivery_note_number}.pdf" if dn else "delivery_note.pdf"
+        buffer, delivery_note_number = await service.render_delivery_note_pdf(
+            delivery_note_id
+        )
+        filename = f"{delivery_note_number}.pdf"
         
-        return Response(
-            content=pdf_bytes,
+        return set_etag(StreamingResponse(
+            _iter_buffer(buffer),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(buffer.getbuffer().nbytes),
             }
-        )
+        ), etag)
         
     except ValueError as e:
         raise HTTPException(
@@ -1,19 +1,33 @@
 """Item/Inventory endpoints"""
+from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
 from app.api.deps import CurrentUser, DbSession, ManagerUser
+from app.api.responses import model_response
+from app.core.database import guard_lazy_loads
+from app.core.pagination import window_total
 from app.models.item import Item
 from app.models.batch import Batch, BatchStatus
 from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate
 from app.schemas.common import PaginatedResponse, MessageResponse
+from app.services.receiving_service import invalidate_barcode_cache
 
 router = APIRouter()
 
+# Single-item reads: the active stock aggregates come from SQL, and no
+# relationship (batches, delivery note lines) is loaded
+_ITEM_STOCK_OPTIONS = (
+    undefer(Item.total_quantity_available),
+    undefer(Item.active_batches_count),
+    undefer(Item.description),
+    guard_lazy_loads(),
+)
+
 
 @router.get("", response_model=PaginatedResponse[ItemResponse])
 async def list_items(
@@ -24,9 +38,30 @@ async def list_items(
     search: Optional[str] = None,
     supplier: Optional[str] = None,
     below_reorder: Optional[bool] = None,
-) -> PaginatedResponse[ItemResponse]:
+) -> Response:
     """List all items with pagination and filters"""
-    query = select(Item).options(selectinload(Item.batches))
+    # Aggregate active stock per item in SQL instead of loading every batch
+    stock = (
+        select(
+            Batch.item_id,
+            func.sum(Batch.quantity_available).label("quantity"),
+            func.count(Batch.id).label("batches"),
+        )
+        .where(Batch.status == BatchStatus.ACTIVE)
+        .group_by(Batch.item_id)
+        .subquery()
+    )
+    quantity_available = func.coalesce(stock.c.quantity, 0)
+    
+    query = (
+        select(
+            Item,
+            quantity_available.label("quantity_available"),
+            func.coalesce(stock.c.batches, 0).label("active_batches"),
+        )
+        .outerjoin(stock, stock.c.item_id == Item.id)
+        .options(undefer(Item.description), guard_lazy_loads())
+    )
     
     # Apply filters
     if search:
@@ -39,42 +74,42 @@ async def list_items(
     if supplier:
         query = query.where(Item.supplier.ilike(f"%{supplier}%"))
     
-    # Count total
+    # Filter before paginating so pages stay full
+    if below_reorder is not None:
+        if below_reorder:
+            query = query.where(quantity_available < Item.reorder_point)
+        else:
+            query = query.where(quantity_available >= Item.reorder_point)
+    
     count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    query = query.add_columns(func.count().over().label("total_rows"))
     
     # Paginate
     query = query.offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(query)
-    items = result.scalars().all()
+    rows = result.all()
+    total = await window_total(db, rows, page, count_query)
     
     # Convert to response with computed fields
     item_responses = []
-    for item in items:
-        response = ItemResponse.model_validate(item)
-        # Calculate computed fields
-        active_batches = [b for b in item.batches if b.status == BatchStatus.ACTIVE]
-        response.total_quantity_available = sum(b.quantity_available for b in active_batches)
-        response.total_inventory_value = response.total_quantity_available * item.cost_price
-        response.active_batches_count = len(active_batches)
-        response.is_below_reorder_point = response.total_quantity_available < item.reorder_point
-        
-        # Filter by below_reorder if specified
-        if below_reorder is not None:
-            if below_reorder == response.is_below_reorder_point:
-                item_responses.append(response)
-        else:
-            item_responses.append(response)
+    for item, quantity, active_batches, _ in rows:
+        item_responses.append(ItemResponse.construct_from(
+            item,
+            total_quantity_available=quantity,
+            total_inventory_value=quantity * item.cost_price,
+            active_batches_count=active_batches,
+            is_below_reorder_point=quantity < item.reorder_point,
+        ))
     
     pages = (total + page_size - 1) // page_size if total > 0 else 1
     
-    return PaginatedResponse(
+    return model_response(PaginatedResponse(
         items=item_responses,
         total=total,
         page=page,
         page_size=page_size,
         pages=pages,
-    )
+    ))
 
 
 @router.post("", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
@@ -97,15 +132,15 @@ async def create_item(
     item = Item(**item_data.model_dump())
     db.add(item)
     await db.commit()
-    await db.refresh(item)
     
-    response = ItemResponse.model_validate(item)
-    response.total_quantity_available = 0
-    response.total_inventory_value = 0
-    response.active_batches_count = 0
-    response.is_below_reorder_point = True
-    
-    return response
+    # A new item has no batches yet; don't touch the unloaded collection
+    return ItemResponse.construct_from(
+        item,
+        total_quantity_available=Decimal("0"),
+        total_inventory_value=Decimal("0"),
+        active_batches_count=0,
+        is_below_reorder_point=item.reorder_point > 0,
+    )
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
@@ -117,7 +152,7 @@ async def get_item(
     """Get item by ID"""
     result = await db.execute(
         select(Item)
-        .options(selectinload(Item.batches))
+        .options(*_ITEM_STOCK_OPTIONS)
         .where(Item.id == item_id)
     )
     item = result.scalar_one_or_none()
@@ -128,14 +163,7 @@ async def get_item(
             detail="פריט לא נמצא",  # Item not found
         )
     
-    response = ItemResponse.model_validate(item)
-    active_batches = [b for b in item.batches if b.status == BatchStatus.ACTIVE]
-    response.total_quantity_available = sum(b.quantity_available for b in active_batches)
-    response.total_inventory_value = response.total_quantity_available * item.cost_price
-    response.active_batches_count = len(active_batches)
-    response.is_below_reorder_point = response.total_quantity_available < item.reorder_point
-    
-    return response
+    return ItemResponse.model_validate(item)
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
@@ -148,7 +176,7 @@ async def update_item(
     """Update an item"""
     result = await db.execute(
         select(Item)
-        .options(selectinload(Item.batches))
+        .options(*_ITEM_STOCK_OPTIONS)
         .where(Item.id == item_id)
     )
     item = result.scalar_one_or_none()
@@ -170,22 +198,26 @@ async def update_item(
                 detail=f"מק\"ט {item_data.sku} כבר קיים",
             )
     
+    # The flush expires the SQL aggregates; editing the item leaves them unchanged
+    previous_sku = item.sku
+    quantity = item.total_quantity_available
+    active_batches = item.active_batches_count
+    
     # Update fields
     update_data = item_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(item, field, value)
     
     await db.commit()
-    await db.refresh(item)
+    await invalidate_barcode_cache([previous_sku, item.sku])
     
-    response = ItemResponse.model_validate(item)
-    active_batches = [b for b in item.batches if b.status == BatchStatus.ACTIVE]
-    response.total_quantity_available = sum(b.quantity_available for b in active_batches)
-    response.total_inventory_value = response.total_quantity_available * item.cost_price
-    response.active_batches_count = len(active_batches)
-    response.is_below_reorder_point = response.total_quantity_available < item.reorder_point
-    
-    return response
+    return ItemResponse.construct_from(
+        item,
+        total_quantity_available=quantity,
+        total_inventory_value=quantity * item.cost_price,
+        active_batches_count=active_batches,
+        is_below_reorder_point=quantity < item.reorder_point,
+    )
 
 
 @router.delete("/{item_id}", response_model=MessageResponse)
@@ -218,6 +250,7 @@ async def delete_item(
     
     await db.delete(item)
     await db.commit()
+    await invalidate_barcode_cache([item.sku])
     
     return MessageResponse(
         message=f"פריט {item.sku} נמחק בהצלחה",  # Item deleted successfully
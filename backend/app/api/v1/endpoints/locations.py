@@ -2,13 +2,15 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from app.api.deps import CurrentUser, DbSession, ManagerUser
+from app.api.responses import model_response
+from app.core.pagination import window_total
 from app.models.location import Location
-from app.models.batch import BatchStatus
+from app.models.batch import Batch, BatchStatus
 from app.schemas.location import LocationCreate, LocationResponse, LocationUpdate
 from app.schemas.common import PaginatedResponse, MessageResponse
 
@@ -23,9 +25,28 @@ async def list_locations(
     page_size: int = Query(20, ge=1, le=100),
     warehouse: Optional[str] = None,
     is_active: Optional[bool] = True,
-) -> PaginatedResponse[LocationResponse]:
+) -> Response:
     """List all locations"""
-    query = select(Location).options(selectinload(Location.batches))
+    # Count batches per location in SQL instead of loading every batch
+    counts = (
+        select(
+            Batch.location_id,
+            func.count(Batch.id).label("batches"),
+            func.count(Batch.id).filter(Batch.status == BatchStatus.ACTIVE).label("active"),
+        )
+        .group_by(Batch.location_id)
+        .subquery()
+    )
+    
+    query = (
+        select(
+            Location,
+            func.coalesce(counts.c.batches, 0),
+            func.coalesce(counts.c.active, 0),
+        )
+        .outerjoin(counts, counts.c.location_id == Location.id)
+        .options(noload(Location.batches))
+    )
     
     if warehouse:
         query = query.where(Location.warehouse.ilike(f"%{warehouse}%"))
@@ -33,34 +54,34 @@ async def list_locations(
     if is_active is not None:
         query = query.where(Location.is_active == is_active)
     
-    # Count total
     count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    query = query.add_columns(func.count().over().label("total_rows"))
     
     # Paginate
     query = query.offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(query)
-    locations = result.scalars().all()
+    rows = result.all()
+    total = await window_total(db, rows, page, count_query)
     
     # Convert to response
-    location_responses = []
-    for location in locations:
-        response = LocationResponse.model_validate(location)
-        response.batches_count = len(location.batches)
-        response.active_batches_count = len([
-            b for b in location.batches if b.status == BatchStatus.ACTIVE
-        ])
-        location_responses.append(response)
+    location_responses = [
+        LocationResponse.construct_from(
+            location,
+            batches_count=batches_count,
+            active_batches_count=active_count,
+        )
+        for location, batches_count, active_count, _ in rows
+    ]
     
     pages = (total + page_size - 1) // page_size if total > 0 else 1
     
-    return PaginatedResponse(
+    return model_response(PaginatedResponse(
         items=location_responses,
         total=total,
         page=page,
         page_size=page_size,
         pages=pages,
-    )
+    ))
 
 
 @router.post("", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
@@ -97,13 +118,13 @@ async def create_location(
     
     db.add(location)
     await db.commit()
-    await db.refresh(location)
-    
-    response = LocationResponse.model_validate(location)
-    response.batches_count = 0
-    response.active_batches_count = 0
     
-    return response
+    # A new location has no batches yet; don't touch the unloaded collection
+    return LocationResponse.construct_from(
+        location,
+        batches_count=0,
+        active_batches_count=0,
+    )
 
 
 @router.get("/{location_id}", response_model=LocationResponse)
@@ -162,7 +183,6 @@ async def update_location(
         setattr(location, field, value)
     
     await db.commit()
-    await db.refresh(location)
     
     response = LocationResponse.model_validate(location)
     response.batches_count = len(location.batches)
@@ -1,23 +1,96 @@
 """Movement history and audit trail endpoints"""
-from datetime import date
-from typing import List, Optional
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from pydantic import BaseModel
 
-from app.api.deps import CurrentUser, DbSession
-from app.models.movement import MovementType
+from app.api.deps import CurrentUser, DbSession, SessionFactory
+from app.api.responses import model_response
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.movement import Movement, MovementType
 from app.services.inventory_service import InventoryService
-from app.schemas.movement import MovementResponse
+from app.schemas.common import DecimalNumber
+from app.schemas.movement import MovementRowResponse
 
 router = APIRouter()
 
 
 class MovementHistoryResponse(BaseModel):
     """Response containing movement history"""
-    movements: List[dict]
+    movements: List[MovementRowResponse]
     total: int
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class BatchMovementsResponse(MovementHistoryResponse):
+    """Movement history of a single batch"""
+    batch_id: UUID
+
+
+class MovementSummary(BaseModel):
+    """Quantity totals per movement type"""
+    total_received: DecimalNumber
+    total_dispatched: DecimalNumber
+    total_scrapped: DecimalNumber
+
+
+class ItemMovementsResponse(MovementHistoryResponse):
+    """Movement history of an item across all its batches"""
+    item_id: UUID
+    summary: MovementSummary
+
+
+def _movement_row(m: Movement, user_names: dict, batches: dict) -> MovementRowResponse:
+    """Build a history row from labels looked up once per page"""
+    batch = batches.get(m.batch_id)
+    return MovementRowResponse.construct_from(
+        m,
+        batch_number=batch.batch_number if batch else None,
+        item_sku=batch.sku if batch else None,
+        item_name=batch.name if batch else None,
+        user_name=user_names.get(m.user_id),
+    )
+
+
+def _decode_after(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    """Decode a history cursor into the (timestamp, id) of the last movement seen"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, datetime.fromisoformat, UUID)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="סמן עימוד לא תקין",  # Invalid pagination cursor
+        )
+
+
+async def _history_page(
+    service: InventoryService,
+    movements: List[Movement],
+    limit: int,
+) -> dict:
+    """Response fields for movements fetched with one extra row past `limit`"""
+    has_more = len(movements) > limit
+    movements = movements[:limit]
+    next_cursor = None
+    if has_more:
+        last = movements[-1]
+        next_cursor = encode_cursor(last.timestamp.isoformat(), last.id)
+    
+    user_names, batches = await service.get_movement_labels(movements)
+    rows = [_movement_row(m, user_names, batches) for m in movements]
+    return {
+        "movements": rows,
+        "total": len(rows),
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
 
 
 @router.get("", response_model=MovementHistoryResponse)
@@ -30,12 +103,15 @@ async def get_movement_history(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     limit: int = Query(100, ge=1, le=500),
-) -> MovementHistoryResponse:
+    cursor: Optional[str] = None,
+) -> Response:
     """
     Get movement history with optional filters.
     
-    Provides audit trail for inventory changes.
+    Provides audit trail for inventory changes, newest first. Pass the
+    returned `next_cursor` back as `cursor` to fetch older movements.
     """
+    after = _decode_after(cursor)
     service = InventoryService(db)
     
     movements = await service.get_movements_history(
@@ -44,125 +120,81 @@ async def get_movement_history(
         movement_type=movement_type,
         start_date=start_date,
         end_date=end_date,
-        limit=limit,
+        limit=limit + 1,
+        after=after,
     )
     
-    # Convert to response format
-    movements_data = []
-    for m in movements:
-        movements_data.append({
-            "id": str(m.id),
-            "batch_id": str(m.batch_id),
-            "batch_number": m.batch.batch_number if m.batch else None,
-            "item_sku": m.batch.item.sku if m.batch and m.batch.item else None,
-            "item_name": m.batch.item.name if m.batch and m.batch.item else None,
-            "user_id": str(m.user_id),
-            "user_name": m.user.full_name if m.user else None,
-            "movement_type": m.movement_type.value,
-            "quantity": float(m.quantity),
-            "quantity_before": float(m.quantity_before),
-            "quantity_after": float(m.quantity_after),
-            "reference_number": m.reference_number,
-            "timestamp": m.timestamp.isoformat(),
-            "notes": m.notes,
-        })
-    
-    return MovementHistoryResponse(
-        movements=movements_data,
-        total=len(movements_data),
-    )
+    page = await _history_page(service, movements, limit)
+    return model_response(MovementHistoryResponse(**page))
 
 
-@router.get("/by-batch/{batch_id}")
+@router.get("/by-batch/{batch_id}", response_model=BatchMovementsResponse)
 async def get_batch_movements(
     batch_id: UUID,
     db: DbSession,
     current_user: CurrentUser,
     limit: int = Query(50, ge=1, le=200),
-) -> dict:
+    cursor: Optional[str] = None,
+) -> Response:
     """Get all movements for a specific batch"""
+    after = _decode_after(cursor)
     service = InventoryService(db)
     
     movements = await service.get_movements_history(
         batch_id=batch_id,
-        limit=limit,
+        limit=limit + 1,
+        after=after,
     )
     
-    movements_data = []
-    for m in movements:
-        movements_data.append({
-            "id": str(m.id),
-            "movement_type": m.movement_type.value,
-            "quantity": float(m.quantity),
-            "quantity_before": float(m.quantity_before),
-            "quantity_after": float(m.quantity_after),
-            "reference_number": m.reference_number,
-            "timestamp": m.timestamp.isoformat(),
-            "user_name": m.user.full_name if m.user else None,
-            "notes": m.notes,
-        })
-    
-    return {
-        "batch_id": str(batch_id),
-        "movements": movements_data,
-        "total": len(movements_data),
-    }
+    page = await _history_page(service, movements, limit)
+    return model_response(BatchMovementsResponse(batch_id=batch_id, **page))
 
 
-@router.get("/by-item/{item_id}")
+@router.get("/by-item/{item_id}", response_model=ItemMovementsResponse)
 async def get_item_movements(
     item_id: UUID,
     db: DbSession,
+    session_factory: SessionFactory,
     current_user: CurrentUser,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     limit: int = Query(100, ge=1, le=500),
-) -> dict:
-    """Get all movements for a specific item across all batches"""
-    service = InventoryService(db)
+    cursor: Optional[str] = None,
+) -> Response:
+    """
+    Get all movements for a specific item across all batches.
     
-    movements = await service.get_movements_history(
-        item_id=item_id,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
-    )
+    The summary covers every movement in the date range, not just the
+    returned page; it is aggregated in SQL on a second session so both
+    queries run concurrently.
+    """
+    after = _decode_after(cursor)
     
-    # Calculate summary
-    total_received = sum(
-        m.quantity for m in movements if m.movement_type == MovementType.RECEIPT
-    )
-    total_dispatched = sum(
-        m.quantity for m in movements if m.movement_type == MovementType.DISPATCH
-    )
-    total_scrapped = sum(
-        m.quantity for m in movements if m.movement_type == MovementType.SCRAP
-    )
+    async def summarize():
+        async with session_factory() as session:
+            return await InventoryService(session).get_movement_summary(
+                item_id, start_date, end_date
+            )
     
-    movements_data = []
-    for m in movements:
-        movements_data.append({
-            "id": str(m.id),
-            "batch_id": str(m.batch_id),
-            "batch_number": m.batch.batch_number if m.batch else None,
-            "movement_type": m.movement_type.value,
-            "quantity": float(m.quantity),
-            "quantity_before": float(m.quantity_before),
-            "quantity_after": float(m.quantity_after),
-            "reference_number": m.reference_number,
-            "timestamp": m.timestamp.isoformat(),
-            "user_name": m.user.full_name if m.user else None,
-            "notes": m.notes,
-        })
+    service = InventoryService(db)
+    totals, movements = await asyncio.gather(
+        summarize(),
+        service.get_movements_history(
+            item_id=item_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit + 1,
+            after=after,
+        ),
+    )
     
-    return {
-        "item_id": str(item_id),
-        "summary": {
-            "total_received": float(total_received),
-            "total_dispatched": float(total_dispatched),
-            "total_scrapped": float(total_scrapped),
-        },
-        "movements": movements_data,
-        "total": len(movements_data),
-    }
-
+    page = await _history_page(service, movements, limit)
+    return model_response(ItemMovementsResponse(
+        item_id=item_id,
+        summary=MovementSummary(
+            total_received=totals.get(MovementType.RECEIPT, Decimal("0")),
+            total_dispatched=totals.get(MovementType.DISPATCH, Decimal("0")),
+            total_scrapped=totals.get(MovementType.SCRAP, Decimal("0")),
+        ),
+        **page,
+    ))
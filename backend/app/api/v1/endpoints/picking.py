@@ -5,11 +5,22 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from app.api.deps import DbSession, WarehouseUser
-from app.services.fefo_engine import FEFOEngine
+from app.api.responses import DecimalORJSONResponse
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.schemas.common import BaseSchema, DecimalNumber, Quantity
+from app.services.fefo_engine import (
+    FEFOEngine,
+    fefo_suggest_cache_key,
+    fefo_summary_cache_key,
+    invalidate_fefo_cache,
+)
 from app.services.inventory_service import InventoryService
+from app.services.reference_allocator import dispatch_reference_allocator
 from app.models.movement import MovementType
 
 router = APIRouter()
@@ -18,19 +29,19 @@ router = APIRouter()
 class PickingSuggestionRequest(BaseModel):
     """Request for picking suggestions"""
     item_id: UUID
-    quantity_needed: Decimal = Field(..., gt=0)
+    quantity_needed: Quantity
 
 
 class BatchPickRequest(BaseModel):
     """Request to pick from a specific batch"""
     batch_id: UUID
-    quantity: Decimal = Field(..., gt=0)
+    quantity: Quantity
 
 
 class DispatchItem(BaseModel):
     """Item in a dispatch request"""
     batch_id: UUID
-    quantity: Decimal = Field(..., gt=0)
+    quantity: Quantity
 
 
 class DispatchRequest(BaseModel):
@@ -49,41 +60,83 @@ class DispatchResponse(BaseModel):
     movements: List[dict]
 
 
+class ExpirationBucket(BaseSchema):
+    """Quantity and batch count at one expiration risk level"""
+    quantity: DecimalNumber
+    batches: int
+
+
+class ExpirationBreakdown(BaseSchema):
+    """Expiration risk levels of an item's inventory"""
+    expired: ExpirationBucket
+    critical_30_days: ExpirationBucket
+    warning_60_days: ExpirationBucket
+    caution_90_days: ExpirationBucket
+    safe: ExpirationBucket
+
+
+class ExpirationSummaryResponse(BaseSchema):
+    """Expiration breakdown for an item"""
+    item_id: UUID
+    total_quantity: DecimalNumber
+    total_batches: int
+    breakdown: ExpirationBreakdown
+
+
+# FEFOEngine warning levels -> breakdown fields
+_BREAKDOWN_FIELDS = {
+    "expired": "expired",
+    "critical": "critical_30_days",
+    "warning": "warning_60_days",
+    "caution": "caution_90_days",
+    "safe": "safe",
+}
+
+
 @router.post("/suggest-batches")
 async def suggest_batches_for_picking(
     request: PickingSuggestionRequest,
     db: DbSession,
     current_user: WarehouseUser,
-) -> dict:
+) -> DecimalORJSONResponse:
     """
     Get FEFO-sorted batch suggestions for picking.
     
     Returns batches ordered by expiration date (soonest first)
-    with suggested quantities to pick from each.
+    with suggested quantities to pick from each. Results are cached in
+    Redis until stock of the item changes.
     """
     fefo = FEFOEngine(db)
     
-    # Check if we can fulfill the request
-    total_available = await fefo.get_total_available(request.item_id)
-    
-    if total_available < request.quantity_needed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"כמות לא מספיקה במלאי. זמין: {total_available}, נדרש: {request.quantity_needed}",
+    async def suggest() -> dict:
+        # Check if we can fulfill the request
+        total_available = await fefo.get_total_available(request.item_id)
+        
+        if total_available < request.quantity_needed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"כמות לא מספיקה במלאי. זמין: {total_available}, נדרש: {request.quantity_needed}",
+            )
+        
+        suggestions = await fefo.suggest_batches_for_picking(
+            item_id=request.item_id,
+            quantity_needed=request.quantity_needed,
         )
+        
+        # orjson writes the dataclasses, UUIDs, dates and Decimals directly
+        return {
+            "item_id": request.item_id,
+            "quantity_needed": request.quantity_needed,
+            "total_available": total_available,
+            "suggestions": suggestions,
+            "can_fulfill": True,
+        }
     
-    suggestions = await fefo.suggest_batches_for_picking(
-        item_id=request.item_id,
-        quantity_needed=request.quantity_needed,
-    )
-    
-    return {
-        "item_id": str(request.item_id),
-        "quantity_needed": float(request.quantity_needed),
-        "total_available": float(total_available),
-        "suggestions": [s.to_dict() for s in suggestions],
-        "can_fulfill": True,
-    }
+    return DecimalORJSONResponse(await redis_client.get_or_set(
+        fefo_suggest_cache_key(request.item_id, request.quantity_needed),
+        suggest,
+        settings.fefo_cache_ttl_seconds,
+    ))
 
 
 @router.post("/validate-pick")
@@ -91,7 +144,7 @@ async def validate_pick(
     request: BatchPickRequest,
     db: DbSession,
     current_user: WarehouseUser,
-) -> dict:
+) -> DecimalORJSONResponse:
     """
     Validate a picking operation before execution.
     
@@ -114,7 +167,13 @@ async def validate_pick(
             },
         )
     
-    return validation.to_dict()
+    return DecimalORJSONResponse({
+        "is_valid": validation.is_valid,
+        "batch_id": validation.batch_id,
+        "quantity": validation.quantity,
+        "errors": validation.errors,
+        "warnings": validation.warnings,
+    })
 
 
 @router.post("/execute-pick")
@@ -124,7 +183,7 @@ async def execute_pick(
     current_user: WarehouseUser,
     reference_number: Optional[str] = None,
     notes: Optional[str] = None,
-) -> dict:
+) -> DecimalORJSONResponse:
     """
     Execute a single pick operation from a batch.
     Records the movement and updates batch quantity.
@@ -158,15 +217,16 @@ async def execute_pick(
         )
         
         await db.commit()
+        await invalidate_fefo_cache([validation.item_id])
         
-        return {
+        return DecimalORJSONResponse({
             "success": True,
-            "movement_id": str(movement.id),
-            "batch_id": str(request.batch_id),
-            "quantity": float(request.quantity),
-            "quantity_remaining": float(movement.quantity_after),
+            "movement_id": movement.id,
+            "batch_id": request.batch_id,
+            "quantity": request.quantity,
+            "quantity_remaining": movement.quantity_after,
             "warnings": validation.warnings,
-        }
+        })
         
     except ValueError as e:
         raise HTTPException(
@@ -180,7 +240,7 @@ async def create_dispatch(
     request: DispatchRequest,
     db: DbSession,
     current_user: WarehouseUser,
-) -> DispatchResponse:
+) -> DecimalORJSONResponse:
     """
     Create a dispatch with multiple items.
     
@@ -189,14 +249,12 @@ async def create_dispatch(
     fefo = FEFOEngine(db)
     inventory = InventoryService(db)
     
-    # Validate all picks first
+    # Validate all picks first - two queries however many items there are
+    validations = await fefo.validate_picking_bulk(
+        [(item.batch_id, item.quantity) for item in request.items]
+    )
     all_warnings = []
-    for item in request.items:
-        validation = await fefo.validate_picking(
-            batch_id=item.batch_id,
-            quantity=item.quantity,
-        )
-        
+    for item, validation in zip(request.items, validations):
         if not validation.is_valid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -211,42 +269,39 @@ async def create_dispatch(
     # Generate reference number if not provided
     ref_number = request.reference_number
     if not ref_number:
-        from app.services.receiving_service import ReceivingService
-        receiving = ReceivingService(db)
-        ref_number = await receiving.generate_batch_number(prefix="DSP")
+        ref_number = await dispatch_reference_allocator.take(db)
     
     # Execute all picks
-    movements = []
-    total_quantity = Decimal("0")
-    
     try:
-        for item in request.items:
-            movement = await inventory.record_movement(
-                batch_id=item.batch_id,
-                movement_type=MovementType.DISPATCH,
-                quantity=item.quantity,
-                user_id=current_user.id,
-                reference_number=ref_number,
-                notes=request.notes,
-            )
-            
-            movements.append({
-                "movement_id": str(movement.id),
-                "batch_id": str(item.batch_id),
-                "quantity": float(item.quantity),
-                "quantity_remaining": float(movement.quantity_after),
-            })
-            total_quantity += item.quantity
+        recorded = await inventory.record_movements_bulk(
+            [(item.batch_id, item.quantity) for item in request.items],
+            movement_type=MovementType.DISPATCH,
+            user_id=current_user.id,
+            reference_number=ref_number,
+            notes=request.notes,
+        )
+        
+        movements = [
+            {
+                "movement_id": movement["id"],
+                "batch_id": item.batch_id,
+                "quantity": item.quantity,
+                "quantity_remaining": movement["quantity_after"],
+            }
+            for item, movement in zip(request.items, recorded)
+        ]
+        total_quantity = sum((item.quantity for item in request.items), Decimal("0"))
         
         await db.commit()
+        await invalidate_fefo_cache(v.item_id for v in validations)
         
-        return DispatchResponse(
-            success=True,
-            reference_number=ref_number,
-            items_dispatched=len(movements),
-            total_quantity=total_quantity,
-            movements=movements,
-        )
+        return DecimalORJSONResponse({
+            "success": True,
+            "reference_number": ref_number,
+            "items_dispatched": len(movements),
+            "total_quantity": total_quantity,
+            "movements": movements,
+        })
         
     except ValueError as e:
         raise HTTPException(
@@ -255,45 +310,37 @@ async def create_dispatch(
         )
 
 
-@router.get("/expiration-summary/{item_id}")
+@router.get("/expiration-summary/{item_id}", response_model=ExpirationSummaryResponse)
 async def get_expiration_summary(
     item_id: UUID,
     db: DbSession,
     current_user: WarehouseUser,
-) -> dict:
+) -> ORJSONResponse:
     """
     Get expiration breakdown for an item's inventory.
     Shows quantities by expiration risk level.
     """
+    summary = await redis_client.get_or_set(
+        fefo_summary_cache_key(item_id),
+        lambda: _expiration_summary(db, item_id),
+        settings.fefo_cache_ttl_seconds,
+    )
+    # Already JSON-ready (fresh or from Redis) - skip response_model validation
+    return ORJSONResponse(summary)
+
+
+async def _expiration_summary(db: DbSession, item_id: UUID) -> dict:
+    """Expiration breakdown as returned by the endpoint (cached in Redis)"""
     fefo = FEFOEngine(db)
     summary = await fefo.get_expiration_summary(item_id)
     
-    # Convert Decimals to floats for JSON serialization
-    return {
-        "item_id": str(item_id),
-        "total_quantity": float(summary["total_quantity"]),
-        "total_batches": summary["total_batches"],
-        "breakdown": {
-            "expired": {
-                "quantity": float(summary["expired"]["quantity"]),
-                "batches": summary["expired"]["batches"],
-            },
-            "critical_30_days": {
-                "quantity": float(summary["critical"]["quantity"]),
-                "batches": summary["critical"]["batches"],
-            },
-            "warning_60_days": {
-                "quantity": float(summary["warning"]["quantity"]),
-                "batches": summary["warning"]["batches"],
-            },
-            "caution_90_days": {
-                "quantity": float(summary["caution"]["quantity"]),
-                "batches": summary["caution"]["batches"],
-            },
-            "safe": {
-                "quantity": float(summary["safe"]["quantity"]),
-                "batches": summary["safe"]["batches"],
-            },
-        }
+    breakdown = {
+        field: ExpirationBucket(**summary[level])
+        for level, field in _BREAKDOWN_FIELDS.items()
     }
-
+    return ExpirationSummaryResponse(
+        item_id=item_id,
+        total_quantity=summary["total_quantity"],
+        total_batches=summary["total_batches"],
+        breakdown=ExpirationBreakdown(**breakdown),
+    ).model_dump(mode="json")
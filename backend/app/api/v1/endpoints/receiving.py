@@ -8,9 +8,13 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
 from app.api.deps import DbSession, WarehouseUser
-from app.services.receiving_service import ReceivingService
+from app.api.responses import DecimalORJSONResponse
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.services.fefo_engine import invalidate_fefo_cache
+from app.services.receiving_service import ReceivingService, barcode_cache_key
 from app.schemas.batch import BatchResponse
-from app.schemas.common import MessageResponse
+from app.schemas.common import MessageResponse, Quantity
 
 router = APIRouter()
 
@@ -18,7 +22,7 @@ router = APIRouter()
 class GoodsReceiptItem(BaseModel):
     """Single item in goods receipt"""
     item_id: UUID
-    quantity: Decimal = Field(..., gt=0)
+    quantity: Quantity
     expiration_date: date
     batch_number: Optional[str] = None
     supplier_batch_number: Optional[str] = None
@@ -43,7 +47,7 @@ class GoodsReceiptResponse(BaseModel):
 class SingleReceiptRequest(BaseModel):
     """Request to receive a single item"""
     item_id: UUID
-    quantity: Decimal = Field(..., gt=0)
+    quantity: Quantity
     expiration_date: date
     batch_number: Optional[str] = None
     supplier_batch_number: Optional[str] = None
@@ -88,6 +92,7 @@ async def receive_single_item(
         )
         
         await db.commit()
+        await invalidate_fefo_cache([batch.item_id])
         
         # Check for expiration warning
         warning = service.validate_expiration_warning(receipt.expiration_date)
@@ -115,7 +120,7 @@ async def receive_multiple_items(
     request: GoodsReceiptRequest,
     db: DbSession,
     current_user: WarehouseUser,
-) -> GoodsReceiptResponse:
+) -> DecimalORJSONResponse:
     """
     Receive multiple items in a single GRN (Goods Receipt Note).
     """
@@ -141,34 +146,35 @@ async def receive_multiple_items(
         )
         
         await db.commit()
+        await invalidate_fefo_cache(batch.item_id for batch in batches)
         
         # Collect warnings
-        warnings = []
-        items_response = []
-        
-        for i, batch in enumerate(batches):
-            warning = service.validate_expiration_warning(batch.expiration_date)
-            if warning:
-                warning["batch_number"] = batch.batch_number
-                warnings.append(warning)
-            
-            items_response.append({
-                "batch_id": str(batch.id),
+        today = date.today()
+        warnings = [
+            {**warning, "batch_number": batch.batch_number}
+            for batch in batches
+            if (warning := service.validate_expiration_warning(batch.expiration_date, today=today))
+        ]
+        items_response = [
+            {
+                "batch_id": batch.id,
                 "batch_number": batch.batch_number,
-                "item_id": str(batch.item_id),
-                "quantity": float(batch.quantity_received),
-                "expiration_date": batch.expiration_date.isoformat(),
-            })
+                "item_id": batch.item_id,
+                "quantity": batch.quantity_received,
+                "expiration_date": batch.expiration_date,
+            }
+            for batch in batches
+        ]
         
         total_quantity = sum(b.quantity_received for b in batches)
         
-        return GoodsReceiptResponse(
-            grn_number=grn_number,
-            batches_created=len(batches),
-            total_quantity=total_quantity,
-            items=items_response,
-            warnings=warnings,
-        )
+        return DecimalORJSONResponse({
+            "grn_number": grn_number,
+            "batches_created": len(batches),
+            "total_quantity": total_quantity,
+            "items": items_response,
+            "warnings": warnings,
+        })
         
     except ValueError as e:
         raise HTTPException(
@@ -182,33 +188,28 @@ async def validate_barcode(
     sku: str,
     db: DbSession,
     current_user: WarehouseUser,
-) -> dict:
+) -> DecimalORJSONResponse:
     """
     Validate a scanned barcode/SKU and return item info.
-    Used for barcode scanning during goods receipt.
+    Used for barcode scanning during goods receipt. Known SKUs are cached
+    in Redis until the item is updated or deleted.
     """
-    from sqlalchemy import select
-    from app.models.item import Item
-    
-    result = await db.execute(
-        select(Item).where(Item.sku == sku)
-    )
-    item = result.scalar_one_or_none()
+    service = ReceivingService(db)
     
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"מק\"ט {sku} לא נמצא במערכת",  # SKU not found
-        )
+    async def lookup() -> dict:
+        item = await service.lookup_barcode(sku)
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"מק\"ט {sku} לא נמצא במערכת",  # SKU not found
+            )
+        return item
     
-    return {
-        "item_id": str(item.id),
-        "sku": item.sku,
-        "name": item.name,
-        "supplier": item.supplier,
-        "unit_of_measure": item.unit_of_measure,
-        "cost_price": float(item.cost_price),
-    }
+    return DecimalORJSONResponse(await redis_client.get_or_set(
+        barcode_cache_key(sku),
+        lookup,
+        settings.barcode_cache_ttl_seconds,
+    ))
 
 
 @router.get("/generate-batch-number")
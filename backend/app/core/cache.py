@@ -0,0 +1,75 @@
+"""In-process caching utilities"""
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire after a fixed TTL"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the oldest entry when full"""
+        if key not in self._data and len(self._data) >= self.maxsize:
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry"""
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._data.clear()
+    
+    async def get_or_set(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Get a cached value, computing and caching it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = await factory()
+            self.set(key, value)
+        return value
+
+
+def invalidate_on_flush(cache: TTLCache, *models: type) -> None:
+    """
+    Clear `cache` whenever a session writes to any of `models`.
+    
+    Covers flushed ORM objects as well as ORM bulk statements
+    (`session.execute(insert(Model), rows)` and the like), which bypass
+    the flush.
+    """
+    
+    @event.listens_for(Session, "after_flush")
+    def _clear(session: Session, flush_context) -> None:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, models):
+                cache.clear()
+                return
+    
+    @event.listens_for(Session, "do_orm_execute")
+    def _clear_bulk(execute_state: ORMExecuteState) -> None:
+        if execute_state.is_select:
+            return
+        mapper = execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, models):
+            cache.clear()
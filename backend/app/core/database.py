@@ -1,12 +1,14 @@
 """Database configuration and session management"""
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from uuid import uuid4
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import DeclarativeBase, Load, lazyload, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
 
@@ -16,13 +18,99 @@ class Base(DeclarativeBase):
     pass
 
 
+def _engine_options() -> dict:
+    """Pool and driver options for the async engine"""
+    options: dict = {
+        "echo": settings.db_echo,
+        "pool_pre_ping": True,
+        "query_cache_size": settings.db_query_cache_size,
+    }
+    
+    if settings.is_development:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            # Reuse the most recently returned connection so idle ones can age out
+            pool_use_lifo=True,
+        )
+    
+    if settings.database_url.startswith("postgresql+asyncpg"):
+        # Short OLTP queries gain nothing from JIT compilation, and the timeouts
+        # cancel runaway work before it ties up the pool. Both statement
+        # caches are sized to hold every filter variant of the list queries.
+        options["connect_args"] = {
+            "server_settings": {
+                "jit": "off",
+                "statement_timeout": str(settings.db_statement_timeout_ms),
+                "lock_timeout": str(settings.db_lock_timeout_ms),
+                "idle_in_transaction_session_timeout": str(settings.db_idle_in_transaction_timeout_ms),
+            },
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        }
+        if settings.db_behind_pgbouncer:
+            # Statements may land on another server connection: don't cache
+            # them, and give each a unique name so they cannot collide there.
+            # The compiled SQL is still cached by SQLAlchemy (query_cache_size).
+            options["connect_args"].update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+            )
+    
+    return options
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.db_echo,
-    poolclass=NullPool if settings.is_development else None,
-    pool_pre_ping=True,
-)
+engine = create_async_engine(settings.database_url, **_engine_options())
+
+
+def get_pool_status() -> dict:
+    """Connection pool statistics (counters are absent for NullPool)"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if counter is not None:
+            status[name] = counter()
+    return status
+
+
+def guard_lazy_loads(option: Optional[Load] = None) -> Load:
+    """
+    Wildcard loader for relationships a query did not load explicitly.
+    
+    Pass a loader chain to guard the entity it ends on, or nothing to guard
+    the lead entity. Outside production unplanned loads raise so N+1 access
+    patterns fail in tests; production falls back to plain lazy loading.
+    Relationships are lazy at the mapper level, so every query that needs
+    one loads it explicitly (selectinload/joinedload).
+    """
+    if settings.is_production:
+        return lazyload("*") if option is None else option.lazyload("*")
+    return raiseload("*") if option is None else option.raiseload("*")
+
+
+def explicit_loads(*loads: Load) -> tuple[Load, ...]:
+    """
+    Loader options for a query that loads exactly `loads` and nothing else.
+    
+    Adds `guard_lazy_loads` for the lead entity and for every entity the
+    chains end on. Read paths that walk relationships in a loop should use
+    it, so a newly touched relationship fails in tests instead of adding
+    one query per row.
+    """
+    return (
+        *loads,
+        guard_lazy_loads(),
+        *(guard_lazy_loads(load) for load in loads),
+    )
+
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -47,9 +135,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency that provides the session factory for concurrent queries"""
+    return async_session_maker
+
+
 async def init_db() -> None:
     """Initialize database tables"""
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Needed by the trigram search indexes on customers
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -0,0 +1,51 @@
+"""Cursor and total-count helpers for paginated list endpoints"""
+import base64
+import json
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import Executable, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset values (e.g. expiration date + id) into a URL-safe cursor"""
+    raw = json.dumps([str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[str], Any]) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Each value is converted with the matching callable in `types`.
+    Raises ValueError if the cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor shape mismatch")
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+async def window_total(
+    db: AsyncSession,
+    rows: Sequence[Row],
+    page: int,
+    count_query: Executable,
+) -> int:
+    """
+    Total row count for an OFFSET page selected with a window count.
+    
+    List queries add `func.count().over().label("total_rows")` so the total
+    comes back with the page in the same scan. Past the last page there is
+    no row to carry it; only then is `count_query` (whose first column is
+    the count) run.
+    """
+    if rows:
+        return rows[0].total_rows
+    if page == 1:
+        return 0
+    return (await db.execute(count_query)).scalar() or 0
@@ -1,10 +1,39 @@
 """Redis connection and caching utilities"""
-import json
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, List, Optional
+
+import orjson
 from redis import asyncio as aioredis
 from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError, ResponseError
 
 from app.core.config import settings
+from app.schemas.common import json_default
+
+
+def _encode(value: Any) -> Any:
+    """Serialize structured values to JSON bytes; scalars are stored as-is"""
+    if isinstance(value, (bytes, str, int, float)):
+        return value
+    # Decimals as numbers, like the API responses, so hits and misses look alike
+    return orjson.dumps(value, default=json_default)
+
+
+# Keys matched per SCAN step and removed per UNLINK call
+INVALIDATE_BATCH_SIZE = 500
+
+# SCAN + UNLINK run inside Redis: one round-trip however many keys match
+INVALIDATE_PATTERN_SCRIPT = """
+local cursor = "0"
+repeat
+    local reply = redis.call("SCAN", cursor, "MATCH", ARGV[1], "COUNT", ARGV[2])
+    cursor = reply[1]
+    if #reply[2] > 0 then
+        redis.call("UNLINK", unpack(reply[2]))
+    end
+until cursor == "0"
+return 1
+"""
 
 
 class RedisClient:
@@ -12,20 +41,32 @@ class RedisClient:
     
     def __init__(self):
         self._redis: Optional[Redis] = None
+        self._invalidate_script: Optional[AsyncScript] = None
     
     async def connect(self) -> None:
         """Establish Redis connection"""
-        self._redis = await aioredis.from_url(
+        # At the connection cap, commands queue for a free connection instead
+        # of failing with "Too many connections" (and silently skipping the
+        # cache or its invalidation)
+        pool = aioredis.BlockingConnectionPool.from_url(
             settings.redis_url,
-            encoding="utf-8",
-            decode_responses=True
+            max_connections=settings.redis_max_connections,
+            timeout=settings.redis_pool_timeout_seconds,
         )
+        # Raw bytes in and out: values are (de)serialized with orjson here
+        self._redis = Redis.from_pool(pool)
+        self._invalidate_script = self._redis.register_script(INVALIDATE_PATTERN_SCRIPT)
     
     async def disconnect(self) -> None:
         """Close Redis connection"""
         if self._redis:
             await self._redis.close()
     
+    @property
+    def is_connected(self) -> bool:
+        """Whether connect() has been called"""
+        return self._redis is not None
+    
     @property
     def client(self) -> Redis:
         """Get Redis client instance"""
@@ -38,9 +79,9 @@ class RedisClient:
         value = await self.client.get(key)
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return value.decode()
         return None
     
     async def set(
@@ -50,9 +91,33 @@ class RedisClient:
         expire_seconds: int = 3600
     ) -> None:
         """Set value in cache with expiration"""
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
-        await self.client.set(key, value, ex=expire_seconds)
+        await self.client.set(key, _encode(value), ex=expire_seconds)
+    
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        expire_seconds: int = 3600
+    ) -> Any:
+        """
+        Get a cached value, computing and caching it on a miss.
+        
+        The cache is optional: without a connection, or if Redis fails,
+        the value is computed directly.
+        """
+        if not self.is_connected:
+            return await factory()
+        try:
+            value = await self.get(key)
+        except RedisError:
+            return await factory()
+        if value is None:
+            value = await factory()
+            try:
+                await self.set(key, value, expire_seconds)
+            except RedisError:
+                pass
+        return value
     
     async def delete(self, key: str) -> None:
         """Delete key from cache"""
@@ -60,14 +125,26 @@ class RedisClient:
     
     async def publish(self, channel: str, message: Any) -> None:
         """Publish message to channel"""
-        if isinstance(message, (dict, list)):
-            message = json.dumps(message)
-        await self.client.publish(channel, message)
+        await self.client.publish(channel, _encode(message))
     
     async def invalidate_pattern(self, pattern: str) -> None:
         """Delete all keys matching pattern"""
-        async for key in self.client.scan_iter(match=pattern):
-            await self.client.delete(key)
+        try:
+            await self._invalidate_script(keys=[], args=[pattern, INVALIDATE_BATCH_SIZE])
+            return
+        except ResponseError:
+            # Scripting disabled (e.g. some managed Redis offerings) - scan from here
+            pass
+        
+        # UNLINK frees values off the event loop, unlike DEL; one call per batch
+        batch: List[bytes] = []
+        async for key in self.client.scan_iter(match=pattern, count=INVALIDATE_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= INVALIDATE_BATCH_SIZE:
+                await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            await self.client.unlink(*batch)
 
 
 # Global Redis client instance
@@ -1,17 +1,28 @@
 """Security utilities for authentication and authorization"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Optional
 from uuid import UUID
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
+from jose import JWTError, jwk, jwt
 from pydantic import BaseModel
 
-from app.core.config import settings
+from app.core.config import auth_settings as settings
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# JWT key parsed once instead of on every encode/decode
+_jwt_key = jwk.construct(settings.secret_key, settings.algorithm)
+
+# bcrypt releases the GIL while hashing, so a thread pool hashes in parallel
+# without blocking the event loop
+_bcrypt_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="bcrypt",
+)
 
 
 class TokenPayload(BaseModel):
@@ -30,12 +41,30 @@ class TokenData(BaseModel):
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Not a bcrypt hash
+        return False
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` run off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _bcrypt_pool, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """`get_password_hash` run off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, get_password_hash, password)
 
 
 def create_access_token(
@@ -59,7 +88,7 @@ def create_access_token(
     if role:
         to_encode["role"] = role
     
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return jwt.encode(to_encode, _jwt_key, algorithm=settings.algorithm)
 
 
 def create_refresh_token(
@@ -80,16 +109,26 @@ def create_refresh_token(
         "type": "refresh",
     }
     
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return jwt.encode(to_encode, _jwt_key, algorithm=settings.algorithm)
 
 
 def decode_token(token: str) -> Optional[TokenPayload]:
     """Decode and validate JWT token"""
+    payload = _decode_token_cached(token)
+    if payload is None or payload.exp <= datetime.now(timezone.utc):
+        return None
+    return payload
+
+
+@lru_cache(maxsize=10_000)
+def _decode_token_cached(token: str) -> Optional[TokenPayload]:
+    """Decode token once per process; expiry is re-checked by the caller"""
     try:
         payload = jwt.decode(
             token,
-            settings.secret_key,
-            algorithms=[settings.algorithm]
+            _jwt_key,
+            algorithms=[settings.algorithm],
+            options={"verify_exp": False},
         )
         return TokenPayload(**payload)
     except JWTError:
@@ -4,12 +4,16 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.types import Receive, Scope, Send
 
+from app.api.v1.endpoints.delivery_notes import warm_delivery_note_queries
 from app.api.v1.router import api_router
 from app.core.config import settings
-from app.core.database import close_db, init_db
+from app.core.database import async_session_maker, close_db, get_pool_status, init_db
 from app.core.redis import redis_client
+from app.services.reference_allocator import reference_allocators
 from app.tasks.scheduler import start_scheduler, shutdown_scheduler
 
 
@@ -19,6 +23,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # Startup
     print("🚀 Starting Ink Inventory Management System...")
     await init_db()
+    async with async_session_maker() as session:
+        await warm_delivery_note_queries(session)
+    for allocator in reference_allocators:
+        await allocator.start(async_session_maker)
     await redis_client.connect()
     print("✅ Database and Redis connected")
     
@@ -32,6 +40,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # Shutdown
     print("🛑 Shutting down...")
     shutdown_scheduler()
+    for allocator in reference_allocators:
+        await allocator.stop()
     await close_db()
     await redis_client.disconnect()
     print("✅ Connections closed")
@@ -44,6 +54,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -56,6 +67,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class SkipPDFGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes PDF downloads through untouched"""
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # PDF streams are already compressed; gzip would only cost CPU
+        if scope["type"] == "http" and scope["path"].endswith("/pdf"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress JSON bodies over 1KB; level 4 keeps CPU low for a good JSON ratio
+app.add_middleware(SkipPDFGZipMiddleware, minimum_size=1024, compresslevel=4)
+
 
 # Include API router
 app.include_router(api_router, prefix=settings.api_v1_prefix)
@@ -83,6 +108,12 @@ async def health_check():
     }
 
 
+@app.get("/health/pool", tags=["Health"])
+async def health_pool():
+    """Database connection pool statistics"""
+    return get_pool_status()
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
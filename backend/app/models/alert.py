@@ -3,15 +3,15 @@ import enum
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import Boolean, Enum, ForeignKey, String, Text
+from sqlalchemy import Boolean, ForeignKey, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, SmallIntEnum
 
 
 class AlertType(str, enum.Enum):
-    """Types of alerts"""
+    """Types of alerts (stored by position: append new members only)"""
     EXPIRATION_WARNING = "expiration_warning"
     EXPIRATION_CRITICAL = "expiration_critical"
     EXPIRED = "expired"
@@ -21,25 +21,42 @@ class AlertType(str, enum.Enum):
 
 
 class AlertSeverity(str, enum.Enum):
-    """Alert severity levels"""
+    """Alert severity levels (stored by position: append new members only)"""
     INFO = "info"
     WARNING = "warning"
     CRITICAL = "critical"
 
 
+# Display color per severity (every severity has one; the column is NOT NULL)
+_SEVERITY_COLORS: dict[AlertSeverity, str] = {
+    AlertSeverity.INFO: "blue",
+    AlertSeverity.WARNING: "yellow",
+    AlertSeverity.CRITICAL: "red",
+}
+
+
 class Alert(BaseModel):
     """Alert model for system notifications"""
     
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Unread alert counts and lists only ever touch live alerts
+        Index(
+            "ix_alerts_active",
+            "severity",
+            "created_at",
+            postgresql_where=text("is_read = false AND is_dismissed = false"),
+        ),
+    )
     
     # Alert classification
     alert_type: Mapped[AlertType] = mapped_column(
-        Enum(AlertType),
+        SmallIntEnum(AlertType),
         nullable=False,
         index=True
     )
     severity: Mapped[AlertSeverity] = mapped_column(
-        Enum(AlertSeverity),
+        SmallIntEnum(AlertSeverity),
         default=AlertSeverity.INFO,
         nullable=False,
         index=True
@@ -66,7 +83,9 @@ class Alert(BaseModel):
     )
     message: Mapped[str] = mapped_column(
         Text,
-        nullable=False
+        nullable=False,
+        deferred=True,
+        deferred_raiseload=True,
     )
     
     # Status
@@ -88,10 +107,6 @@ class Alert(BaseModel):
     @property
     def severity_color(self) -> str:
         """Get color code for severity"""
-        return {
-            AlertSeverity.INFO: "blue",
-            AlertSeverity.WARNING: "yellow",
-            AlertSeverity.CRITICAL: "red",
-        }.get(self.severity, "gray")
+        return _SEVERITY_COLORS[self.severity]
 
 
@@ -1,15 +1,62 @@
 """Base model with common fields and utilities"""
+import enum
+import os
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from operator import attrgetter
+from typing import Any, Callable, Optional
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, SmallInteger, TypeDecorator, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (version 7, RFC 9562).
+    
+    The leading 48 bits are the Unix time in milliseconds and the rest is
+    random, so new primary keys land at the right edge of their index
+    instead of on random pages.
+    """
+    unix_ms = time.time_ns() // 1_000_000
+    value = (unix_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+class SmallIntEnum(TypeDecorator):
+    """
+    Python enum stored as a SMALLINT code: the member's position in the enum.
+    
+    Codes are positional, so new members are only ever appended. Adding one
+    needs no DDL, unlike a database ENUM type.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: type[enum.Enum]):
+        super().__init__()
+        self.enum_class = enum_class
+        self._members = tuple(enum_class)
+        self._codes = {member: code for code, member in enumerate(self._members)}
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return self._codes[self.enum_class(value)]
+    
+    def process_result_value(self, value: Optional[int], dialect) -> Any:
+        if value is None:
+            return None
+        return self._members[value]
+
+
 class TimestampMixin:
     """Mixin for created_at and updated_at timestamps"""
     
@@ -32,7 +79,7 @@ class UUIDMixin:
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
 
 
@@ -41,11 +88,24 @@ class BaseModel(Base, UUIDMixin, TimestampMixin):
     
     __abstract__ = True
     
+    # Fetch server-generated values (timestamps) with INSERT/UPDATE ... RETURNING
+    # so committed objects are complete without a refresh() round trip
+    __mapper_args__ = {"eager_defaults": True}
+    
+    @classmethod
+    def _column_getters(cls) -> tuple[tuple[str, Callable[[Any], Any]], ...]:
+        """(name, getter) per table column, built once per model class"""
+        getters = cls.__dict__.get("_to_dict_getters")
+        if getters is None:
+            getters = tuple(
+                (column.name, attrgetter(column.name))
+                for column in cls.__table__.columns
+            )
+            cls._to_dict_getters = getters
+        return getters
+    
     def to_dict(self) -> dict[str, Any]:
         """Convert model to dictionary"""
-        return {
-            column.name: getattr(self, column.name)
-            for column in self.__table__.columns
-        }
+        return {name: get(self) for name, get in self._column_getters()}
 
 
@@ -8,18 +8,20 @@ from uuid import UUID
 from sqlalchemy import (
     CheckConstraint,
     Date,
-    Enum,
     ForeignKey,
     Index,
     Integer,
     Numeric,
+    Sequence,
     String,
     Text,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, SmallIntEnum
 
 if TYPE_CHECKING:
     from app.models.item import Item
@@ -28,8 +30,12 @@ if TYPE_CHECKING:
     from app.models.delivery_note import DeliveryNoteItem
 
 
+# Numbers generated batch numbers (GR-...) handed out by the reference allocator
+batch_number_seq = Sequence("batch_number_seq", metadata=BaseModel.metadata)
+
+
 class BatchStatus(str, enum.Enum):
-    """Batch status enum"""
+    """Batch status enum (stored by position: append new members only)"""
     ACTIVE = "active"
     SCRAP = "scrap"
     DEPLETED = "depleted"
@@ -48,8 +54,25 @@ class Batch(BaseModel):
             "quantity_available >= 0",
             name="check_quantity_non_negative"
         ),
-        Index("ix_batches_expiration_status", "expiration_date", "status"),
-        Index("ix_batches_item_status", "item_id", "status"),
+        # Composite indexes cover active batches only; lookups by other
+        # statuses use the single-column item_id/status/expiration_date indexes
+        # Keyset pagination over active batches in FEFO order (index-only scans)
+        Index(
+            "ix_batches_active_exp",
+            "expiration_date",
+            "id",
+            postgresql_include=["quantity_available", "item_id", "location_id"],
+            postgresql_where=text("status = 0"),  # BatchStatus.ACTIVE
+        ),
+        # FEFO lookups per item, earliest expiration first; covering, so picks
+        # and availability sums are served index-only
+        Index(
+            "ix_batches_fefo_pick",
+            "item_id",
+            "expiration_date",
+            postgresql_include=["quantity_available", "id", "location_id"],
+            postgresql_where=text("status = 0"),  # BatchStatus.ACTIVE
+        ),
     )
     
     # Foreign keys
@@ -101,7 +124,7 @@ class Batch(BaseModel):
     
     # Status
     status: Mapped[BatchStatus] = mapped_column(
-        Enum(BatchStatus),
+        SmallIntEnum(BatchStatus),
         default=BatchStatus.ACTIVE,
         nullable=False,
         index=True
@@ -110,7 +133,9 @@ class Batch(BaseModel):
     # Optional notes
     notes: Mapped[Optional[str]] = mapped_column(
         Text,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
     )
     
     # Version for optimistic locking
@@ -120,10 +145,16 @@ class Batch(BaseModel):
         nullable=False
     )
     
+    # The ORM bumps `version` on every UPDATE it emits and adds it to the
+    # WHERE clause, raising StaleDataError if the row changed underneath
+    __mapper_args__ = {**BaseModel.__mapper_args__, "version_id_col": version}
+    
     # Relationships
+    # item_id is NOT NULL, so joined loads of the item use an INNER JOIN
     item: Mapped["Item"] = relationship(
         "Item",
-        back_populates="batches"
+        back_populates="batches",
+        innerjoin=True,
     )
     location: Mapped[Optional["Location"]] = relationship(
         "Location",
@@ -132,47 +163,56 @@ class Batch(BaseModel):
     movements: Mapped[List["Movement"]] = relationship(
         "Movement",
         back_populates="batch",
-        lazy="selectin",
         cascade="all, delete-orphan"
     )
     delivery_note_items: Mapped[List["DeliveryNoteItem"]] = relationship(
         "DeliveryNoteItem",
-        back_populates="batch",
-        lazy="selectin"
+        back_populates="batch"
     )
     
     def __repr__(self) -> str:
         return f"<Batch {self.batch_number}>"
     
-    @staticmethod
-    def generate_batch_number(prefix: str = "GR") -> str:
-        """Generate auto batch number: GR-YYMMDD-XXX"""
-        from datetime import datetime
-        import random
-        date_str = datetime.now().strftime("%y%m%d")
-        random_suffix = str(random.randint(100, 999))
-        return f"{prefix}-{date_str}-{random_suffix}"
+    # The hybrids below also work in queries, e.g. `.where(Batch.is_expired)`.
+    # Their SQL side binds the application's date.today(), like the instance
+    # side, rather than the database server's current_date.
     
-    @property
+    @hybrid_property
     def is_expired(self) -> bool:
         """Check if batch is expired"""
         return self.expiration_date < date.today()
     
-    @property
+    @is_expired.inplace.expression
+    @classmethod
+    def _is_expired_expression(cls):
+        return cls.expiration_date < date.today()
+    
+    @hybrid_property
     def days_until_expiration(self) -> int:
         """Days until expiration (negative if expired)"""
         return (self.expiration_date - date.today()).days
     
+    @days_until_expiration.inplace.expression
+    @classmethod
+    def _days_until_expiration_expression(cls):
+        # date - date is an integer day count in PostgreSQL
+        return cls.expiration_date - date.today()
+    
     @property
     def inventory_value(self) -> Decimal:
         """Calculate batch inventory value"""
         return self.quantity_available * (self.item.cost_price if self.item else Decimal("0"))
     
-    @property
+    @hybrid_property
     def is_depleted(self) -> bool:
         """Check if batch is depleted"""
         return self.quantity_available <= 0
     
+    @is_depleted.inplace.expression
+    @classmethod
+    def _is_depleted_expression(cls):
+        return cls.quantity_available <= 0
+    
     def can_pick(self, quantity: Decimal) -> bool:
         """Check if quantity can be picked from this batch"""
         return (
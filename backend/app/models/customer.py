@@ -1,7 +1,7 @@
 """Customer model for delivery management"""
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, String, Text
+from sqlalchemy import Boolean, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -14,6 +14,21 @@ class Customer(BaseModel):
     """Customer model for delivery notes and consignment tracking"""
     
     __tablename__ = "customers"
+    __table_args__ = (
+        # Trigram indexes so ILIKE '%term%' search can avoid a sequential scan
+        Index(
+            "ix_customers_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_customers_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+    )
     
     name: Mapped[str] = mapped_column(
         String(200),
@@ -30,7 +45,9 @@ class Customer(BaseModel):
     )
     address: Mapped[Optional[str]] = mapped_column(
         Text,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
     )
     contact_person: Mapped[Optional[str]] = mapped_column(
         String(100),
@@ -52,14 +69,15 @@ class Customer(BaseModel):
     # Notes
     notes: Mapped[Optional[str]] = mapped_column(
         Text,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
     )
     
     # Relationships
     delivery_notes: Mapped[List["DeliveryNote"]] = relationship(
         "DeliveryNote",
-        back_populates="customer",
-        lazy="selectin"
+        back_populates="customer"
     )
     
     def __repr__(self) -> str:
@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, List, Optional
 from uuid import UUID
 
-from sqlalchemy import Boolean, Date, Enum, ForeignKey, Numeric, String, Text
+from sqlalchemy import Boolean, Date, Enum, ForeignKey, Index, Integer, Numeric, Sequence, String, Text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -18,6 +18,10 @@ if TYPE_CHECKING:
     from app.models.batch import Batch
 
 
+# Numbers delivery note numbers (DN-...) handed out by the reference allocator
+delivery_note_number_seq = Sequence("delivery_note_number_seq", metadata=BaseModel.metadata)
+
+
 class DeliveryNoteStatus(str, enum.Enum):
     """Delivery note status"""
     DRAFT = "draft"
@@ -31,6 +35,11 @@ class DeliveryNote(BaseModel):
     """Delivery note (תעודת משלוח) model"""
     
     __tablename__ = "delivery_notes"
+    __table_args__ = (
+        # Newest-first listing, optionally filtered by status, without a sort
+        Index("ix_delivery_notes_status_created_at", "status", "created_at"),
+        Index("ix_delivery_notes_created_at", "created_at"),
+    )
     
     # Foreign keys
     customer_id: Mapped[UUID] = mapped_column(
@@ -57,8 +66,7 @@ class DeliveryNote(BaseModel):
     status: Mapped[DeliveryNoteStatus] = mapped_column(
         Enum(DeliveryNoteStatus),
         default=DeliveryNoteStatus.DRAFT,
-        nullable=False,
-        index=True
+        nullable=False
     )
     issue_date: Mapped[Optional[date]] = mapped_column(
         Date,
@@ -82,6 +90,20 @@ class DeliveryNote(BaseModel):
         nullable=True
     )
     
+    # Line totals, written with the lines so lists need not aggregate them
+    items_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0"
+    )
+    total_quantity: Mapped[Decimal] = mapped_column(
+        Numeric(14, 3),
+        nullable=False,
+        default=Decimal("0"),
+        server_default="0"
+    )
+    
     # Relationships
     customer: Mapped["Customer"] = relationship(
         "Customer",
@@ -94,29 +116,11 @@ class DeliveryNote(BaseModel):
     items: Mapped[List["DeliveryNoteItem"]] = relationship(
         "DeliveryNoteItem",
         back_populates="delivery_note",
-        lazy="selectin",
         cascade="all, delete-orphan"
     )
     
     def __repr__(self) -> str:
         return f"<DeliveryNote {self.delivery_note_number}>"
-    
-    @staticmethod
-    def generate_delivery_note_number(sequence: int) -> str:
-        """Generate delivery note number: DN-YYMMDD-XXXX"""
-        from datetime import datetime
-        date_str = datetime.now().strftime("%y%m%d")
-        return f"DN-{date_str}-{sequence:04d}"
-    
-    @property
-    def total_quantity(self) -> Decimal:
-        """Calculate total quantity in delivery note"""
-        return sum(item.quantity for item in self.items)
-    
-    @property
-    def items_count(self) -> int:
-        """Number of line items"""
-        return len(self.items)
 
 
 class DeliveryNoteItem(BaseModel):
@@ -2,13 +2,13 @@
 from decimal import Decimal
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Integer, Numeric, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Index, Integer, Numeric, String, Text, func, select
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 
 from app.models.base import BaseModel
+from app.models.batch import Batch, BatchStatus
 
 if TYPE_CHECKING:
-    from app.models.batch import Batch
     from app.models.delivery_note import DeliveryNoteItem
 
 
@@ -16,6 +16,28 @@ class Item(BaseModel):
     """Ink item model - represents a type of ink product"""
     
     __tablename__ = "items"
+    __table_args__ = (
+        # Trigram indexes so ILIKE '%term%' search and supplier filtering
+        # can avoid a sequential scan
+        Index(
+            "ix_items_sku_trgm",
+            "sku",
+            postgresql_using="gin",
+            postgresql_ops={"sku": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_items_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_items_supplier_trgm",
+            "supplier",
+            postgresql_using="gin",
+            postgresql_ops={"supplier": "gin_trgm_ops"},
+        ),
+    )
     
     sku: Mapped[str] = mapped_column(
         String(50),
@@ -29,7 +51,9 @@ class Item(BaseModel):
     )
     description: Mapped[Optional[str]] = mapped_column(
         Text,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
     )
     supplier: Mapped[str] = mapped_column(
         String(200),
@@ -70,27 +94,16 @@ class Item(BaseModel):
     batches: Mapped[List["Batch"]] = relationship(
         "Batch",
         back_populates="item",
-        lazy="selectin",
         cascade="all, delete-orphan"
     )
     delivery_note_items: Mapped[List["DeliveryNoteItem"]] = relationship(
         "DeliveryNoteItem",
-        back_populates="item",
-        lazy="selectin"
+        back_populates="item"
     )
     
     def __repr__(self) -> str:
         return f"<Item {self.sku}: {self.name}>"
     
-    @property
-    def total_quantity_available(self) -> Decimal:
-        """Calculate total available quantity across all active batches"""
-        return sum(
-            batch.quantity_available
-            for batch in self.batches
-            if batch.status == "active"
-        )
-    
     @property
     def total_inventory_value(self) -> Decimal:
         """Calculate total inventory value"""
@@ -100,10 +113,24 @@ class Item(BaseModel):
     def is_below_reorder_point(self) -> bool:
         """Check if item needs reordering"""
         return self.total_quantity_available < self.reorder_point
-    
-    @property
-    def active_batches_count(self) -> int:
-        """Count of active batches"""
-        return len([b for b in self.batches if b.status == "active"])
 
 
+# Active stock aggregated in SQL rather than over the loaded batches. Deferred
+# so plain item loads skip the subqueries: undefer() them where needed -
+# reading them unloaded raises instead of lazy loading.
+Item.total_quantity_available = column_property(
+    select(func.coalesce(func.sum(Batch.quantity_available), 0))
+    .where(Batch.item_id == Item.id, Batch.status == BatchStatus.ACTIVE)
+    .correlate_except(Batch)
+    .scalar_subquery(),
+    deferred=True,
+    raiseload=True,
+)
+Item.active_batches_count = column_property(
+    select(func.count(Batch.id))
+    .where(Batch.item_id == Item.id, Batch.status == BatchStatus.ACTIVE)
+    .correlate_except(Batch)
+    .scalar_subquery(),
+    deferred=True,
+    raiseload=True,
+)
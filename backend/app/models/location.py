@@ -47,8 +47,7 @@ class Location(BaseModel):
     # Relationships
     batches: Mapped[List["Batch"]] = relationship(
         "Batch",
-        back_populates="location",
-        lazy="selectin"
+        back_populates="location"
     )
     
     def __repr__(self) -> str:
@@ -5,11 +5,11 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, Sequence, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, SmallIntEnum
 
 if TYPE_CHECKING:
     from app.models.batch import Batch
@@ -17,7 +17,7 @@ if TYPE_CHECKING:
 
 
 class MovementType(str, enum.Enum):
-    """Types of inventory movements"""
+    """Types of inventory movements (stored by position: append new members only)"""
     RECEIPT = "receipt"
     DISPATCH = "dispatch"
     ADJUSTMENT = "adjustment"
@@ -25,11 +25,21 @@ class MovementType(str, enum.Enum):
     TRANSFER = "transfer"
 
 
+# Numbers dispatch reference numbers (DSP-...) handed out by the reference allocator
+dispatch_reference_seq = Sequence("dispatch_reference_seq", metadata=BaseModel.metadata)
+
+
 class Movement(BaseModel):
     """Inventory movement model for complete audit trail"""
     
     __tablename__ = "movements"
     
+    __table_args__ = (
+        # Keyset pagination of the audit trail, newest first (scanned backwards)
+        Index("ix_movements_timestamp_id", "timestamp", "id"),
+        Index("ix_movements_batch_timestamp_id", "batch_id", "timestamp", "id"),
+    )
+    
     # Foreign keys
     batch_id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True),
@@ -46,7 +56,7 @@ class Movement(BaseModel):
     
     # Movement details
     movement_type: Mapped[MovementType] = mapped_column(
-        Enum(MovementType),
+        SmallIntEnum(MovementType),
         nullable=False,
         index=True
     )
@@ -82,7 +92,9 @@ class Movement(BaseModel):
     # Notes
     notes: Mapped[Optional[str]] = mapped_column(
         Text,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
     )
     
     # Relationships
@@ -59,13 +59,11 @@ class User(BaseModel):
     # Relationships
     movements: Mapped[List["Movement"]] = relationship(
         "Movement",
-        back_populates="user",
-        lazy="selectin"
+        back_populates="user"
     )
     delivery_notes: Mapped[List["DeliveryNote"]] = relationship(
         "DeliveryNote",
-        back_populates="created_by_user",
-        lazy="selectin"
+        back_populates="created_by_user"
     )
     
     def __repr__(self) -> str:
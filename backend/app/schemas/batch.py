@@ -1,10 +1,10 @@
 """Batch schemas for FEFO tracking"""
 from datetime import date
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import Field, field_validator
+from pydantic import Field, TypeAdapter, model_validator
 
 from app.models.batch import BatchStatus
 from app.schemas.common import BaseSchema, TimestampSchema
@@ -27,19 +27,15 @@ class BatchCreate(BatchBase):
     receipt_date: date = Field(default_factory=date.today)
     notes: Optional[str] = None
     
-    @field_validator("expiration_date")
-    @classmethod
-    def expiration_must_be_future(cls, v: date) -> date:
-        if v < date.today():
+    @model_validator(mode="after")
+    def check_dates(self) -> "BatchCreate":
+        # One validator for both dates, reading the clock once
+        today = date.today()
+        if self.expiration_date < today:
             raise ValueError("תאריך תפוגה חייב להיות בעתיד")  # Expiration date must be in the future
-        return v
-    
-    @field_validator("receipt_date")
-    @classmethod
-    def receipt_not_future(cls, v: date) -> date:
-        if v > date.today():
+        if self.receipt_date > today:
             raise ValueError("תאריך קבלה לא יכול להיות בעתיד")  # Receipt date cannot be in the future
-        return v
+        return self
 
 
 class BatchUpdate(BaseSchema):
@@ -75,6 +71,10 @@ class BatchResponse(BatchBase, TimestampSchema):
     location_code: Optional[str] = None
 
 
+# Built once: dumps a whole list of batches in a single pydantic-core call
+batch_list_adapter = TypeAdapter(List[BatchResponse])
+
+
 class BatchSuggestion(BaseSchema):
     """Schema for FEFO batch suggestion"""
     
@@ -1,12 +1,31 @@
 """Common Pydantic schemas"""
 from datetime import datetime
-from typing import Generic, List, Optional, TypeVar
+from decimal import Decimal
+from typing import Annotated, Any, Generic, List, Optional, TypeVar
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, computed_field
 
 T = TypeVar("T")
 
+# Decimal kept exact in the model but written as a JSON number, for clients
+# that do arithmetic on the value (Decimal fields otherwise dump as strings)
+DecimalNumber = Annotated[
+    Decimal,
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
+
+# Positive stock quantity at the scale of the Numeric(12, 3) columns, so
+# requests are rejected rather than silently rounded by the database
+Quantity = Annotated[Decimal, Field(gt=0, max_digits=12, decimal_places=3)]
+
+
+def json_default(value: Any) -> Any:
+    """orjson `default=` hook: Decimals become JSON numbers, like DecimalNumber"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
 
 class BaseSchema(BaseModel):
     """Base schema with common configuration"""
@@ -16,6 +35,19 @@ class BaseSchema(BaseModel):
         populate_by_name=True,
         str_strip_whitespace=True,
     )
+    
+    @classmethod
+    def construct_from(cls, obj, **values):
+        """
+        Build the schema from a trusted ORM object without validation.
+        
+        Only for rows read back from our own database on hot list paths;
+        explicit `values` override attributes read from `obj`.
+        """
+        for name in cls.model_fields:
+            if name not in values:
+                values[name] = getattr(obj, name)
+        return cls.model_construct(**values)
 
 
 class TimestampSchema(BaseSchema):
@@ -35,20 +67,35 @@ class PaginatedResponse(BaseSchema, Generic[T]):
     """Generic paginated response"""
     
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
     
+    # Serialized with the page (plain properties are left out of the JSON)
+    @computed_field
     @property
     def has_next(self) -> bool:
+        if self.pages is None:
+            return self.has_more
         return self.page < self.pages
     
+    @computed_field
     @property
     def has_prev(self) -> bool:
         return self.page > 1
 
 
+class PaginatedCursorResponse(BaseSchema, Generic[T]):
+    """Generic cursor-paginated response (no total count)"""
+    
+    items: List[T]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
 class MessageResponse(BaseSchema):
     """Simple message response"""
     
@@ -7,7 +7,7 @@ from uuid import UUID
 from pydantic import Field
 
 from app.models.movement import MovementType
-from app.schemas.common import BaseSchema, TimestampSchema
+from app.schemas.common import BaseSchema, DecimalNumber, TimestampSchema
 
 
 class MovementCreate(BaseSchema):
@@ -41,3 +41,22 @@ class MovementResponse(TimestampSchema):
     user_name: Optional[str] = None
 
 
+class MovementRowResponse(BaseSchema):
+    """Movement history row with related batch, item and user data"""
+    
+    id: UUID
+    batch_id: UUID
+    batch_number: Optional[str] = None
+    item_sku: Optional[str] = None
+    item_name: Optional[str] = None
+    user_id: UUID
+    user_name: Optional[str] = None
+    movement_type: MovementType
+    quantity: DecimalNumber
+    quantity_before: DecimalNumber
+    quantity_after: DecimalNumber
+    reference_number: Optional[str] = None
+    timestamp: datetime
+    notes: Optional[str] = None
+
+
@@ -1,12 +1,16 @@
 """User schemas for authentication and management"""
+import re
 from typing import Optional
 from uuid import UUID
 
-from pydantic import EmailStr, Field
+from pydantic import EmailStr, Field, field_validator
 
 from app.models.user import UserRole
 from app.schemas.common import BaseSchema, TimestampSchema
 
+# Shape-only email check for updates; full validation (EmailStr) runs at registration
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
 
 class UserBase(BaseSchema):
     """Base user schema"""
@@ -27,16 +31,25 @@ class UserUpdate(BaseSchema):
     """Schema for updating a user"""
     
     username: Optional[str] = Field(None, min_length=3, max_length=50)
-    email: Optional[EmailStr] = None
+    email: Optional[str] = Field(None, max_length=255)
     full_name: Optional[str] = Field(None, min_length=1, max_length=100)
     role: Optional[UserRole] = None
     is_active: Optional[bool] = None
     password: Optional[str] = Field(None, min_length=8, max_length=100)
+    
+    @field_validator("email")
+    @classmethod
+    def email_shape(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and not _EMAIL_RE.match(v):
+            raise ValueError("כתובת דוא\"ל לא תקינה")  # Invalid email address
+        return v
 
 
 class UserResponse(UserBase, TimestampSchema):
     """Schema for user response"""
     
+    # Read back from the database, where it was validated on the way in
+    email: str
     id: UUID
     role: UserRole
     is_active: bool
@@ -4,15 +4,23 @@ from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import insert, select, func, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload, undefer
 
 from app.models.alert import Alert, AlertType, AlertSeverity
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.movement import Movement
+from app.core.cache import TTLCache, invalidate_on_flush
 from app.core.config import settings
+from app.core.database import explicit_loads
+from app.services.dashboard_service import DashboardService
+
+
+# Alert summary counts, cleared whenever alerts are written
+alert_summary_cache = TTLCache(maxsize=8, ttl=settings.summary_cache_ttl_seconds)
+invalidate_on_flush(alert_summary_cache, Alert)
 
 
 class AlertService:
@@ -74,40 +82,37 @@ class AlertService:
     
     async def mark_as_read(self, alert_id: UUID) -> None:
         """Mark an alert as read"""
-        result = await self.db.execute(
-            select(Alert).where(Alert.id == alert_id)
+        await self.db.execute(
+            update(Alert)
+            .where(Alert.id == alert_id)
+            .values(is_read=True)
         )
-        alert = result.scalar_one_or_none()
-        if alert:
-            alert.is_read = True
-            await self.db.flush()
     
     async def mark_all_as_read(self) -> int:
         """Mark all alerts as read, return count"""
-        from sqlalchemy import update
-        
         result = await self.db.execute(
             update(Alert)
             .where(Alert.is_read == False)
             .values(is_read=True)
         )
-        await self.db.flush()
         return result.rowcount
     
     async def dismiss_alert(self, alert_id: UUID) -> None:
         """Dismiss an alert"""
-        result = await self.db.execute(
-            select(Alert).where(Alert.id == alert_id)
+        await self.db.execute(
+            update(Alert)
+            .where(Alert.id == alert_id)
+            .values(is_dismissed=True)
         )
-        alert = result.scalar_one_or_none()
-        if alert:
-            alert.is_dismissed = True
-            await self.db.flush()
     
     async def check_expiring_batches(self) -> List[Alert]:
         """
         Check for batches approaching expiration and create alerts.
         Uses configurable thresholds: 120, 90, 60, 30 days.
+        
+        Per threshold, the batches still needing an alert are found in one
+        query (already alerted ones are excluded in SQL) and their alerts
+        are written with one bulk INSERT.
         """
         today = date.today()
         alerts_created = []
@@ -121,55 +126,61 @@ class AlertService:
         
         for days, severity, level_text in thresholds:
             threshold_date = today + timedelta(days=days)
-            prev_threshold = today + timedelta(days=days + 1)
             
-            # Find batches expiring exactly at this threshold
+            # Alert already exists for this batch at this level today
+            already_alerted = (
+                select(Alert.id)
+                .where(
+                    Alert.batch_id == Batch.id,
+                    Alert.alert_type == AlertType.EXPIRATION_WARNING,
+                    Alert.severity == severity,
+                    func.date(Alert.created_at) == today,
+                )
+                .exists()
+            )
             result = await self.db.execute(
-                select(Batch)
-                .options(selectinload(Batch.item))
+                select(
+                    Batch.id,
+                    Batch.item_id,
+                    Batch.batch_number,
+                    Batch.expiration_date,
+                    Item.name,
+                )
+                .join(Item, Batch.item_id == Item.id)
                 .where(
                     Batch.status == BatchStatus.ACTIVE,
                     Batch.expiration_date <= threshold_date,
                     Batch.expiration_date > today,
+                    ~already_alerted,
                 )
             )
-            batches = result.scalars().all()
             
-            for batch in batches:
+            rows = []
+            for batch in result.all():
                 days_left = (batch.expiration_date - today).days
-                
-                # Check if alert already exists for this batch at this level
-                existing = await self.db.execute(
-                    select(Alert)
-                    .where(
-                        Alert.batch_id == batch.id,
-                        Alert.alert_type == AlertType.EXPIRATION_WARNING,
-                        Alert.severity == severity,
-                        func.date(Alert.created_at) == today,
-                    )
-                )
-                if existing.scalar_one_or_none():
-                    continue
-                
                 alert_type = (
                     AlertType.EXPIRATION_CRITICAL 
                     if days_left <= 30 
                     else AlertType.EXPIRATION_WARNING
                 )
-                
-                alert = await self.create_alert(
-                    alert_type=alert_type,
-                    severity=severity,
-                    title=f"{level_text}: אצווה מתקרבת לתפוגה",
-                    message=(
-                        f"אצווה {batch.batch_number} של {batch.item.name if batch.item else 'פריט'} "
+                rows.append({
+                    "alert_type": alert_type,
+                    "severity": severity,
+                    "title": f"{level_text}: אצווה מתקרבת לתפוגה",
+                    "message": (
+                        f"אצווה {batch.batch_number} של {batch.name} "
                         f"תפוג תוקף ב-{batch.expiration_date.strftime('%d/%m/%Y')} "
                         f"({days_left} ימים)"
                     ),
-                    batch_id=batch.id,
-                    item_id=batch.item_id,
-                )
-                alerts_created.append(alert)
+                    "batch_id": batch.id,
+                    "item_id": batch.item_id,
+                    "is_read": False,
+                    "is_dismissed": False,
+                })
+            
+            if rows:
+                alerts = await self.db.scalars(insert(Alert).returning(Alert), rows)
+                alerts_created.extend(alerts.all())
         
         return alerts_created
     
@@ -183,10 +194,10 @@ class AlertService:
         # Find expired active batches
         result = await self.db.execute(
             select(Batch)
-            .options(selectinload(Batch.item))
+            .options(undefer(Batch.notes), *explicit_loads(joinedload(Batch.item)))
             .where(
                 Batch.status == BatchStatus.ACTIVE,
-                Batch.expiration_date < today,
+                Batch.is_expired,
             )
         )
         expired_batches = result.scalars().all()
@@ -215,55 +226,51 @@ class AlertService:
         return results
     
     async def check_low_stock(self) -> List[Alert]:
-        """Check for items below reorder point"""
+        """
+        Check for items below reorder point.
+        
+        Available stock (active, non-expired batches) is summed in SQL and
+        compared there, so only items that need an alert come back.
+        """
         alerts_created = []
+        today = date.today()
         
-        # Get all items with their active batches
+        stock = DashboardService._pickable_stock()
+        available = func.coalesce(stock.c.quantity, 0).label("available")
+        # Alert already exists for this item today
+        already_alerted = (
+            select(Alert.id)
+            .where(
+                Alert.item_id == Item.id,
+                Alert.alert_type == AlertType.LOW_STOCK,
+                func.date(Alert.created_at) == today,
+            )
+            .exists()
+        )
         result = await self.db.execute(
-            select(Item).options(selectinload(Item.batches))
+            select(Item.id, Item.sku, Item.name, Item.reorder_point, Item.min_stock, available)
+            .outerjoin(stock, stock.c.item_id == Item.id)
+            .where(available < Item.reorder_point, ~already_alerted)
         )
-        items = result.scalars().all()
-        
-        today = date.today()
         
-        for item in items:
-            # Calculate available stock (non-expired, active batches)
-            available = sum(
-                b.quantity_available 
-                for b in item.batches 
-                if b.status == BatchStatus.ACTIVE and b.expiration_date >= today
+        for item in result.all():
+            severity = (
+                AlertSeverity.CRITICAL 
+                if item.available < item.min_stock 
+                else AlertSeverity.WARNING
             )
             
-            if available < item.reorder_point:
-                # Check for existing alert today
-                existing = await self.db.execute(
-                    select(Alert)
-                    .where(
-                        Alert.item_id == item.id,
-                        Alert.alert_type == AlertType.LOW_STOCK,
-                        func.date(Alert.created_at) == today,
-                    )
-                )
-                if existing.scalar_one_or_none():
-                    continue
-                
-                severity = (
-                    AlertSeverity.CRITICAL 
-                    if available < item.min_stock 
-                    else AlertSeverity.WARNING
-                )
-                
-                alert = await self.create_alert(
-                    alert_type=AlertType.LOW_STOCK,
-                    severity=severity,
-                    title=f"מלאי נמוך: {item.sku}",
-                    message=(
-                        f"מלאי של {item.name} ({item.sku}) ירד מתחת לנקודת ההזמנה. "
-                        f"כמות נוכחית: {available}, נקודת הזמנה: {item.reorder_point}"
-                    ),
-                    item_id=item.id,
-                )
-                alerts_created.append(alert)
+            alert = await self.create_alert(
+                alert_type=AlertType.LOW_STOCK,
+                severity=severity,
+                title=f"מלאי נמוך: {item.sku}",
+                message=(
+                    f"מלאי של {item.name} ({item.sku}) ירד מתחת לנקודת ההזמנה. "
+                    f"כמות נוכחית: {item.available}, נקודת הזמנה: {item.reorder_point}"
+                ),
+                item_id=item.id,
+            )
+            alerts_created.append(alert)
         
         return alerts_created
     
@@ -276,7 +283,7 @@ class AlertService:
         # Get items with active batches
         result = await self.db.execute(
             select(Item)
-            .options(selectinload(Item.batches))
+            .options(*explicit_loads(selectinload(Item.batches)))
         )
         items = result.scalars().all()
         
@@ -1,18 +1,23 @@
 """Dashboard service for KPIs and analytics"""
 from datetime import date, timedelta
-from decimal import Decimal
 from typing import Dict, List, Any
 from uuid import UUID
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import case, select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.movement import Movement, MovementType
 from app.models.alert import Alert
 from app.models.delivery_note import DeliveryNote, DeliveryNoteStatus
+from app.core.cache import TTLCache, invalidate_on_flush
+from app.core.config import settings
+
+
+# Dashboard aggregates, cleared whenever the underlying stock data is written
+dashboard_cache = TTLCache(maxsize=16, ttl=settings.summary_cache_ttl_seconds)
+invalidate_on_flush(dashboard_cache, Alert, Batch, Item, Movement)
 
 
 class DashboardService:
@@ -21,28 +26,41 @@ class DashboardService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
+    @staticmethod
+    def _pickable_stock():
+        """
+        Active, unexpired stock per item, as a subquery.
+        
+        Summed in SQL (ix_batches_fefo_pick covers it) instead of loading
+        every item's batches; items without such stock have no row.
+        """
+        return (
+            select(
+                Batch.item_id,
+                func.sum(Batch.quantity_available).label("quantity"),
+            )
+            .where(
+                Batch.status == BatchStatus.ACTIVE,
+                Batch.expiration_date >= date.today(),
+            )
+            .group_by(Batch.item_id)
+            .subquery()
+        )
+    
     async def get_inventory_value(self) -> Dict[str, Any]:
         """Calculate total inventory value"""
+        stock = self._pickable_stock()
         result = await self.db.execute(
-            select(Item).options(selectinload(Item.batches))
-        )
-        items = result.scalars().all()
-        
-        today = date.today()
-        total_value = Decimal("0")
-        total_quantity = Decimal("0")
-        items_count = 0
-        
-        for item in items:
-            active_qty = sum(
-                b.quantity_available 
-                for b in item.batches 
-                if b.status == BatchStatus.ACTIVE and b.expiration_date >= today
+            select(
+                func.coalesce(func.sum(stock.c.quantity * Item.cost_price), 0),
+                func.coalesce(func.sum(stock.c.quantity), 0),
+                func.count(),
             )
-            if active_qty > 0:
-                items_count += 1
-                total_quantity += active_qty
-                total_value += active_qty * item.cost_price
+            .select_from(stock)
+            .join(Item, Item.id == stock.c.item_id)
+            .where(stock.c.quantity > 0)
+        )
+        total_value, total_quantity, items_count = result.one()
         
         return {
             "total_value": float(total_value),
@@ -53,81 +71,71 @@ class DashboardService:
     
     async def get_inventory_distribution(self) -> List[Dict[str, Any]]:
         """Get inventory distribution by item (for pie chart)"""
+        stock = self._pickable_stock()
+        value = (stock.c.quantity * Item.cost_price).label("value")
         result = await self.db.execute(
-            select(Item).options(selectinload(Item.batches))
+            select(Item.id, Item.sku, Item.name, Item.unit_of_measure, stock.c.quantity, value)
+            .join(stock, stock.c.item_id == Item.id)
+            .where(stock.c.quantity > 0)
+            # Sort by value descending
+            .order_by(value.desc())
         )
-        items = result.scalars().all()
-        
-        today = date.today()
-        distribution = []
         
-        for item in items:
-            active_qty = sum(
-                b.quantity_available 
-                for b in item.batches 
-                if b.status == BatchStatus.ACTIVE and b.expiration_date >= today
-            )
-            if active_qty > 0:
-                value = float(active_qty * item.cost_price)
-                distribution.append({
-                    "item_id": str(item.id),
-                    "sku": item.sku,
-                    "name": item.name,
-                    "quantity": float(active_qty),
-                    "value": value,
-                    "unit": item.unit_of_measure,
-                })
-        
-        # Sort by value descending
-        distribution.sort(key=lambda x: x["value"], reverse=True)
-        return distribution
+        return [
+            {
+                "item_id": str(row.id),
+                "sku": row.sku,
+                "name": row.name,
+                "quantity": float(row.quantity),
+                "value": float(row.value),
+                "unit": row.unit_of_measure,
+            }
+            for row in result.all()
+        ]
     
     async def get_expiration_risk_map(self) -> Dict[str, Any]:
-        """Get expiration risk breakdown (for gauge/risk map)"""
-        today = date.today()
+        """
+        Get expiration risk breakdown (for gauge/risk map).
         
+        Batches are bucketed and their quantity and value summed in SQL,
+        one row per risk level, instead of loading every active batch.
+        """
+        today = date.today()
+        level = case(
+            (Batch.expiration_date < today, "expired"),
+            (Batch.expiration_date <= today + timedelta(days=30), "critical"),
+            (Batch.expiration_date <= today + timedelta(days=60), "warning"),
+            (Batch.expiration_date <= today + timedelta(days=90), "caution"),
+            else_="safe",
+        ).label("level")
         result = await self.db.execute(
-            select(Batch)
-            .options(selectinload(Batch.item))
+            select(
+                level,
+                func.count(),
+                func.sum(Batch.quantity_available),
+                func.sum(Batch.quantity_available * Item.cost_price),
+            )
+            .join(Item, Batch.item_id == Item.id)
             .where(
                 Batch.status == BatchStatus.ACTIVE,
                 Batch.quantity_available > 0,
             )
+            # By output name: the repeated CASE would bind its dates as new parameters
+            .group_by("level")
         )
-        batches = result.scalars().all()
         
         risk_levels = {
-            "expired": {"quantity": Decimal("0"), "value": Decimal("0"), "batches": 0},
-            "critical": {"quantity": Decimal("0"), "value": Decimal("0"), "batches": 0},  # 0-30 days
-            "warning": {"quantity": Decimal("0"), "value": Decimal("0"), "batches": 0},   # 31-60 days
-            "caution": {"quantity": Decimal("0"), "value": Decimal("0"), "batches": 0},   # 61-90 days
-            "safe": {"quantity": Decimal("0"), "value": Decimal("0"), "batches": 0},      # 90+ days
+            "expired": {"quantity": 0.0, "value": 0.0, "batches": 0},
+            "critical": {"quantity": 0.0, "value": 0.0, "batches": 0},  # 0-30 days
+            "warning": {"quantity": 0.0, "value": 0.0, "batches": 0},   # 31-60 days
+            "caution": {"quantity": 0.0, "value": 0.0, "batches": 0},   # 61-90 days
+            "safe": {"quantity": 0.0, "value": 0.0, "batches": 0},      # 90+ days
         }
         
-        for batch in batches:
-            days_until = (batch.expiration_date - today).days
-            cost = batch.item.cost_price if batch.item else Decimal("0")
-            value = batch.quantity_available * cost
-            
-            if days_until < 0:
-                level = "expired"
-            elif days_until <= 30:
-                level = "critical"
-            elif days_until <= 60:
-                level = "warning"
-            elif days_until <= 90:
-                level = "caution"
-            else:
-                level = "safe"
-            
-            risk_levels[level]["quantity"] += batch.quantity_available
-            risk_levels[level]["value"] += value
-            risk_levels[level]["batches"] += 1
-        
-        # Convert to float for JSON
-        for level in risk_levels:
-            risk_levels[level]["quantity"] = float(risk_levels[level]["quantity"])
-            risk_levels[level]["value"] = float(risk_levels[level]["value"])
+        for level_name, batches, quantity, value in result.all():
+            risk_levels[level_name]["quantity"] = float(quantity)
+            risk_levels[level_name]["value"] = float(value)
+            risk_levels[level_name]["batches"] = batches
         
         # Calculate percentages
         total_value = sum(r["value"] for r in risk_levels.values())
@@ -154,32 +162,34 @@ class DashboardService:
     
     async def get_low_stock_items(self) -> List[Dict[str, Any]]:
         """Get items below reorder point"""
+        stock = self._pickable_stock()
+        available = func.coalesce(stock.c.quantity, 0).label("available")
         result = await self.db.execute(
-            select(Item).options(selectinload(Item.batches))
+            select(
+                Item.id,
+                Item.sku,
+                Item.name,
+                Item.reorder_point,
+                Item.min_stock,
+                available,
+            )
+            .outerjoin(stock, stock.c.item_id == Item.id)
+            .where(available < Item.reorder_point)
         )
-        items = result.scalars().all()
-        
-        today = date.today()
-        low_stock = []
         
-        for item in items:
-            available = sum(
-                b.quantity_available 
-                for b in item.batches 
-                if b.status == BatchStatus.ACTIVE and b.expiration_date >= today
-            )
-            
-            if available < item.reorder_point:
-                low_stock.append({
-                    "item_id": str(item.id),
-                    "sku": item.sku,
-                    "name": item.name,
-                    "current_quantity": float(available),
-                    "reorder_point": item.reorder_point,
-                    "min_stock": item.min_stock,
-                    "shortage": float(item.reorder_point - available),
-                    "is_critical": available < item.min_stock,
-                })
+        low_stock = [
+            {
+                "item_id": str(row.id),
+                "sku": row.sku,
+                "name": row.name,
+                "current_quantity": float(row.available),
+                "reorder_point": row.reorder_point,
+                "min_stock": row.min_stock,
+                "shortage": float(row.reorder_point - row.available),
+                "is_critical": row.available < row.min_stock,
+            }
+            for row in result.all()
+        ]
         
         # Sort by shortage descending
         low_stock.sort(key=lambda x: x["shortage"], reverse=True)
@@ -190,22 +200,20 @@ class DashboardService:
         today = date.today()
         start_date = today - timedelta(days=days)
         
-        # Get movements
+        # Per-type movement totals, summed in SQL rather than streaming
+        # every movement of the period through the ORM
         result = await self.db.execute(
-            select(Movement)
+            select(Movement.movement_type, func.count(), func.sum(Movement.quantity))
             .where(func.date(Movement.timestamp) >= start_date)
+            .group_by(Movement.movement_type)
         )
-        movements = result.scalars().all()
-        
-        receipts = sum(
-            m.quantity for m in movements if m.movement_type == MovementType.RECEIPT
-        )
-        dispatches = sum(
-            m.quantity for m in movements if m.movement_type == MovementType.DISPATCH
-        )
-        scraps = sum(
-            m.quantity for m in movements if m.movement_type == MovementType.SCRAP
-        )
+        movement_totals = {
+            movement_type: (count, quantity)
+            for movement_type, count, quantity in result.all()
+        }
+        receipts = movement_totals.get(MovementType.RECEIPT, (0, 0))[1]
+        dispatches = movement_totals.get(MovementType.DISPATCH, (0, 0))[1]
+        scraps = movement_totals.get(MovementType.SCRAP, (0, 0))[1]
         
         # Get delivery notes
         result = await self.db.execute(
@@ -230,7 +238,7 @@ class DashboardService:
             "scraps_quantity": float(scraps),
             "delivery_notes_created": delivery_notes_count,
             "alerts_generated": alerts_count,
-            "movements_count": len(movements),
+            "movements_count": sum(count for count, _ in movement_totals.values()),
         }
     
     async def get_kpi_summary(self) -> Dict[str, Any]:
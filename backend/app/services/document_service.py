@@ -1,8 +1,8 @@
 """Document generation service for delivery notes and reports"""
 import io
-from datetime import date, datetime
+from datetime import date
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from reportlab.lib import colors
@@ -20,15 +20,18 @@ from reportlab.platypus import (
     Image,
 )
 from reportlab.lib.enums import TA_RIGHT, TA_CENTER, TA_LEFT
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.database import explicit_loads
+from app.models.base import uuid7
 from app.models.delivery_note import DeliveryNote, DeliveryNoteItem, DeliveryNoteStatus
 from app.models.customer import Customer
 from app.models.batch import Batch
 from app.models.item import Item
 from app.models.user import User
+from app.services.reference_allocator import delivery_note_number_allocator
 
 
 class DocumentService:
@@ -38,28 +41,8 @@ class DocumentService:
         self.db = db
     
     async def generate_delivery_note_number(self) -> str:
-        """Generate unique delivery note number: DN-YYMMDD-XXXX"""
-        from sqlalchemy import func
-        
-        date_str = datetime.now().strftime("%y%m%d")
-        prefix_pattern = f"DN-{date_str}-%"
-        
-        result = await self.db.execute(
-            select(func.max(DeliveryNote.delivery_note_number))
-            .where(DeliveryNote.delivery_note_number.like(prefix_pattern))
-        )
-        last_dn = result.scalar()
-        
-        if last_dn:
-            try:
-                last_seq = int(last_dn.split("-")[-1])
-                next_seq = last_seq + 1
-            except (ValueError, IndexError):
-                next_seq = 1
-        else:
-            next_seq = 1
-        
-        return f"DN-{date_str}-{next_seq:04d}"
+        """Generate unique delivery note number: DN-YYMMDD-NNNNNN"""
+        return await delivery_note_number_allocator.take(self.db)
     
     async def create_delivery_note(
         self,
@@ -70,20 +53,36 @@ class DocumentService:
         notes: Optional[str] = None,
         issue_date: Optional[date] = None,
     ) -> DeliveryNote:
-        """Create a new delivery note"""
-        # Validate customer
+        """
+        Create a new delivery note.
+        
+        All referenced batches are resolved in one query. The note is
+        flushed and its lines follow as one bulk INSERT, without ORM objects
+        (`items` is not populated on the returned note). The note's
+        items_count and total_quantity are set here from the same lines.
+        """
+        # Validate customer (by id only - loading it would pull its notes)
         result = await self.db.execute(
-            select(Customer).where(Customer.id == customer_id)
+            select(Customer.id).where(Customer.id == customer_id)
         )
-        customer = result.scalar_one_or_none()
-        if not customer:
+        if result.scalar_one_or_none() is None:
             raise ValueError("לקוח לא נמצא")
         
+        # Resolve the item of every batch up front
+        result = await self.db.execute(
+            select(Batch.id, Batch.item_id)
+            .where(Batch.id.in_({item_data["batch_id"] for item_data in items}))
+        )
+        batch_items = dict(result.all())
+        for item_data in items:
+            if item_data["batch_id"] not in batch_items:
+                raise ValueError(f"אצווה לא נמצאה: {item_data['batch_id']}")
+        
         # Generate DN number
         dn_number = await self.generate_delivery_note_number()
         
-        # Create delivery note
         delivery_note = DeliveryNote(
+            id=uuid7(),
             delivery_note_number=dn_number,
             customer_id=customer_id,
             created_by=user_id,
@@ -92,29 +91,24 @@ class DocumentService:
             notes=notes,
             issue_date=issue_date or date.today(),
         )
+        lines = [
+            {
+                "id": uuid7(),
+                "delivery_note_id": delivery_note.id,
+                "item_id": batch_items[item_data["batch_id"]],
+                "batch_id": item_data["batch_id"],
+                "quantity": item_data["quantity"],
+            }
+            for item_data in items
+        ]
+        delivery_note.items_count = len(lines)
+        delivery_note.total_quantity = sum(
+            (line["quantity"] for line in lines), Decimal("0")
+        )
         
         self.db.add(delivery_note)
         await self.db.flush()
-        
-        # Add items
-        for item_data in items:
-            # Get batch to find item_id
-            result = await self.db.execute(
-                select(Batch).where(Batch.id == item_data["batch_id"])
-            )
-            batch = result.scalar_one_or_none()
-            if not batch:
-                raise ValueError(f"אצווה לא נמצאה: {item_data['batch_id']}")
-            
-            dn_item = DeliveryNoteItem(
-                delivery_note_id=delivery_note.id,
-                item_id=batch.item_id,
-                batch_id=item_data["batch_id"],
-                quantity=item_data["quantity"],
-            )
-            self.db.add(dn_item)
-        
-        await self.db.flush()
+        await self.db.execute(insert(DeliveryNoteItem), lines)
         return delivery_note
     
     async def get_delivery_note_with_details(
@@ -122,15 +116,16 @@ class DocumentService:
         delivery_note_id: UUID
     ) -> Optional[DeliveryNote]:
         """Get delivery note with all related data"""
+        customer = selectinload(DeliveryNote.customer)
+        created_by = selectinload(DeliveryNote.created_by_user)
+        items = selectinload(DeliveryNote.items)
+        item = items.selectinload(DeliveryNoteItem.item)
+        batch = items.selectinload(DeliveryNoteItem.batch)
         result = await self.db.execute(
             select(DeliveryNote)
             .options(
-                selectinload(DeliveryNote.customer),
-                selectinload(DeliveryNote.created_by_user),
-                selectinload(DeliveryNote.items)
-                .selectinload(DeliveryNoteItem.item),
-                selectinload(DeliveryNote.items)
-                .selectinload(DeliveryNoteItem.batch),
+                *explicit_loads(customer, created_by, items, item, batch),
+                customer.undefer(Customer.address),
             )
             .where(DeliveryNote.id == delivery_note_id)
         )
@@ -139,8 +134,22 @@ class DocumentService:
     async def generate_delivery_note_pdf(
         self,
         delivery_note_id: UUID
-    ) -> bytes:
-        """Generate PDF for a delivery note"""
+    ) -> Tuple[bytes, str]:
+        """Generate PDF for a delivery note, returned with the note's number"""
+        buffer, delivery_note_number = await self.render_delivery_note_pdf(delivery_note_id)
+        with buffer:
+            return buffer.getvalue(), delivery_note_number
+    
+    async def render_delivery_note_pdf(
+        self,
+        delivery_note_id: UUID
+    ) -> Tuple[io.BytesIO, str]:
+        """
+        Render a delivery note PDF into a buffer positioned at its start.
+        
+        Lets callers stream the document instead of copying it out as bytes;
+        the caller owns (and closes) the returned buffer.
+        """
         dn = await self.get_delivery_note_with_details(delivery_note_id)
         if not dn:
             raise ValueError("תעודת משלוח לא נמצאה")
@@ -269,11 +278,8 @@ class DocumentService:
         # Build PDF
         doc.build(elements)
         
-        # Get PDF bytes
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
-        
-        return pdf_bytes
+        buffer.seek(0)
+        return buffer, dn.delivery_note_number
     
     async def update_delivery_note_status(
         self,
@@ -1,18 +1,44 @@
 """FEFO (First Expired, First Out) Engine for inventory picking"""
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.database import explicit_loads
+from app.core.redis import redis_client
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 
 
+def fefo_summary_cache_key(item_id: UUID) -> str:
+    """Redis key of an item's cached expiration summary"""
+    return f"fefo:summary:{item_id}"
+
+
+def fefo_suggest_cache_key(item_id: UUID, quantity_needed: Decimal) -> str:
+    """Redis key of cached picking suggestions for an item and quantity"""
+    return f"fefo:suggest:{item_id}:{quantity_needed.normalize():f}"
+
+
+async def invalidate_fefo_cache(item_ids: Iterable[UUID]) -> None:
+    """Drop cached suggestions and summaries of items whose stock changed"""
+    if not redis_client.is_connected:
+        return
+    for item_id in set(item_ids):
+        try:
+            await redis_client.invalidate_pattern(f"fefo:*:{item_id}*")
+        except RedisError:
+            # Entries expire after fefo_cache_ttl_seconds regardless
+            pass
+
+
 @dataclass
 class BatchSuggestion:
     """A suggested batch for picking"""
@@ -24,18 +50,6 @@ class BatchSuggestion:
     location_code: Optional[str]
     suggested_quantity: Decimal
     warning_level: str  # "safe", "warning", "critical"
-    
-    def to_dict(self) -> dict:
-        return {
-            "batch_id": str(self.batch_id),
-            "batch_number": self.batch_number,
-            "quantity_available": float(self.quantity_available),
-            "expiration_date": self.expiration_date.isoformat(),
-            "days_until_expiration": self.days_until_expiration,
-            "location_code": self.location_code,
-            "suggested_quantity": float(self.suggested_quantity),
-            "warning_level": self.warning_level,
-        }
 
 
 @dataclass
@@ -46,15 +60,7 @@ class PickingValidation:
     quantity: Decimal
     errors: List[str]
     warnings: List[str]
-    
-    def to_dict(self) -> dict:
-        return {
-            "is_valid": self.is_valid,
-            "batch_id": str(self.batch_id),
-            "quantity": float(self.quantity),
-            "errors": self.errors,
-            "warnings": self.warnings,
-        }
+    item_id: Optional[UUID] = None
 
 
 class FEFOEngine:
@@ -70,6 +76,9 @@ class FEFOEngine:
     WARNING_THRESHOLD = 60
     CAUTION_THRESHOLD = 90
     
+    # Per-request state is the session only
+    __slots__ = ("db",)
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -95,7 +104,7 @@ class FEFOEngine:
         """
         query = (
             select(Batch)
-            .options(selectinload(Batch.location))
+            .options(*explicit_loads(selectinload(Batch.location)))
             .where(
                 Batch.item_id == item_id,
                 Batch.status == BatchStatus.ACTIVE,
@@ -158,8 +167,16 @@ class FEFOEngine:
     
     async def get_total_available(self, item_id: UUID) -> Decimal:
         """Get total available quantity for an item"""
-        batches = await self.get_available_batches(item_id)
-        return sum(b.quantity_available for b in batches)
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(Batch.quantity_available), 0))
+            .where(
+                Batch.item_id == item_id,
+                Batch.status == BatchStatus.ACTIVE,
+                Batch.quantity_available > 0,
+                Batch.expiration_date >= date.today(),
+            )
+        )
+        return Decimal(result.scalar())
     
     async def can_fulfill(self, item_id: UUID, quantity_needed: Decimal) -> bool:
         """Check if requested quantity can be fulfilled"""
@@ -180,109 +197,145 @@ class FEFOEngine:
         - Sufficient quantity available
         - No earlier expiring batches are skipped
         """
-        errors = []
-        warnings = []
-        
-        # Get the batch
-        result = await self.db.execute(
-            select(Batch)
-            .options(selectinload(Batch.item))
-            .where(Batch.id == batch_id)
-        )
-        batch = result.scalar_one_or_none()
-        
-        if not batch:
-            errors.append("אצווה לא נמצאה")  # Batch not found
-            return PickingValidation(
-                is_valid=False,
-                batch_id=batch_id,
-                quantity=quantity,
-                errors=errors,
-                warnings=warnings,
-            )
+        validations = await self.validate_picking_bulk([(batch_id, quantity)])
+        return validations[0]
+    
+    async def validate_picking_bulk(
+        self,
+        picks: List[Tuple[UUID, Decimal]],
+    ) -> List[PickingValidation]:
+        """
+        Validate several picks at once, in the order given.
         
+        Runs the same checks as `validate_picking` with two queries in
+        total: one for the picked batches and one for the FEFO candidates
+        of their items.
+        """
         today = date.today()
-        days_until = (batch.expiration_date - today).days
         
-        # Check if expired
-        if batch.expiration_date < today:
-            errors.append(f"אצווה {batch.batch_number} פגת תוקף")
-            return PickingValidation(
-                is_valid=False,
-                batch_id=batch_id,
-                quantity=quantity,
-                errors=errors,
-                warnings=warnings,
+        # Get the picked batches (columns only - entities would load their collections)
+        result = await self.db.execute(
+            select(
+                Batch.id,
+                Batch.item_id,
+                Batch.batch_number,
+                Batch.status,
+                Batch.quantity_available,
+                Batch.expiration_date,
             )
+            .where(Batch.id.in_({batch_id for batch_id, _ in picks}))
+        )
+        batches = {row.id: row for row in result.all()}
         
-        # Check if batch is active
-        if batch.status != BatchStatus.ACTIVE:
-            errors.append(f"אצווה {batch.batch_number} אינה פעילה (סטטוס: {batch.status.value})")
-            return PickingValidation(
-                is_valid=False,
+        validations = []
+        for batch_id, quantity in picks:
+            errors = []
+            batch = batches.get(batch_id)
+            
+            if not batch:
+                errors.append("אצווה לא נמצאה")  # Batch not found
+            
+            # Check if expired
+            elif batch.expiration_date < today:
+                errors.append(f"אצווה {batch.batch_number} פגת תוקף")
+            
+            # Check if batch is active
+            elif batch.status != BatchStatus.ACTIVE:
+                errors.append(f"אצווה {batch.batch_number} אינה פעילה (סטטוס: {batch.status.value})")
+            
+            # Check quantity
+            elif quantity > batch.quantity_available:
+                errors.append(
+                    f"כמות לא מספיקה באצווה {batch.batch_number}. "
+                    f"זמין: {batch.quantity_available}, נדרש: {quantity}"
+                )
+            
+            validations.append(PickingValidation(
+                is_valid=not errors,
                 batch_id=batch_id,
                 quantity=quantity,
                 errors=errors,
-                warnings=warnings,
-            )
+                warnings=[],
+                item_id=batch.item_id if batch else None,
+            ))
         
-        # Check quantity
-        if quantity > batch.quantity_available:
-            errors.append(
-                f"כמות לא מספיקה באצווה {batch.batch_number}. "
-                f"זמין: {batch.quantity_available}, נדרש: {quantity}"
-            )
-            return PickingValidation(
-                is_valid=False,
-                batch_id=batch_id,
-                quantity=quantity,
-                errors=errors,
-                warnings=warnings,
-            )
+        valid = [v for v in validations if v.is_valid]
+        if not valid:
+            return validations
         
-        # Check for FEFO violations - are there earlier expiring batches?
-        earlier_batches = await self.db.execute(
-            select(Batch)
+        # FEFO candidates of every picked item, earliest expiration first
+        result = await self.db.execute(
+            select(
+                Batch.id,
+                Batch.item_id,
+                Batch.batch_number,
+                Batch.expiration_date,
+            )
             .where(
-                Batch.item_id == batch.item_id,
+                Batch.item_id.in_({batches[v.batch_id].item_id for v in valid}),
                 Batch.status == BatchStatus.ACTIVE,
                 Batch.quantity_available > 0,
-                Batch.expiration_date < batch.expiration_date,
                 Batch.expiration_date >= today,
-                Batch.id != batch_id,
             )
-            .order_by(Batch.expiration_date.asc())
+            .order_by(Batch.item_id, Batch.expiration_date.asc())
         )
-        earlier = list(earlier_batches.scalars().all())
+        candidates: Dict[UUID, list] = defaultdict(list)
+        for row in result.all():
+            candidates[row.item_id].append(row)
         
-        if earlier:
-            earliest = earlier[0]
-            warnings.append(
-                f"שים לב: קיימת אצווה {earliest.batch_number} עם תפוגה מוקדמת יותר "
-                f"({earliest.expiration_date.strftime('%d/%m/%Y')})"
+        for validation in valid:
+            batch = batches[validation.batch_id]
+            
+            # Check for FEFO violations - are there earlier expiring batches?
+            earliest = next(
+                (
+                    other for other in candidates[batch.item_id]
+                    if other.expiration_date < batch.expiration_date and other.id != batch.id
+                ),
+                None,
             )
+            if earliest:
+                validation.warnings.append(
+                    f"שים לב: קיימת אצווה {earliest.batch_number} עם תפוגה מוקדמת יותר "
+                    f"({earliest.expiration_date.strftime('%d/%m/%Y')})"
+                )
+            
+            # Add expiration warnings
+            days_until = (batch.expiration_date - today).days
+            warning_level = self._get_warning_level(days_until)
+            if warning_level == "critical":
+                validation.warnings.append(f"אזהרה: אצווה תפוג תוקף תוך {days_until} ימים!")
+            elif warning_level == "warning":
+                validation.warnings.append(f"שים לב: אצווה תפוג תוקף תוך {days_until} ימים")
         
-        # Add expiration warnings
-        warning_level = self._get_warning_level(days_until)
-        if warning_level == "critical":
-            warnings.append(f"אזהרה: אצווה תפוג תוקף תוך {days_until} ימים!")
-        elif warning_level == "warning":
-            warnings.append(f"שים לב: אצווה תפוג תוקף תוך {days_until} ימים")
-        
-        return PickingValidation(
-            is_valid=True,
-            batch_id=batch_id,
-            quantity=quantity,
-            errors=errors,
-            warnings=warnings,
-        )
+        return validations
     
     async def get_expiration_summary(self, item_id: UUID) -> dict:
         """
         Get expiration breakdown for an item's inventory.
+        
+        Batches are bucketed by warning level and summed in SQL, one row
+        per level, instead of loading every available batch.
         """
-        batches = await self.get_available_batches(item_id, exclude_expired=False)
         today = date.today()
+        # Same buckets as _get_warning_level, as expiration date cut-offs
+        level = case(
+            (Batch.expiration_date <= today, "expired"),
+            (Batch.expiration_date <= today + timedelta(days=self.CRITICAL_THRESHOLD), "critical"),
+            (Batch.expiration_date <= today + timedelta(days=self.WARNING_THRESHOLD), "warning"),
+            (Batch.expiration_date <= today + timedelta(days=self.CAUTION_THRESHOLD), "caution"),
+            else_="safe",
+        ).label("level")
+        result = await self.db.execute(
+            select(level, func.count(), func.sum(Batch.quantity_available))
+            .where(
+                Batch.item_id == item_id,
+                Batch.status == BatchStatus.ACTIVE,
+                Batch.quantity_available > 0,
+            )
+            # By output name: the repeated CASE would bind its dates as new parameters
+            .group_by("level")
+        )
         
         summary = {
             "total_quantity": Decimal("0"),
@@ -294,16 +347,11 @@ class FEFOEngine:
             "safe": {"quantity": Decimal("0"), "batches": 0},
         }
         
-        for batch in batches:
-            days_until = (batch.expiration_date - today).days
-            level = self._get_warning_level(days_until)
-            
-            summary["total_quantity"] += batch.quantity_available
-            summary["total_batches"] += 1
-            
-            if level in summary:
-                summary[level]["quantity"] += batch.quantity_available
-                summary[level]["batches"] += 1
+        for level_name, batches, quantity in result.all():
+            summary["total_quantity"] += quantity
+            summary["total_batches"] += batches
+            summary[level_name]["quantity"] += quantity
+            summary[level_name]["batches"] += batches
         
         return summary
 
@@ -1,13 +1,15 @@
 """Inventory service for stock management operations"""
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import Row, insert, select, func, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import undefer
 
+from app.core.database import guard_lazy_loads
+from app.models.base import uuid7
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.movement import Movement, MovementType
@@ -17,14 +19,26 @@ from app.models.user import User
 class InventoryService:
     """Service for inventory management operations"""
     
+    # Per-request state is the session only
+    __slots__ = ("db",)
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
     async def get_item_stock_summary(self, item_id: UUID) -> dict:
-        """Get stock summary for an item"""
+        """
+        Get stock summary for an item.
+        
+        Totals come from the item's SQL aggregates and the expiration
+        breakdown is summed in SQL; the batches themselves are not loaded.
+        """
         result = await self.db.execute(
             select(Item)
-            .options(selectinload(Item.batches))
+            .options(
+                undefer(Item.total_quantity_available),
+                undefer(Item.active_batches_count),
+                guard_lazy_loads(),
+            )
             .where(Item.id == item_id)
         )
         item = result.scalar_one_or_none()
@@ -32,29 +46,28 @@ class InventoryService:
         if not item:
             return None
         
-        active_batches = [b for b in item.batches if b.status == BatchStatus.ACTIVE]
+        # Categorize by expiration, as expiration date cut-offs
+        today = date.today()
         
-        total_quantity = sum(b.quantity_available for b in active_batches)
-        total_value = total_quantity * item.cost_price
+        def expiring(first_day: int, last_day: Optional[int] = None):
+            condition = Batch.expiration_date >= today + timedelta(days=first_day)
+            if last_day is not None:
+                condition &= Batch.expiration_date <= today + timedelta(days=last_day)
+            return func.coalesce(func.sum(Batch.quantity_available).filter(condition), 0)
         
-        # Categorize by expiration
-        today = date.today()
-        expiring_30 = sum(
-            b.quantity_available for b in active_batches
-            if 0 <= (b.expiration_date - today).days <= 30
-        )
-        expiring_60 = sum(
-            b.quantity_available for b in active_batches
-            if 30 < (b.expiration_date - today).days <= 60
-        )
-        expiring_90 = sum(
-            b.quantity_available for b in active_batches
-            if 60 < (b.expiration_date - today).days <= 90
-        )
-        safe = sum(
-            b.quantity_available for b in active_batches
-            if (b.expiration_date - today).days > 90
+        result = await self.db.execute(
+            select(
+                expiring(0, 30),
+                expiring(31, 60),
+                expiring(61, 90),
+                expiring(91),
+            )
+            .where(Batch.item_id == item_id, Batch.status == BatchStatus.ACTIVE)
         )
+        expiring_30, expiring_60, expiring_90, safe = result.one()
+        
+        total_quantity = item.total_quantity_available
+        total_value = total_quantity * item.cost_price
         
         return {
             "item_id": item.id,
@@ -63,7 +76,7 @@ class InventoryService:
             "total_quantity": total_quantity,
             "total_value": total_value,
             "unit_of_measure": item.unit_of_measure,
-            "batches_count": len(active_batches),
+            "batches_count": item.active_batches_count,
             "is_below_reorder": total_quantity < item.reorder_point,
             "expiration_breakdown": {
                 "critical_30_days": expiring_30,
@@ -85,7 +98,10 @@ class InventoryService:
         """Record an inventory movement (audit trail)"""
         # Get batch with lock for update
         result = await self.db.execute(
-            select(Batch).where(Batch.id == batch_id).with_for_update()
+            select(Batch)
+            .options(guard_lazy_loads())
+            .where(Batch.id == batch_id)
+            .with_for_update()
         )
         batch = result.scalar_one_or_none()
         
@@ -93,27 +109,10 @@ class InventoryService:
             raise ValueError(f"אצווה {batch_id} לא נמצאה")  # Batch not found
         
         quantity_before = batch.quantity_available
+        quantity_after = self._quantity_after(movement_type, quantity_before, quantity)
         
-        # Calculate new quantity based on movement type
-        if movement_type in (MovementType.RECEIPT,):
-            quantity_after = quantity_before + quantity
-        elif movement_type in (MovementType.DISPATCH, MovementType.SCRAP):
-            if quantity > quantity_before:
-                raise ValueError(
-                    f"כמות לא מספיקה. זמין: {quantity_before}, נדרש: {quantity}"
-                )
-            quantity_after = quantity_before - quantity
-        elif movement_type == MovementType.ADJUSTMENT:
-            # Adjustment can be positive or negative
-            quantity_after = quantity_before + quantity
-            if quantity_after < 0:
-                raise ValueError("כמות לא יכולה להיות שלילית")
-        else:
-            quantity_after = quantity_before
-        
-        # Update batch quantity
+        # Update batch quantity (the ORM bumps the version)
         batch.quantity_available = quantity_after
-        batch.version += 1
         
         # Check if depleted
         if batch.quantity_available <= 0:
@@ -137,6 +136,97 @@ class InventoryService:
         
         return movement
     
+    @staticmethod
+    def _quantity_after(
+        movement_type: MovementType,
+        quantity_before: Decimal,
+        quantity: Decimal,
+    ) -> Decimal:
+        """Calculate a batch's new quantity based on movement type"""
+        if movement_type in (MovementType.RECEIPT,):
+            return quantity_before + quantity
+        elif movement_type in (MovementType.DISPATCH, MovementType.SCRAP):
+            if quantity > quantity_before:
+                raise ValueError(
+                    f"כמות לא מספיקה. זמין: {quantity_before}, נדרש: {quantity}"
+                )
+            return quantity_before - quantity
+        elif movement_type == MovementType.ADJUSTMENT:
+            # Adjustment can be positive or negative
+            quantity_after = quantity_before + quantity
+            if quantity_after < 0:
+                raise ValueError("כמות לא יכולה להיות שלילית")
+            return quantity_after
+        return quantity_before
+    
+    async def record_movements_bulk(
+        self,
+        entries: List[Tuple[UUID, Decimal]],
+        movement_type: MovementType,
+        user_id: UUID,
+        reference_number: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Record one movement per (batch_id, quantity) entry, in order.
+        
+        Same rules as `record_movement`, but all batches are locked in one
+        query, the batch quantities are written back in one bulk UPDATE and
+        the movements go out as one bulk INSERT. Entries for the same batch
+        apply one after another.
+        
+        Returns the inserted movement rows as dicts (no ORM objects are
+        created for them).
+        """
+        # Lock every batch up front, in id order so concurrent writers cannot deadlock
+        result = await self.db.execute(
+            select(Batch.id, Batch.quantity_available, Batch.version)
+            .where(Batch.id.in_({batch_id for batch_id, _ in entries}))
+            .order_by(Batch.id)
+            .with_for_update()
+        )
+        batches = {
+            row.id: {"id": row.id, "quantity_available": row.quantity_available, "version": row.version}
+            for row in result.all()
+        }
+        
+        now = datetime.now(timezone.utc)
+        movements = []
+        for batch_id, quantity in entries:
+            batch = batches.get(batch_id)
+            if batch is None:
+                raise ValueError(f"אצווה {batch_id} לא נמצאה")  # Batch not found
+            
+            quantity_before = batch["quantity_available"]
+            quantity_after = self._quantity_after(movement_type, quantity_before, quantity)
+            batch["quantity_available"] = quantity_after
+            
+            movements.append({
+                "id": uuid7(),
+                "batch_id": batch_id,
+                "user_id": user_id,
+                "movement_type": movement_type,
+                "quantity": abs(quantity),
+                "quantity_before": quantity_before,
+                "quantity_after": quantity_after,
+                "reference_number": reference_number,
+                "notes": notes,
+                "timestamp": now,
+            })
+        
+        # Depleted batches change status along with their quantity
+        for batch in batches.values():
+            if batch["quantity_available"] <= 0:
+                batch["status"] = BatchStatus.DEPLETED
+        
+        # ORM bulk UPDATE by primary key, checked against the version read
+        # above and bumping it once per batch; rows setting status are grouped
+        # separately
+        await self.db.execute(update(Batch), list(batches.values()))
+        await self.db.execute(insert(Movement), movements)
+        
+        return movements
+    
     async def adjust_quantity(
         self,
         batch_id: UUID,
@@ -146,14 +236,14 @@ class InventoryService:
     ) -> Movement:
         """Adjust batch quantity (e.g., after physical count)"""
         result = await self.db.execute(
-            select(Batch).where(Batch.id == batch_id)
+            select(Batch.quantity_available).where(Batch.id == batch_id)
         )
-        batch = result.scalar_one_or_none()
+        quantity_available = result.scalar_one_or_none()
         
-        if not batch:
+        if quantity_available is None:
             raise ValueError(f"אצווה {batch_id} לא נמצאה")
         
-        adjustment = new_quantity - batch.quantity_available
+        adjustment = new_quantity - quantity_available
         
         return await self.record_movement(
             batch_id=batch_id,
@@ -171,17 +261,24 @@ class InventoryService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         limit: int = 100,
+        after: Optional[Tuple[datetime, UUID]] = None,
     ) -> List[Movement]:
-        """Get movement history with filters"""
+        """
+        Get movement history with filters, newest first.
+        
+        `after` is the (timestamp, id) of the last movement already seen;
+        only older movements are returned (keyset pagination). Related
+        batches and users are not loaded; see `get_movement_labels`.
+        """
         query = (
             select(Movement)
-            .options(
-                selectinload(Movement.batch).selectinload(Batch.item),
-                selectinload(Movement.user)
-            )
-            .order_by(Movement.timestamp.desc())
+            .options(undefer(Movement.notes), guard_lazy_loads())
+            .order_by(Movement.timestamp.desc(), Movement.id.desc())
         )
         
+        if after:
+            query = query.where(tuple_(Movement.timestamp, Movement.id) < tuple_(*after))
+        
         if batch_id:
             query = query.where(Movement.batch_id == batch_id)
         
@@ -202,15 +299,64 @@ class InventoryService:
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def get_movement_labels(
+        self,
+        movements: List[Movement],
+    ) -> Tuple[Dict[UUID, str], Dict[UUID, Row]]:
+        """
+        Look up display labels for a page of movements.
+        
+        Returns user names by user id, and (batch_number, sku, name) rows by
+        batch id. Each distinct user and batch is fetched once with a
+        column-only IN query instead of hydrating related ORM objects.
+        """
+        if not movements:
+            return {}, {}
+        
+        users = await self.db.execute(
+            select(User.id, User.full_name)
+            .where(User.id.in_({m.user_id for m in movements}))
+        )
+        batches = await self.db.execute(
+            select(Batch.id, Batch.batch_number, Item.sku, Item.name)
+            .join(Item, Batch.item_id == Item.id)
+            .where(Batch.id.in_({m.batch_id for m in movements}))
+        )
+        return dict(users.all()), {row.id: row for row in batches.all()}
+    
+    async def get_movement_summary(
+        self,
+        item_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[MovementType, Decimal]:
+        """Total moved quantity per movement type for an item's batches"""
+        query = (
+            select(Movement.movement_type, func.sum(Movement.quantity))
+            .join(Batch, Movement.batch_id == Batch.id)
+            .where(Batch.item_id == item_id)
+            .group_by(Movement.movement_type)
+        )
+        
+        if start_date:
+            query = query.where(func.date(Movement.timestamp) >= start_date)
+        
+        if end_date:
+            query = query.where(func.date(Movement.timestamp) <= end_date)
+        
+        result = await self.db.execute(query)
+        return {movement_type: total for movement_type, total in result.all()}
+    
     async def check_and_mark_expired(self) -> List[Batch]:
         """Check for expired batches and mark them as scrap"""
         today = date.today()
         
         result = await self.db.execute(
             select(Batch)
+            .options(undefer(Batch.notes), guard_lazy_loads())
             .where(
                 Batch.status == BatchStatus.ACTIVE,
-                Batch.expiration_date < today,
+                Batch.is_expired,
             )
         )
         expired_batches = list(result.scalars().all())
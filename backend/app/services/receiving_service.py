@@ -1,17 +1,37 @@
 """Goods Receipt service for receiving inventory"""
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 from uuid import UUID
 
-from sqlalchemy import select, func
+from redis.exceptions import RedisError
+from sqlalchemy import insert, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.redis import redis_client
+from app.models.base import uuid7
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.location import Location
 from app.models.movement import Movement, MovementType
 from app.schemas.batch import BatchCreate
+from app.services.reference_allocator import batch_number_allocator, next_reference_numbers
+
+
+def barcode_cache_key(sku: str) -> str:
+    """Redis key of a scanned SKU's cached item info"""
+    return f"item:sku:{sku}"
+
+
+async def invalidate_barcode_cache(skus: Iterable[str]) -> None:
+    """Drop cached barcode lookups of items that changed or were deleted"""
+    if not redis_client.is_connected:
+        return
+    try:
+        await redis_client.client.unlink(*{barcode_cache_key(sku) for sku in skus})
+    except RedisError:
+        # Entries expire after barcode_cache_ttl_seconds regardless
+        pass
 
 
 class ReceivingService:
@@ -21,27 +41,14 @@ class ReceivingService:
         self.db = db
     
     async def generate_batch_number(self, prefix: str = "GR") -> str:
-        """Generate unique batch number: GR-YYMMDD-XXX"""
-        date_str = datetime.now().strftime("%y%m%d")
-        prefix_pattern = f"{prefix}-{date_str}-%"
-        
-        # Find highest sequence for today
-        result = await self.db.execute(
-            select(func.max(Batch.batch_number))
-            .where(Batch.batch_number.like(prefix_pattern))
-        )
-        last_batch = result.scalar()
-        
-        if last_batch:
-            try:
-                last_seq = int(last_batch.split("-")[-1])
-                next_seq = last_seq + 1
-            except (ValueError, IndexError):
-                next_seq = 1
-        else:
-            next_seq = 1
-        
-        return f"{prefix}-{date_str}-{next_seq:03d}"
+        """Generate unique batch number: GR-YYMMDD-NNNNNN"""
+        return (await self.generate_batch_numbers(1, prefix))[0]
+    
+    async def generate_batch_numbers(self, count: int, prefix: str = "GR") -> list[str]:
+        """Generate unique batch numbers, from the sequence pool when available"""
+        if prefix == batch_number_allocator.prefix:
+            return await batch_number_allocator.take_many(self.db, count)
+        return await next_reference_numbers(self.db, Batch.batch_number, prefix, count)
     
     async def generate_grn_number(self) -> str:
         """Generate Goods Receipt Note number"""
@@ -59,6 +66,32 @@ class ReceivingService:
         
         return item
     
+    async def lookup_barcode(self, sku: str) -> Optional[dict]:
+        """Item info for a scanned barcode/SKU, or None if unknown"""
+        result = await self.db.execute(
+            select(
+                Item.id,
+                Item.sku,
+                Item.name,
+                Item.supplier,
+                Item.unit_of_measure,
+                Item.cost_price,
+            )
+            .where(Item.sku == sku)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        
+        return {
+            "item_id": row.id,
+            "sku": row.sku,
+            "name": row.name,
+            "supplier": row.supplier,
+            "unit_of_measure": row.unit_of_measure,
+            "cost_price": row.cost_price,
+        }
+    
     async def validate_location(self, location_id: UUID) -> Location:
         """Validate location exists and is active"""
         result = await self.db.execute(
@@ -160,7 +193,7 @@ class ReceivingService:
         self,
         receipts: list[dict],
         user_id: UUID,
-    ) -> tuple[list[Batch], list[Movement], str]:
+    ) -> tuple[list[Batch], list[dict], str]:
         """
         Receive multiple items in a single GRN
         
@@ -172,76 +205,101 @@ class ReceivingService:
             - supplier_batch_number (optional)
             - location_id (optional)
             - notes (optional)
+        
+        Movements are returned as the inserted row dicts.
         """
+        # Validate all items and locations up front - one query each
+        item_ids = {receipt["item_id"] for receipt in receipts}
+        result = await self.db.execute(
+            select(Item.id, Item.sku).where(Item.id.in_(item_ids))
+        )
+        skus = dict(result.all())
+        if len(skus) != len(item_ids):
+            raise ValueError("פריט לא נמצא")  # Item not found
+        
+        location_ids = {
+            receipt["location_id"] for receipt in receipts
+            if receipt.get("location_id")
+        }
+        if location_ids:
+            result = await self.db.execute(
+                select(func.count(Location.id)).where(
+                    Location.id.in_(location_ids),
+                    Location.is_active == True
+                )
+            )
+            if result.scalar() != len(location_ids):
+                raise ValueError("מיקום לא נמצא או לא פעיל")  # Location not found or inactive
+        
+        today = date.today()
+        for receipt in receipts:
+            if receipt["expiration_date"] < today:
+                raise ValueError(
+                    f"תאריך תפוגה לא תקין עבור פריט {skus[receipt['item_id']]}"
+                )
+        
         grn_number = await self.generate_grn_number()
+        
+        # Number the batches that came without one in a single lookup
+        missing = sum(1 for receipt in receipts if not receipt.get("batch_number"))
+        generated = iter(await self.generate_batch_numbers(missing) if missing else [])
+        
         batches = []
         movements = []
+        timestamp = datetime.now(timezone.utc)
         
         for receipt in receipts:
-            item = await self.validate_item(receipt["item_id"])
-            
-            if receipt.get("location_id"):
-                await self.validate_location(receipt["location_id"])
-            
-            # Validate expiration
-            expiration_date = receipt["expiration_date"]
-            if expiration_date < date.today():
-                raise ValueError(
-                    f"תאריך תפוגה לא תקין עבור פריט {item.sku}"
-                )
-            
-            # Generate batch number if needed
-            batch_number = receipt.get("batch_number")
-            if not batch_number:
-                batch_number = await self.generate_batch_number()
-            
             quantity = Decimal(str(receipt["quantity"]))
             
+            # Primary keys are generated client-side, so movements can
+            # reference their batch before anything is flushed
             batch = Batch(
+                id=uuid7(),
                 item_id=receipt["item_id"],
-                batch_number=batch_number,
+                batch_number=receipt.get("batch_number") or next(generated),
                 supplier_batch_number=receipt.get("supplier_batch_number"),
                 quantity_received=quantity,
                 quantity_available=quantity,
-                receipt_date=date.today(),
-                expiration_date=expiration_date,
+                receipt_date=today,
+                expiration_date=receipt["expiration_date"],
                 location_id=receipt.get("location_id"),
                 status=BatchStatus.ACTIVE,
                 notes=receipt.get("notes"),
             )
-            
-            self.db.add(batch)
-            await self.db.flush()
-            
-            movement = Movement(
-                batch_id=batch.id,
-                user_id=user_id,
-                movement_type=MovementType.RECEIPT,
-                quantity=quantity,
-                quantity_before=Decimal("0"),
-                quantity_after=quantity,
-                reference_number=grn_number,
-                notes=f"קבלת סחורה: {item.sku}",
-                timestamp=datetime.now(timezone.utc),
-            )
-            
-            self.db.add(movement)
             batches.append(batch)
-            movements.append(movement)
+            movements.append({
+                "id": uuid7(),
+                "batch_id": batch.id,
+                "user_id": user_id,
+                "movement_type": MovementType.RECEIPT,
+                "quantity": quantity,
+                "quantity_before": Decimal("0"),
+                "quantity_after": quantity,
+                "reference_number": grn_number,
+                "notes": f"קבלת סחורה: {skus[receipt['item_id']]}",
+                "timestamp": timestamp,
+            })
         
+        # One flush for the batches, then the movements as one bulk INSERT
+        # without ORM objects
+        self.db.add_all(batches)
         await self.db.flush()
+        await self.db.execute(insert(Movement), movements)
         return batches, movements, grn_number
     
     def validate_expiration_warning(
         self,
         expiration_date: date,
-        warning_threshold_days: int = 180
+        warning_threshold_days: int = 180,
+        today: Optional[date] = None,
     ) -> dict:
         """
         Check if expiration date triggers a warning
         Returns warning info if applicable
+        
+        Pass `today` when checking many dates, to read the clock once.
         """
-        days_until = (expiration_date - date.today()).days
+        days_until = (expiration_date - (today or date.today())).days
         
         if days_until < 30:
             return {
@@ -0,0 +1,156 @@
+"""Pre-allocated document reference numbers backed by a database sequence"""
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional
+
+from sqlalchemy import Sequence, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.models.batch import Batch, batch_number_seq
+from app.models.delivery_note import DeliveryNote, delivery_note_number_seq
+from app.models.movement import Movement, dispatch_reference_seq
+
+
+def format_reference_number(prefix: str, value: int) -> str:
+    """Today's reference number for a counter value, e.g. GR-251015-000123"""
+    date_str = datetime.now().strftime("%y%m%d")
+    return f"{prefix}-{date_str}-{value:06d}"
+
+
+async def next_reference_numbers(
+    db: AsyncSession,
+    column: InstrumentedAttribute,
+    prefix: str,
+    count: int = 1,
+) -> list[str]:
+    """
+    Continue today's highest `prefix` number stored in `column`.
+    
+    Fallback for databases without sequences (e.g. SQLite); the numbers
+    are only unique until another transaction takes the same ones.
+    """
+    date_str = datetime.now().strftime("%y%m%d")
+    result = await db.execute(
+        select(func.max(column)).where(column.like(f"{prefix}-{date_str}-%"))
+    )
+    last_number = result.scalar()
+    
+    next_value = 1
+    if last_number:
+        try:
+            next_value = int(last_number.split("-")[-1]) + 1
+        except ValueError:
+            pass
+    
+    return [
+        format_reference_number(prefix, value)
+        for value in range(next_value, next_value + count)
+    ]
+
+
+class ReferenceNumberAllocator:
+    """
+    Hands out reference numbers (e.g. DSP-251015-000123) from memory.
+    
+    Sequence values are reserved `batch_size` at a time in one query and
+    topped up in the background when fewer than `low_water` remain, so
+    taking a number normally needs no database round-trip. Values are
+    unique but not gap-free: numbers left over at shutdown are skipped.
+    Without sequence support, take() continues today's highest number
+    stored in `column` instead.
+    """
+    
+    def __init__(
+        self,
+        prefix: str,
+        sequence: Sequence,
+        column: InstrumentedAttribute,
+        batch_size: int = 100,
+        low_water: int = 20,
+    ):
+        self.prefix = prefix
+        self.sequence = sequence
+        self.column = column
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self._values: Deque[int] = deque()
+        self._lock = asyncio.Lock()
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._refill_task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_started(self) -> bool:
+        """Whether start() found a database with sequence support"""
+        return self._session_factory is not None
+    
+    async def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Reserve the first batch of numbers (PostgreSQL only)"""
+        async with session_factory() as session:
+            if session.bind.dialect.name != "postgresql":
+                return
+        self._session_factory = session_factory
+        await self._refill()
+    
+    async def stop(self) -> None:
+        """Cancel a pending refill"""
+        if self._refill_task:
+            self._refill_task.cancel()
+        self._session_factory = None
+    
+    async def take(self, db: AsyncSession) -> str:
+        """Take the next reference number"""
+        return (await self.take_many(db, 1))[0]
+    
+    async def take_many(self, db: AsyncSession, count: int) -> list[str]:
+        """Take `count` reference numbers, from the pool when started"""
+        if self.is_started:
+            # Pre-reserved from the sequence - no database round-trip
+            return [await self.get() for _ in range(count)]
+        return await next_reference_numbers(db, self.column, self.prefix, count)
+    
+    async def get(self) -> str:
+        """Take the next reference number from the pool (requires start())"""
+        while not self._values:
+            await self._refill()
+        value = self._values.popleft()
+        
+        if len(self._values) < self.low_water and (
+            self._refill_task is None or self._refill_task.done()
+        ):
+            self._refill_task = asyncio.create_task(self._refill())
+        
+        return format_reference_number(self.prefix, value)
+    
+    async def _refill(self) -> None:
+        """Reserve another batch of sequence values in one query"""
+        async with self._lock:
+            # Another caller may have refilled while we waited
+            if len(self._values) >= self.low_water:
+                return
+            async with self._session_factory() as session:
+                result = await session.execute(
+                    select(self.sequence.next_value())
+                    .select_from(func.generate_series(1, self.batch_size))
+                )
+                self._values.extend(sorted(result.scalars().all()))
+
+
+# Global allocators for document and batch numbers
+dispatch_reference_allocator = ReferenceNumberAllocator(
+    "DSP", dispatch_reference_seq, Movement.reference_number
+)
+batch_number_allocator = ReferenceNumberAllocator(
+    "GR", batch_number_seq, Batch.batch_number
+)
+delivery_note_number_allocator = ReferenceNumberAllocator(
+    "DN", delivery_note_number_seq, DeliveryNote.delivery_note_number
+)
+
+# Started and stopped together with the application
+reference_allocators = (
+    dispatch_reference_allocator,
+    batch_number_allocator,
+    delivery_note_number_allocator,
+)
@@ -0,0 +1,39 @@
+"""Alert check jobs triggered from the API"""
+import logging
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Job status by id; finished jobs are forgotten after an hour
+check_jobs = TTLCache(maxsize=1000, ttl=3600)
+
+
+def create_check_job() -> str:
+    """Register a pending alert check job and return its id"""
+    job_id = str(uuid4())
+    check_jobs.set(job_id, {"job_id": job_id, "status": "pending"})
+    return job_id
+
+
+async def run_check_job(
+    job_id: str, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    """Run all alert checks on a dedicated session and record the outcome"""
+    from app.services.alert_service import AlertService
+    
+    check_jobs.set(job_id, {"job_id": job_id, "status": "running"})
+    
+    async with session_factory() as db:
+        try:
+            result = await AlertService(db).run_all_checks()
+        except Exception as e:
+            logger.error(f"Error in alert check job {job_id}: {e}")
+            await db.rollback()
+            check_jobs.set(job_id, {"job_id": job_id, "status": "failed", "error": str(e)})
+            return
+    
+    check_jobs.set(job_id, {"job_id": job_id, "status": "completed", "results": result})
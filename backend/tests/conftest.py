@@ -9,10 +9,13 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool
 
-from app.core.database import Base, get_db
+from app.api.deps import invalidate_user_cache
+from app.core.database import Base, get_db, get_session_factory
 from app.core.security import get_password_hash
 from app.main import app
 from app.models.user import User, UserRole
+from app.services.alert_service import alert_summary_cache
+from app.services.dashboard_service import dashboard_cache
 
 
 # Test database URL (use SQLite for testing)
@@ -43,6 +46,14 @@ def event_loop() -> Generator:
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    """Start every test with empty in-process caches"""
+    invalidate_user_cache()
+    alert_summary_cache.clear()
+    dashboard_cache.clear()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """Create test database session"""
@@ -64,6 +75,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: test_session_maker
     
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
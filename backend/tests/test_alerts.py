@@ -331,8 +331,21 @@ class TestAlertsAPI:
         )
         
         assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 3
+        assert data["has_more"] is False
+        assert data["total"] is None
+        
+        response = await client.get(
+            "/api/v1/alerts",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            params={"include_total": True, "page_size": 2},
+        )
+        
         data = response.json()
         assert data["total"] == 3
+        assert data["pages"] == 2
+        assert data["has_more"] is True
     
     async def test_mark_alert_read_api(self, client, auth_token, db_session):
         """Test marking alert as read via API"""
@@ -353,6 +366,26 @@ class TestAlertsAPI:
         assert response.status_code == 200
         assert response.json()["success"] is True
     
+    async def test_alerts_summary_invalidated_on_read(self, client, auth_token, db_session):
+        """Test that the cached summary is refreshed after an alert is read"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        service = AlertService(db_session)
+        alert = await service.create_alert(
+            alert_type=AlertType.LOW_STOCK,
+            severity=AlertSeverity.CRITICAL,
+            title="Test Alert",
+            message="Test message",
+        )
+        await db_session.commit()
+        
+        response = await client.get("/api/v1/alerts/summary", headers=headers)
+        assert response.json()["critical"] == 1
+        
+        await client.put(f"/api/v1/alerts/{alert.id}/read", headers=headers)
+        
+        response = await client.get("/api/v1/alerts/summary", headers=headers)
+        assert response.json()["critical"] == 0
+    
     async def test_mark_all_read_api(self, client, auth_token, db_session):
         """Test marking all alerts as read via API"""
         service = AlertService(db_session)
@@ -381,7 +414,17 @@ class TestAlertsAPI:
             headers={"Authorization": f"Bearer {auth_token}"}
         )
         
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = response.json()
         assert data["success"] is True
-        assert "results" in data
+        assert data["status"] == "pending"
+        
+        response = await client.get(
+            f"/api/v1/alerts/run-checks/{data['job_id']}",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        assert "total_new_alerts" in data["results"]
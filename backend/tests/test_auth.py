@@ -1,7 +1,9 @@
 """Tests for authentication endpoints"""
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import _user_cache, invalidate_user_cache
 from app.models.user import User
 
 
@@ -95,6 +97,24 @@ async def test_get_current_user(client: AsyncClient, test_user: User, auth_heade
     assert data["email"] == "test@example.com"
 
 
+@pytest.mark.asyncio
+async def test_current_user_cache(
+    client: AsyncClient, db_session: AsyncSession, test_user: User, auth_headers: dict
+):
+    """Test that user lookups are cached and can be invalidated"""
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert _user_cache.get(test_user.id) is not None
+    
+    test_user.is_active = False
+    await db_session.commit()
+    invalidate_user_cache(test_user.id)
+    assert _user_cache.get(test_user.id) is None
+    
+    response = await client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == 403
+
+
 @pytest.mark.asyncio
 async def test_get_current_user_unauthorized(client: AsyncClient):
     """Test getting current user without auth fails"""
@@ -126,3 +146,17 @@ async def test_refresh_token(client: AsyncClient, test_user: User):
     assert "refresh_token" in data
 
 
+@pytest.mark.asyncio
+async def test_register_duplicate_email(client: AsyncClient, test_user: User):
+    """Test registration with duplicate email fails"""
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "anotheruser",
+            "email": "test@example.com",  # Same as test_user
+            "full_name": "Another User",
+            "password": "securepassword123",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "כתובת אימייל כבר קיימת"
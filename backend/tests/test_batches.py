@@ -0,0 +1,255 @@
+"""Tests for batch endpoints"""
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.batch import Batch, BatchStatus
+from app.models.item import Item
+from app.models.location import Location
+
+
+@pytest.fixture
+async def item_with_batches(db_session: AsyncSession) -> tuple[Item, list[Batch]]:
+    """Create an item with five active batches on distinct expiration dates"""
+    item = Item(
+        id=uuid4(),
+        sku="BATCH-LIST-001",
+        name="Batch List Ink",
+        supplier="Test Supplier",
+        unit_of_measure="KG",
+        cost_price=Decimal("10.00"),
+    )
+    db_session.add(item)
+    await db_session.flush()
+    
+    batches = []
+    for i in range(5):
+        batch = Batch(
+            id=uuid4(),
+            item_id=item.id,
+            batch_number=f"LIST-BATCH-{i:03d}",
+            quantity_received=Decimal("10"),
+            quantity_available=Decimal("10"),
+            receipt_date=date.today(),
+            expiration_date=date.today() + timedelta(days=30 * (5 - i)),
+            status=BatchStatus.ACTIVE,
+        )
+        db_session.add(batch)
+        batches.append(batch)
+    
+    await db_session.commit()
+    return item, batches
+
+
+@pytest.mark.asyncio
+async def test_list_batches_cursor_pagination(
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test walking all batches in FEFO order using next_cursor"""
+    seen = []
+    params = {"page_size": 2}
+    
+    while True:
+        response = await client.get("/api/v1/batches", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert "total" not in data
+        seen.extend(b["batch_number"] for b in data["items"])
+        if not data["next_cursor"]:
+            break
+        params = {"page_size": 2, "cursor": data["next_cursor"]}
+    
+    # Batches were created latest-expiring first, so FEFO order is reversed
+    assert seen == [f"LIST-BATCH-{i:03d}" for i in reversed(range(5))]
+
+
+@pytest.mark.asyncio
+async def test_list_batches_unsorted_cursor_pagination(
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test that unsorted listing pages by id and its cursor only resumes that order"""
+    _, batches = item_with_batches
+    seen = []
+    params = {"page_size": 2, "sort_by_expiration": False}
+    
+    while True:
+        response = await client.get("/api/v1/batches", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["has_more"] == (data["next_cursor"] is not None)
+        seen.extend(b["id"] for b in data["items"])
+        if not data["next_cursor"]:
+            break
+        params = {**params, "cursor": data["next_cursor"]}
+    
+    assert seen == sorted(str(b.id) for b in batches)
+    
+    # A FEFO cursor cannot resume the id ordering
+    response = await client.get("/api/v1/batches", headers=auth_headers, params={"page_size": 2})
+    response = await client.get(
+        "/api/v1/batches",
+        headers=auth_headers,
+        params={"sort_by_expiration": False, "cursor": response.json()["next_cursor"]},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_batches_invalid_cursor(client: AsyncClient, auth_headers: dict):
+    """Test that a malformed cursor is rejected"""
+    response = await client.get(
+        "/api/v1/batches", headers=auth_headers, params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_expiring_soon_computed_fields(
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test that expiring batches carry item data and computed fields"""
+    response = await client.get(
+        "/api/v1/batches/expiring-soon", headers=auth_headers, params={"days": 60}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert [b["days_until_expiration"] for b in data] == [30, 60]
+    assert all(b["item_sku"] == "BATCH-LIST-001" for b in data)
+    assert all(b["is_expired"] is False for b in data)
+    assert Decimal(data[0]["inventory_value"]) == Decimal("100")
+
+
+@pytest.mark.asyncio
+async def test_list_batches_legacy_pagination(
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test that legacy paging reports totals on offset, keyset and past-the-end pages"""
+    response = await client.get(
+        "/api/v1/batches",
+        headers=auth_headers,
+        params={"page_size": 2, "legacy_pagination": True},
+    )
+    data = response.json()
+    assert data["total"] == 5
+    assert data["pages"] == 3
+    assert data["has_next"] is True
+    assert data["has_prev"] is False
+    
+    response = await client.get(
+        "/api/v1/batches",
+        headers=auth_headers,
+        params={"page_size": 2, "legacy_pagination": True, "cursor": data["next_cursor"]},
+    )
+    assert response.json()["total"] == 5
+    
+    response = await client.get(
+        "/api/v1/batches",
+        headers=auth_headers,
+        params={"page": 9, "page_size": 2, "legacy_pagination": True},
+    )
+    data = response.json()
+    assert data["items"] == []
+    assert data["total"] == 5
+    assert data["has_next"] is False
+    assert data["has_prev"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_and_scrap_batch(
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test single-batch endpoints return related item data"""
+    _, batches = item_with_batches
+    batch_id = str(batches[0].id)
+    
+    response = await client.get(f"/api/v1/batches/{batch_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["item_sku"] == "BATCH-LIST-001"
+    
+    response = await client.post(
+        f"/api/v1/batches/{batch_id}/mark-scrap",
+        headers=auth_headers,
+        params={"reason": "damaged"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "scrap"
+    assert data["item_sku"] == "BATCH-LIST-001"
+
+
+@pytest.mark.asyncio
+async def test_update_batch_location(
+    db_session: AsyncSession,
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test that moving a batch returns the new location's code"""
+    _, batches = item_with_batches
+    old_location = Location(
+        id=uuid4(), warehouse="W", shelf="A", position="01", location_code="W-A-01"
+    )
+    new_location = Location(
+        id=uuid4(), warehouse="W", shelf="B", position="02", location_code="W-B-02"
+    )
+    db_session.add_all([old_location, new_location])
+    batches[0].location_id = old_location.id
+    await db_session.commit()
+    batch_id = str(batches[0].id)
+    
+    response = await client.get(f"/api/v1/batches/{batch_id}", headers=auth_headers)
+    assert response.json()["location_code"] == "W-A-01"
+    
+    response = await client.put(
+        f"/api/v1/batches/{batch_id}",
+        headers=auth_headers,
+        json={"location_id": str(new_location.id)},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["location_id"] == str(new_location.id)
+    assert data["location_code"] == "W-B-02"
+
+
+@pytest.mark.asyncio
+async def test_update_batch_concurrent_edit(
+    db_session: AsyncSession,
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test that an edit racing a concurrent change gets 409, not 500"""
+    _, batches = item_with_batches
+    batch = batches[0]
+    
+    # Bump the row's version behind the loaded object's back, as another writer would
+    await db_session.execute(
+        update(Batch)
+        .where(Batch.id == batch.id)
+        .values(version=Batch.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db_session.commit()
+    
+    response = await client.put(
+        f"/api/v1/batches/{batch.id}",
+        headers=auth_headers,
+        json={"notes": "moved"},
+    )
+    assert response.status_code == 409
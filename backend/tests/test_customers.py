@@ -0,0 +1,43 @@
+"""Tests for customer endpoints"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.customer import Customer
+
+
+@pytest.mark.asyncio
+async def test_list_customers(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+):
+    """Test listing active customers with has_more paging"""
+    for i in range(3):
+        db_session.add(Customer(name=f"Customer {i}", email=f"c{i}@example.com"))
+    db_session.add(Customer(name="Inactive Customer", is_active=False))
+    await db_session.commit()
+    
+    response = await client.get(
+        "/api/v1/customers", headers=auth_headers, params={"page_size": 2}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 2
+    assert data["has_more"] is True
+    assert data["items"][0]["name"].startswith("Customer")
+    assert data["items"][0]["is_active"] is True
+    
+    response = await client.get(
+        "/api/v1/customers",
+        headers=auth_headers,
+        params={"page": 2, "page_size": 2, "include_total": True},
+    )
+    data = response.json()
+    assert len(data["items"]) == 1
+    assert data["has_more"] is False
+    assert data["total"] == 3
+    
+    response = await client.get(
+        "/api/v1/customers", headers=auth_headers, params={"search": "c1@"}
+    )
+    data = response.json()
+    assert [c["name"] for c in data["items"]] == ["Customer 1"]
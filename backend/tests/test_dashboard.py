@@ -8,7 +8,7 @@ from app.models.item import Item
 from app.models.batch import Batch, BatchStatus
 from app.models.movement import Movement, MovementType
 from app.models.user import User
-from app.services.dashboard_service import DashboardService
+from app.services.dashboard_service import DashboardService, dashboard_cache
 from app.core.security import get_password_hash
 
 
@@ -282,6 +282,32 @@ class TestDashboardAPI:
         data = response.json()
         assert "inventory_value" in data
     
+    async def test_get_dashboard_all_api(self, client, auth_token):
+        """Test getting all dashboard widgets in one request"""
+        response = await client.get(
+            "/api/v1/dashboard/all",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["kpis"]["inventory_value"] == data["inventory_value"]["total_value"]
+        assert "items" in data["inventory_distribution"]
+        assert "risk_levels" in data["expiration_risk"]
+        assert "critical_count" in data["low_stock"]
+        assert "period_days" in data["recent_activity"]
+    
+    async def test_dashboard_all_shares_widget_cache(self, client, auth_token):
+        """Test that /all fills the cache entries of the per-widget routes"""
+        response = await client.get(
+            "/api/v1/dashboard/all",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        
+        assert response.status_code == 200
+        for key in ("kpis", "inventory_value", "expiration_risk"):
+            assert dashboard_cache.get(key) is not None
+    
     async def test_get_inventory_value_api(self, client, auth_token):
         """Test getting inventory value via API"""
         response = await client.get(
@@ -1,6 +1,6 @@
 """Tests for delivery notes functionality"""
 import pytest
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from uuid import uuid4
 
@@ -228,8 +228,9 @@ class TestDocumentService:
         )
         await db_session.flush()
         
-        pdf_bytes = await service.generate_delivery_note_pdf(dn.id)
+        pdf_bytes, delivery_note_number = await service.generate_delivery_note_pdf(dn.id)
         
+        assert delivery_note_number == dn.delivery_note_number
         assert pdf_bytes is not None
         assert len(pdf_bytes) > 0
         # PDF files start with %PDF
@@ -327,6 +328,89 @@ class TestDeliveryNotesAPI:
         data = response.json()
         assert "delivery_note_number" in data
         assert data["items_count"] == 1
+        assert data["status"] == "draft"
+        
+        response = await client.put(
+            f"/api/v1/delivery-notes/{data['id']}/status",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"status": "issued"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "issued"
+        assert data["issue_date"] == date.today().isoformat()
+    
+    async def test_list_delivery_notes_totals_api(self, client, auth_token, sample_data):
+        """Test that listed delivery notes carry line totals and names"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        await client.post(
+            "/api/v1/delivery-notes",
+            headers=headers,
+            json={
+                "customer_id": str(sample_data["customer"].id),
+                "items": [
+                    {"batch_id": str(sample_data["batch"].id), "quantity": 30.0},
+                    {"batch_id": str(sample_data["batch"].id), "quantity": 12.5},
+                ],
+            }
+        )
+        
+        response = await client.get("/api/v1/delivery-notes", headers=headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        note = data["items"][0]
+        assert note["items_count"] == 2
+        assert note["total_quantity"] == 42.5
+        assert note["customer_name"] == "API Test Customer"
+        assert note["created_by_name"] == "DN Warehouse User"
+    
+    async def test_list_delivery_notes_etag(self, client, auth_token, sample_data, db_session):
+        """Test that an unchanged list revalidates and a new note or renamed customer invalidates it"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        note = {
+            "customer_id": str(sample_data["customer"].id),
+            "items": [{"batch_id": str(sample_data["batch"].id), "quantity": 5.0}],
+        }
+        await client.post("/api/v1/delivery-notes", headers=headers, json=note)
+        
+        response = await client.get("/api/v1/delivery-notes", headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, must-revalidate"
+        
+        response = await client.get(
+            "/api/v1/delivery-notes", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        
+        await client.post("/api/v1/delivery-notes", headers=headers, json=note)
+        response = await client.get(
+            "/api/v1/delivery-notes", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+        
+        # Renaming the customer changes the page without touching any note
+        etag = response.headers["etag"]
+        customer = sample_data["customer"]
+        customer.name = "Renamed Customer"
+        customer.updated_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+        await db_session.commit()
+        response = await client.get(
+            "/api/v1/delivery-notes", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["items"][0]["customer_name"] == "Renamed Customer"
+        
+        # A page past the end revalidates too
+        response = await client.get("/api/v1/delivery-notes?page=5", headers=headers)
+        assert response.json()["items"] == []
+        response = await client.get(
+            "/api/v1/delivery-notes?page=5",
+            headers={**headers, "If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304
     
     async def test_get_delivery_note_details_api(self, client, auth_token, sample_data, db_session):
         """Test getting delivery note details via API"""
@@ -353,6 +437,10 @@ class TestDeliveryNotesAPI:
         data = response.json()
         assert data["delivery_note_number"] == dn.delivery_note_number
         assert len(data["items"]) == 1
+        assert data["status"] == "draft"
+        assert data["total_quantity"] == 25
+        assert data["items"][0]["quantity"] == 25
+        assert data["items"][0]["batch_id"] == str(sample_data["batch"].id)
     
     async def test_download_delivery_note_pdf_api(self, client, auth_token, sample_data, db_session):
         """Test downloading delivery note PDF via API"""
@@ -378,3 +466,47 @@ class TestDeliveryNotesAPI:
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/pdf"
         assert response.content[:4] == b'%PDF'
+        assert f"filename={dn.delivery_note_number}.pdf" in response.headers["content-disposition"]
+        assert int(response.headers["content-length"]) == len(response.content)
+        # Already-compressed PDFs are not gzipped again (or labelled "identity")
+        assert "content-encoding" not in response.headers
+        
+        # Unchanged note: the cached PDF is revalidated without rendering
+        response = await client.get(
+            f"/api/v1/delivery-notes/{dn.id}/pdf",
+            headers={
+                "Authorization": f"Bearer {auth_token}",
+                "If-None-Match": response.headers["etag"],
+            }
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        
+        # The customer's name and address are printed: editing them re-renders
+        etag = response.headers["etag"]
+        customer = sample_data["customer"]
+        customer.name = "Renamed Customer"
+        customer.updated_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+        await db_session.commit()
+        response = await client.get(
+            f"/api/v1/delivery-notes/{dn.id}/pdf",
+            headers={
+                "Authorization": f"Bearer {auth_token}",
+                "If-None-Match": etag,
+            }
+        )
+        assert response.status_code == 200
+        
+        # So is the creator's name
+        etag = response.headers["etag"]
+        user.full_name = "Renamed User"
+        user.updated_at = datetime.now(timezone.utc) + timedelta(minutes=2)
+        await db_session.commit()
+        response = await client.get(
+            f"/api/v1/delivery-notes/{dn.id}/pdf",
+            headers={
+                "Authorization": f"Bearer {auth_token}",
+                "If-None-Match": etag,
+            }
+        )
+        assert response.status_code == 200
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
+from app.models.location import Location
 from app.services.fefo_engine import FEFOEngine
 
 
@@ -111,6 +112,35 @@ async def test_fefo_spans_multiple_batches(
     assert suggestions[1].suggested_quantity == Decimal("100")
 
 
+@pytest.mark.asyncio
+async def test_fefo_suggests_location_code(
+    db_session: AsyncSession,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test that suggestions carry the batch location without loading its other batches"""
+    item, batches = item_with_batches
+    location = Location(
+        id=uuid4(),
+        warehouse="WH1",
+        shelf="B",
+        position="02",
+        location_code="WH1-B-02",
+    )
+    db_session.add(location)
+    batches[0].location_id = location.id
+    await db_session.commit()
+    db_session.expunge_all()
+    
+    fefo = FEFOEngine(db_session)
+    suggestions = await fefo.suggest_batches_for_picking(
+        item_id=item.id,
+        quantity_needed=Decimal("200"),
+    )
+    
+    assert suggestions[0].location_code == "WH1-B-02"
+    assert suggestions[1].location_code is None
+
+
 @pytest.mark.asyncio
 async def test_fefo_total_available(
     db_session: AsyncSession,
@@ -216,6 +246,29 @@ async def test_fefo_validate_picking_expired_batch(
     assert any("פג" in err for err in validation.errors)  # Contains "expired" in Hebrew
 
 
+@pytest.mark.asyncio
+async def test_fefo_validate_picking_bulk(
+    db_session: AsyncSession,
+    item_with_batches: tuple[Item, list[Batch]],
+):
+    """Test bulk validation keeps pick order and per-pick results"""
+    item, batches = item_with_batches
+    fefo = FEFOEngine(db_session)
+    
+    validations = await fefo.validate_picking_bulk([
+        (batches[2].id, Decimal("50")),  # Valid, skips earlier batches
+        (uuid4(), Decimal("1")),  # Unknown batch
+        (batches[0].id, Decimal("150")),  # More than available
+        (batches[0].id, Decimal("50")),  # Valid, expires soon
+    ])
+    
+    assert [v.is_valid for v in validations] == [True, False, False, True]
+    assert "FEFO-001" in validations[0].warnings[0]
+    assert validations[1].errors == ["אצווה לא נמצאה"]
+    assert validations[3].batch_id == batches[0].id
+    assert len(validations[3].warnings) == 1  # Expiration warning only
+
+
 @pytest.mark.asyncio
 async def test_fefo_warning_levels(db_session: AsyncSession):
     """Test warning level classification"""
@@ -1,8 +1,12 @@
 """Tests for inventory/item endpoints"""
+from datetime import date, timedelta
+from decimal import Decimal
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.user import User
 
@@ -80,6 +84,42 @@ async def test_list_items(
     data = response.json()
     assert data["total"] == 3
     assert len(data["items"]) == 3
+    
+    # Later pages and pages past the end still report the full total
+    response = await client.get(
+        "/api/v1/items", headers=auth_headers, params={"page": 2, "page_size": 2}
+    )
+    data = response.json()
+    assert data["total"] == 3
+    assert len(data["items"]) == 1
+    
+    response = await client.get(
+        "/api/v1/items", headers=auth_headers, params={"page": 5, "page_size": 2}
+    )
+    data = response.json()
+    assert data["total"] == 3
+    assert data["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_list_items_gzip(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+):
+    """Test that large list responses are gzip-compressed"""
+    db_session.add_all([
+        Item(sku=f"GZ-{i:03d}", name=f"Gzip Ink {i}", supplier="A", unit_of_measure="KG")
+        for i in range(20)
+    ])
+    await db_session.commit()
+    
+    response = await client.get(
+        "/api/v1/items",
+        headers={**auth_headers, "Accept-Encoding": "gzip"},
+        params={"page_size": 20},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 20
 
 
 @pytest.mark.asyncio
@@ -123,6 +163,48 @@ async def test_get_item(
     assert data["sku"] == "INK-001"
 
 
+@pytest.mark.asyncio
+async def test_get_item_stock_totals(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+):
+    """Test that a single item reports its active stock only"""
+    item = Item(
+        sku="INK-001",
+        name="Black Ink",
+        supplier="Supplier A",
+        unit_of_measure="KG",
+        cost_price=Decimal("10.00"),
+        reorder_point=100,
+    )
+    db_session.add(item)
+    await db_session.flush()
+    
+    today = date.today()
+    for number, quantity, batch_status in [
+        ("STK-001", Decimal("30"), BatchStatus.ACTIVE),
+        ("STK-002", Decimal("45"), BatchStatus.ACTIVE),
+        ("STK-003", Decimal("500"), BatchStatus.SCRAP),
+    ]:
+        db_session.add(Batch(
+            item_id=item.id,
+            batch_number=number,
+            quantity_received=quantity,
+            quantity_available=quantity,
+            receipt_date=today,
+            expiration_date=today + timedelta(days=180),
+            status=batch_status,
+        ))
+    await db_session.commit()
+    
+    response = await client.get(f"/api/v1/items/{item.id}", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert float(data["total_quantity_available"]) == 75
+    assert float(data["total_inventory_value"]) == 750
+    assert data["active_batches_count"] == 2
+    assert data["is_below_reorder_point"] is True
+
+
 @pytest.mark.asyncio
 async def test_get_item_not_found(client: AsyncClient, auth_headers: dict):
     """Test getting non-existent item returns 404"""
@@ -186,3 +268,52 @@ async def test_unauthorized_access(client: AsyncClient):
     assert response.status_code == 403
 
 
+@pytest.mark.asyncio
+async def test_list_items_below_reorder(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+):
+    """Test stock aggregates and the below_reorder filter"""
+    stocked = Item(
+        sku="STOCK-001",
+        name="Stocked Ink",
+        supplier="A",
+        unit_of_measure="KG",
+        cost_price=Decimal("2.00"),
+        reorder_point=10,
+    )
+    empty = Item(
+        sku="EMPTY-001",
+        name="Empty Ink",
+        supplier="A",
+        unit_of_measure="KG",
+        reorder_point=10,
+    )
+    db_session.add_all([stocked, empty])
+    await db_session.flush()
+    for i, quantity in enumerate(["8", "7"]):
+        db_session.add(Batch(
+            item_id=stocked.id,
+            batch_number=f"STOCK-B{i}",
+            quantity_received=Decimal(quantity),
+            quantity_available=Decimal(quantity),
+            receipt_date=date.today(),
+            expiration_date=date.today() + timedelta(days=90),
+            status=BatchStatus.ACTIVE,
+        ))
+    await db_session.commit()
+    
+    response = await client.get(
+        "/api/v1/items", headers=auth_headers, params={"below_reorder": True, "page_size": 1}
+    )
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["sku"] == "EMPTY-001"
+    
+    response = await client.get(
+        "/api/v1/items", headers=auth_headers, params={"below_reorder": False}
+    )
+    data = response.json()
+    assert data["total"] == 1
+    assert Decimal(data["items"][0]["total_quantity_available"]) == Decimal("15")
+    assert Decimal(data["items"][0]["total_inventory_value"]) == Decimal("30")
+    assert data["items"][0]["active_batches_count"] == 2
@@ -1,9 +1,12 @@
 """Tests for database models"""
+import time
+import uuid
 import pytest
 from datetime import date, timedelta
 from decimal import Decimal
 from uuid import uuid4
 
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, UserRole
@@ -86,6 +89,10 @@ async def test_batch_creation(db_session: AsyncSession):
     assert batch.status == BatchStatus.ACTIVE
     assert not batch.is_expired
     assert batch.days_until_expiration == 365
+    
+    # Stored as its SMALLINT code, read back as the enum member
+    result = await db_session.execute(text("SELECT status FROM batches"))
+    assert result.scalar() == 0
 
 
 @pytest.mark.asyncio
@@ -116,6 +123,12 @@ async def test_batch_expiration(db_session: AsyncSession):
     
     assert batch.is_expired is True
     assert batch.days_until_expiration == -1
+    
+    # The same checks work as SQL filters
+    result = await db_session.execute(
+        select(Batch.id).where(Batch.is_expired, ~Batch.is_depleted)
+    )
+    assert result.scalars().all() == [batch.id]
 
 
 @pytest.mark.asyncio
@@ -155,10 +168,25 @@ async def test_location_code_generation():
 
 
 @pytest.mark.asyncio
-async def test_batch_number_generation():
+async def test_batch_number_generation(db_session: AsyncSession):
     """Test batch number auto-generation"""
-    batch_number = Batch.generate_batch_number()
-    assert batch_number.startswith("GR-")
-    assert len(batch_number) == 13  # GR-YYMMDD-XXX
+    from app.services.receiving_service import ReceivingService
+    
+    batch_numbers = await ReceivingService(db_session).generate_batch_numbers(3)
+    assert len(set(batch_numbers)) == 3
+    for batch_number in batch_numbers:
+        assert batch_number.startswith("GR-")
+        assert len(batch_number) == 16  # GR-YYMMDD-NNNNNN
 
 
+def test_uuid7_is_time_ordered():
+    """Test that generated primary keys are version 7 and sort by creation time"""
+    from app.models.base import uuid7
+    
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+    
+    assert first.version == 7
+    assert first.variant == uuid.RFC_4122
+    assert first < second
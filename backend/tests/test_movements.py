@@ -1,16 +1,18 @@
 """Tests for movement history and audit trail"""
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from uuid import uuid4
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.batch import Batch, BatchStatus
 from app.models.item import Item
 from app.models.movement import Movement, MovementType
 from app.models.user import User
+from app.services.inventory_service import InventoryService
 
 
 @pytest.fixture
@@ -133,6 +135,17 @@ async def test_get_movements_by_item(
     assert "summary" in data
     assert float(data["summary"]["total_received"]) == 100
     assert float(data["summary"]["total_dispatched"]) == 30
+    
+    # The summary covers the whole range, not just the returned movements
+    response = await client.get(
+        f"/api/v1/movements/by-item/{item.id}",
+        headers=auth_headers,
+        params={"limit": 1},
+    )
+    data = response.json()
+    assert data["total"] == 1
+    assert float(data["summary"]["total_received"]) == 100
+    assert float(data["summary"]["total_dispatched"]) == 30
 
 
 @pytest.mark.asyncio
@@ -179,3 +192,145 @@ async def test_movements_include_audit_info(
         assert "user_name" in movement
         assert "reference_number" in movement
 
+
+@pytest.mark.asyncio
+async def test_movement_history_related_data(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    item_with_movements: tuple[Item, Batch, list[Movement]],
+):
+    """Test that history rows load batch, item and user without lazy loads"""
+    item, batch, movements = item_with_movements
+    # Start from an empty identity map so the query's loader options apply
+    db_session.expunge_all()
+    
+    response = await client.get(
+        "/api/v1/movements",
+        headers=auth_headers,
+        params={"item_id": str(item.id)},
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    for movement in data["movements"]:
+        assert movement["batch_number"] == "MOV-BATCH-001"
+        assert movement["item_sku"] == "MOV-TEST-001"
+        assert movement["user_name"] is not None
+
+
+@pytest.mark.asyncio
+async def test_movement_history_cursor_pagination(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    test_user: User,
+    item_with_movements: tuple[Item, Batch, list[Movement]],
+):
+    """Test walking a batch's history newest first using next_cursor"""
+    item, batch, _ = item_with_movements
+    other = Batch(
+        id=uuid4(),
+        item_id=item.id,
+        batch_number="MOV-BATCH-002",
+        quantity_received=Decimal("10"),
+        quantity_available=Decimal("10"),
+        receipt_date=date.today(),
+        expiration_date=date.today() + timedelta(days=90),
+        status=BatchStatus.ACTIVE,
+    )
+    db_session.add(other)
+    await db_session.flush()
+    
+    # Two movements share a timestamp so the id has to break the tie
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for minutes in (0, 5, 5, 10):
+        db_session.add(Movement(
+            id=uuid4(),
+            batch_id=other.id,
+            user_id=test_user.id,
+            movement_type=MovementType.ADJUSTMENT,
+            quantity=Decimal("1"),
+            quantity_before=Decimal("10"),
+            quantity_after=Decimal("10"),
+            timestamp=base + timedelta(minutes=minutes),
+        ))
+    await db_session.commit()
+    
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(
+            f"/api/v1/movements/by-batch/{other.id}", headers=auth_headers, params=params
+        )
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(data["movements"])
+        if not data["has_more"]:
+            break
+        params = {"limit": 2, "cursor": data["next_cursor"]}
+    
+    assert len(seen) == 4
+    assert len({m["id"] for m in seen}) == 4
+    keys = [(m["timestamp"], m["id"]) for m in seen]
+    assert keys == sorted(keys, reverse=True)
+    
+    response = await client.get(
+        "/api/v1/movements", headers=auth_headers, params={"cursor": "bogus"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_movement_history_query_count(
+    db_session: AsyncSession,
+    test_user: User,
+    item_with_movements: tuple[Item, Batch, list[Movement]],
+):
+    """Test that history plus labels costs a fixed number of queries"""
+    item, _, _ = item_with_movements
+    for i in range(3):
+        batch = Batch(
+            id=uuid4(),
+            item_id=item.id,
+            batch_number=f"MOV-COUNT-{i}",
+            quantity_received=Decimal("5"),
+            quantity_available=Decimal("5"),
+            receipt_date=date.today(),
+            expiration_date=date.today() + timedelta(days=60),
+            status=BatchStatus.ACTIVE,
+        )
+        db_session.add(batch)
+        await db_session.flush()
+        db_session.add(Movement(
+            id=uuid4(),
+            batch_id=batch.id,
+            user_id=test_user.id,
+            movement_type=MovementType.RECEIPT,
+            quantity=Decimal("5"),
+            quantity_before=Decimal("0"),
+            quantity_after=Decimal("5"),
+        ))
+    await db_session.commit()
+    db_session.expunge_all()
+    
+    statements = []
+    engine = db_session.bind.sync_engine
+    
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        service = InventoryService(db_session)
+        movements = await service.get_movements_history(item_id=item.id)
+        user_names, batches = await service.get_movement_labels(movements)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    assert len(movements) == 5
+    assert len(batches) == 4
+    assert user_names == {test_user.id: test_user.full_name}
+    # Movements, then one IN query each for users and batches with their items
+    assert len(statements) == 3
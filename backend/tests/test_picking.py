@@ -81,6 +81,15 @@ async def test_suggest_batches(
     assert data["can_fulfill"] is True
     assert len(data["suggestions"]) == 1
     assert data["suggestions"][0]["batch_number"] == "PICK-001"  # Earliest expiring
+    
+    # Decimals, UUIDs and dates keep their JSON types
+    assert data["item_id"] == str(item.id)
+    assert data["quantity_needed"] == 50
+    assert data["total_available"] == 250
+    suggestion = data["suggestions"][0]
+    assert suggestion["batch_id"] == str(batches[0].id)
+    assert suggestion["suggested_quantity"] == 50
+    assert suggestion["expiration_date"] == batches[0].expiration_date.isoformat()
 
 
 @pytest.mark.asyncio
@@ -173,6 +182,27 @@ async def test_execute_pick_insufficient_quantity(
     assert response.status_code == 400
 
 
+@pytest.mark.asyncio
+async def test_execute_pick_rejects_excess_precision(
+    client: AsyncClient,
+    auth_headers: dict,
+    item_with_stock: tuple[Item, list[Batch]],
+):
+    """Test that quantities finer than the stored scale are rejected, not rounded"""
+    item, batches = item_with_stock
+    
+    response = await client.post(
+        "/api/v1/picking/execute-pick",
+        headers=auth_headers,
+        json={
+            "batch_id": str(batches[0].id),
+            "quantity": "1.0005",
+        },
+    )
+    
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_create_dispatch(
     client: AsyncClient,
@@ -208,6 +238,37 @@ async def test_create_dispatch(
     assert data["reference_number"].startswith("DSP-")
 
 
+@pytest.mark.asyncio
+async def test_dispatch_same_batch_twice(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session: AsyncSession,
+    item_with_stock: tuple[Item, list[Batch]],
+):
+    """Test that repeated picks from one batch apply in order and deplete it"""
+    item, batches = item_with_stock
+    
+    response = await client.post(
+        "/api/v1/picking/dispatch",
+        headers=auth_headers,
+        json={
+            "items": [
+                {"batch_id": str(batches[0].id), "quantity": "60"},
+                {"batch_id": str(batches[0].id), "quantity": "40"},
+            ],
+        },
+    )
+    
+    assert response.status_code == 200
+    movements = response.json()["movements"]
+    assert [m["quantity_remaining"] for m in movements] == [40, 0]
+    
+    await db_session.refresh(batches[0])
+    assert batches[0].quantity_available == 0
+    assert batches[0].status == BatchStatus.DEPLETED
+    assert batches[0].version == 2  # One UPDATE for both picks
+
+
 @pytest.mark.asyncio
 async def test_dispatch_atomic_rollback(
     client: AsyncClient,
@@ -256,5 +317,8 @@ async def test_expiration_summary(
     data = response.json()
     assert float(data["total_quantity"]) == 250  # 100 + 150
     assert data["total_batches"] == 2
-    assert "breakdown" in data
+    assert data["item_id"] == str(item.id)
+    assert data["breakdown"]["warning_60_days"] == {"quantity": 100, "batches": 1}
+    assert data["breakdown"]["safe"] == {"quantity": 150, "batches": 1}
+    assert data["breakdown"]["expired"] == {"quantity": 0, "batches": 0}
 
@@ -191,6 +191,42 @@ async def test_receive_multiple_items(
     assert data["batches_created"] == 2
     assert float(data["total_quantity"]) == 175
     assert len(data["items"]) == 2
+    
+    # Generated batch numbers are consecutive and unique
+    batch_numbers = [item["batch_number"] for item in data["items"]]
+    assert len(set(batch_numbers)) == 2
+    assert int(batch_numbers[1].split("-")[-1]) == int(batch_numbers[0].split("-")[-1]) + 1
+
+
+@pytest.mark.asyncio
+async def test_receive_multiple_items_unknown_item(
+    client: AsyncClient,
+    auth_headers: dict,
+    test_item: Item,
+):
+    """Test that one unknown item rejects the whole GRN"""
+    expiration_date = date.today() + timedelta(days=365)
+    
+    response = await client.post(
+        "/api/v1/receiving/receive-multiple",
+        headers=auth_headers,
+        json={
+            "items": [
+                {
+                    "item_id": str(test_item.id),
+                    "quantity": "100",
+                    "expiration_date": expiration_date.isoformat(),
+                },
+                {
+                    "item_id": str(uuid4()),
+                    "quantity": "75",
+                    "expiration_date": expiration_date.isoformat(),
+                },
+            ]
+        },
+    )
+    
+    assert response.status_code == 400
 
 
 @pytest.mark.asyncio
@@ -235,6 +271,8 @@ async def test_validate_barcode(
     data = response.json()
     assert data["sku"] == test_item.sku
     assert data["name"] == test_item.name
+    assert data["item_id"] == str(test_item.id)
+    assert data["cost_price"] == 50
 
 
 @pytest.mark.asyncio
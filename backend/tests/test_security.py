@@ -8,7 +8,9 @@ from app.core.security import (
     create_refresh_token,
     decode_token,
     get_password_hash,
+    get_password_hash_async,
     verify_password,
+    verify_password_async,
     verify_token,
 )
 
@@ -23,6 +25,17 @@ def test_password_hashing():
     assert not verify_password("wrongpassword", hashed)
 
 
+@pytest.mark.asyncio
+async def test_password_hashing_async():
+    """Test the off-loop hashing helpers match the sync ones"""
+    hashed = await get_password_hash_async("securepassword123")
+    
+    assert verify_password("securepassword123", hashed)
+    assert await verify_password_async("securepassword123", hashed)
+    assert not await verify_password_async("wrongpassword", hashed)
+    assert not await verify_password_async("securepassword123", "not-a-hash")
+
+
 def test_create_access_token():
     """Test JWT access token creation"""
     user_id = uuid4()